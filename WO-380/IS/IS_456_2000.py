@@ -47,10 +47,10 @@ print(report)
 
 """
 
+import io
 import math
-import numpy as np
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Union
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Optional, Union, TextIO
 from enum import Enum
 
 # =============================================================================
@@ -90,7 +90,7 @@ class SteelGrade(Enum):
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Material:
     """Material properties as per IS 456:2000"""
     fck: float  # Characteristic compressive strength of concrete
@@ -98,12 +98,45 @@ class Material:
     gamma_c: float = 1.5  # Partial safety factor for concrete
     gamma_s: float = 1.15 # Partial safety factor for steel
     Es: float = 200000    # Modulus of elasticity of steel (N/mm²)
+    Ec: float = field(init=False)  # Modulus of elasticity of concrete (N/mm²)
     
     def __post_init__(self):
         # Calculate Ec as per Clause 6.2.3.1
         self.Ec = 5000 * math.sqrt(self.fck)  # N/mm²
 
-@dataclass
+# Partial safety factors for loads - Table 18, with earthquake taken like wind
+# (IS 875 Part 5 / IS 1893). Factors are (DL, LL, WL, EL); wind and earthquake
+# act in either direction and are never combined with each other.
+LOAD_COMBINATIONS: Dict[str, Dict[str, Tuple[float, float, float, float]]] = {
+    'collapse': {
+        'DL+LL': (1.5, 1.5, 0, 0),
+        'DL+WL': (1.5, 0, 1.5, 0),
+        'DL-WL': (1.5, 0, -1.5, 0),
+        '0.9DL+WL': (0.9, 0, 1.5, 0),
+        '0.9DL-WL': (0.9, 0, -1.5, 0),
+        'DL+LL+WL': (1.2, 1.2, 1.2, 0),
+        'DL+LL-WL': (1.2, 1.2, -1.2, 0),
+        'DL+EL': (1.5, 0, 0, 1.5),
+        'DL-EL': (1.5, 0, 0, -1.5),
+        '0.9DL+EL': (0.9, 0, 0, 1.5),
+        '0.9DL-EL': (0.9, 0, 0, -1.5),
+        'DL+LL+EL': (1.2, 1.2, 0, 1.2),
+        'DL+LL-EL': (1.2, 1.2, 0, -1.2),
+    },
+    'serviceability': {
+        'DL+LL': (1.0, 1.0, 0, 0),
+        'DL+WL': (1.0, 0, 1.0, 0),
+        'DL-WL': (1.0, 0, -1.0, 0),
+        'DL+LL+WL': (1.0, 0.8, 0.8, 0),
+        'DL+LL-WL': (1.0, 0.8, -0.8, 0),
+        'DL+EL': (1.0, 0, 0, 1.0),
+        'DL-EL': (1.0, 0, 0, -1.0),
+        'DL+LL+EL': (1.0, 0.8, 0, 0.8),
+        'DL+LL-EL': (1.0, 0.8, 0, -0.8),
+    },
+}
+
+@dataclass(slots=True)
 class Loads:
     """Load combinations as per IS 456:2000 Clause 36.4.1"""
     dead_load: float = 0
@@ -111,16 +144,40 @@ class Loads:
     wind_load: float = 0
     earthquake_load: float = 0
     
-    def get_factored_loads(self) -> Dict[str, float]:
-        """Calculate factored loads for limit state design"""
-        combinations = {
-            'DL+LL': 1.5 * self.dead_load + 1.5 * self.live_load,
-            'DL+WL': 1.5 * self.dead_load + 1.5 * self.wind_load,
-            'DL+LL+WL': 1.2 * self.dead_load + 1.2 * self.live_load + 1.2 * self.wind_load
-        }
-        return combinations
-
-@dataclass
+    def get_factored_loads(self, limit_state: str = 'collapse') -> Dict[str, float]:
+        """Factored load of every Table 18 combination for the limit state"""
+        try:
+            combinations = LOAD_COMBINATIONS[limit_state]
+        except KeyError:
+            raise ValueError(f"Unknown limit state {limit_state!r}. "
+                             f"Available: {list(LOAD_COMBINATIONS)}")
+        basic = (self.dead_load, self.live_load, self.wind_load, self.earthquake_load)
+        return {name: sum(f * load for f, load in zip(factors, basic))
+                for name, factors in combinations.items()}
+    
+    def governing_load(self, limit_state: str = 'collapse') -> Tuple[str, float]:
+        """Combination with the largest factored load in either direction, and that load"""
+        return max(self.get_factored_loads(limit_state).items(), key=lambda item: abs(item[1]))
+
+# Moment and shear coefficients for a uniformly loaded span (w L² / k, w L / k).
+# The checker, the tolerance analysis and the load combination envelopes all
+# take their single-span demands from udl_demands.
+MOMENT_DIVISORS = {'simply_supported': 8, 'continuous': 10, 'cantilever': 2}
+SHEAR_DIVISORS = {'simply_supported': 2, 'continuous': 2, 'cantilever': 1}
+
+def udl_demands(w, span, support_condition: str = 'simply_supported'):
+    """
+    Design moment (kNm) and shear (kN) of a single span of span m under a
+    factored UDL of w kN/m. w and span may be numbers or numpy arrays.
+    """
+    try:
+        moment_divisor = MOMENT_DIVISORS[support_condition]
+    except KeyError:
+        raise ValueError(f"Unknown support condition {support_condition!r}. "
+                         f"Available: {list(MOMENT_DIVISORS)}")
+    return w * span ** 2 / moment_divisor, abs(w) * span / SHEAR_DIVISORS[support_condition]
+
+@dataclass(slots=True)
 class Dimensions:
     """Member dimensions"""
     length: float = 0
@@ -129,7 +186,7 @@ class Dimensions:
     effective_depth: float = 0
     cover: float = 0
 
-@dataclass
+@dataclass(slots=True)
 class Reinforcement:
     """Reinforcement details"""
     main_steel_area: float = 0
@@ -425,8 +482,9 @@ class DeflectionCompliance:
         else:
             mf_tension = 0.8
         
-        # For spans over 10m
-        span_factor = min(10.0 / span, 1.0) if span > 10 else 1.0
+        # For spans over 10m (span is in mm)
+        span_m = span / 1000
+        span_factor = min(10.0 / span_m, 1.0) if span_m > 10 else 1.0
         
         allowable_ratio = basic_ratio * mf_tension * span_factor
         actual_ratio = span / effective_depth
@@ -441,17 +499,31 @@ class ReinforcementDetailing:
     """Check reinforcement detailing as per IS 456:2000 Section 26"""
     
     @staticmethod
-    def check_spacing_requirements(spacing: float, member_type: MemberType, 
-                                 bar_dia: float, effective_depth: float, aggregate_size: float = 20) -> Tuple[bool, str]:
-        """Check spacing requirements - Clause 26.3"""
-        
-        # Minimum spacing requirements
+    def spacing_limits(member_type: MemberType, bar_dia: float, effective_depth: float,
+                       aggregate_size: float = 20) -> Tuple[float, float]:
+        """Minimum and maximum bar spacing (mm) - Clause 26.3"""
         min_spacing = max(bar_dia, 5 + aggregate_size)  # Clause 26.3.2(a)
         
         if member_type == MemberType.SLAB:
             max_spacing = min(3 * effective_depth, 300)
         else:
             max_spacing = 300  # Conservative
+        return min_spacing, max_spacing
+    
+    @staticmethod
+    def spacing_limit(spacing: float, member_type: MemberType, bar_dia: float,
+                      effective_depth: float, aggregate_size: float = 20) -> float:
+        """The Clause 26.3 limit a spacing is checked against: the minimum below it, else the maximum"""
+        min_spacing, max_spacing = ReinforcementDetailing.spacing_limits(
+            member_type, bar_dia, effective_depth, aggregate_size)
+        return min_spacing if spacing < min_spacing else max_spacing
+    
+    @staticmethod
+    def check_spacing_requirements(spacing: float, member_type: MemberType, 
+                                 bar_dia: float, effective_depth: float, aggregate_size: float = 20) -> Tuple[bool, str]:
+        """Check spacing requirements - Clause 26.3"""
+        min_spacing, max_spacing = ReinforcementDetailing.spacing_limits(
+            member_type, bar_dia, effective_depth, aggregate_size)
         
         if spacing < min_spacing:
             return False, (f"Clause 26.3.2: Minimum spacing required is {min_spacing}mm, "
@@ -511,7 +583,9 @@ class DesignChecker:
     
     def check_compliance(self, member_type: MemberType, dimensions: Dimensions,
                         material: Material, loads: Loads, exposure: ExposureCondition,
-                        reinforcement: Reinforcement, support_condition: str = 'simply_supported') -> Dict:
+                        reinforcement: Reinforcement, support_condition: str = 'simply_supported',
+                        design_moment: Optional[float] = None,
+                        design_shear: Optional[float] = None) -> Dict:
         """
         Comprehensive compliance check for RCC member
         
@@ -522,7 +596,11 @@ class DesignChecker:
             loads: Applied loads
             exposure: Exposure condition
             reinforcement: Reinforcement details
-            support_condition: Support condition for deflection check
+            support_condition: Support condition for the single-span demands
+                (udl_demands) and the deflection check
+            design_moment: Factored moment (kNm) from an analysis (IS.analysis),
+                used instead of the single-span approximation
+            design_shear: Factored shear (kN) from an analysis, likewise
             
         Returns:
             Dictionary containing compliance results
@@ -533,6 +611,7 @@ class DesignChecker:
             'failed_checks': [],
             'passed_checks': [],
             'utilization_ratios': {},
+            'check_values': {},      # message: (actual, required) where the check has them
             'recommendations': []
         }
         
@@ -587,6 +666,23 @@ class DesignChecker:
             results['failed_checks'].append(f"Durability check error: {str(e)}")
             results['overall_compliance'] = False
         
+        # Design demands of the flexure and shear checks: single-span
+        # approximation unless analysed demands are given
+        combination = Mu_applied = Vu_applied = None
+        try:
+            combination, max_factored_load = loads.governing_load()
+            max_factored_load = abs(max_factored_load)  # reversed wind/earthquake governs by size
+            span = dimensions.length / 1000  # m
+            Mu_applied, Vu_applied = udl_demands(max_factored_load, span, support_condition)
+        except Exception as e:
+            if design_moment is None or design_shear is None:
+                results['failed_checks'].append(f"Design demand error: {str(e)}")
+                results['overall_compliance'] = False
+        if design_moment is not None:
+            Mu_applied = design_moment
+        if design_shear is not None:
+            Vu_applied = design_shear
+        
         # Flexural compliance checks
         try:
             # Check minimum steel
@@ -609,29 +705,26 @@ class DesignChecker:
                 results['overall_compliance'] = False
             
             # Calculate moment capacity and utilization
-            factored_loads = loads.get_factored_loads()
-            max_factored_load = max(factored_loads.values())
-            
-            # Approximate moment calculation (for simply supported beam)
-            if member_type == MemberType.BEAM:
-                Mu_applied = max_factored_load * dimensions.length**2 / 8  # kNm
-            else:
-                Mu_applied = max_factored_load * dimensions.length**2 / 12  # kNm (conservative)
-            
+            if Mu_applied is None:
+                raise ValueError("no design moment")
             Mu_capacity, flexural_analysis = self.flexure_checker.calculate_moment_capacity(
                 dimensions.width, dimensions.effective_depth, 
                 reinforcement.main_steel_area, material.fck, material.fy)
             
             utilization_flexure = Mu_applied / Mu_capacity if Mu_capacity > 0 else float('inf')
+            demand = "analysed moment" if design_moment is not None else combination
             results['utilization_ratios']['flexure'] = utilization_flexure
             
             if utilization_flexure > 1.0:
-                results['failed_checks'].append(
-                    f"Flexural capacity insufficient: Utilization = {utilization_flexure:.2f}")
+                msg = (f"Flexural capacity insufficient: Utilization = {utilization_flexure:.2f} "
+                       f"under {demand}")
+                results['failed_checks'].append(msg)
                 results['overall_compliance'] = False
             else:
-                results['passed_checks'].append(
-                    f"Flexural capacity adequate: Utilization = {utilization_flexure:.2f}")
+                msg = (f"Flexural capacity adequate: Utilization = {utilization_flexure:.2f} "
+                       f"under {demand}")
+                results['passed_checks'].append(msg)
+            results['check_values'][msg] = (Mu_applied, Mu_capacity)
             
         except Exception as e:
             results['failed_checks'].append(f"Flexural check error: {str(e)}")
@@ -639,8 +732,8 @@ class DesignChecker:
         
         # Shear compliance checks
         try:
-            # Approximate shear calculation
-            Vu_applied = max_factored_load * dimensions.length / 2  # kN
+            if Vu_applied is None:
+                raise ValueError("no design shear")
             
             is_valid, msg, shear_analysis = self.shear_checker.check_shear_capacity(
                 Vu_applied, dimensions.width, dimensions.effective_depth,
@@ -656,6 +749,7 @@ class DesignChecker:
                 results['overall_compliance'] = False
             
             results['utilization_ratios']['shear'] = shear_analysis['tv'] / shear_analysis['tc_max']
+            results['check_values'][msg] = (shear_analysis['tv'], shear_analysis['tc_max'])
             
         except Exception as e:
             results['failed_checks'].append(f"Shear check error: {str(e)}")
@@ -689,6 +783,8 @@ class DesignChecker:
                 
                 is_valid, msg = self.detailing_checker.check_spacing_requirements(
                     spacing, member_type, reinforcement.main_bar_dia, dimensions.effective_depth)
+                results['check_values'][msg] = (spacing, self.detailing_checker.spacing_limit(
+                    spacing, member_type, reinforcement.main_bar_dia, dimensions.effective_depth))
                 
                 if is_valid:
                     results['passed_checks'].append(msg)
@@ -709,52 +805,57 @@ class DesignChecker:
         
         return results
     
-    def generate_compliance_report(self, results: Dict) -> str:
-        """Generate a formatted compliance report"""
+    def write_compliance_report(self, results: Dict, out: TextIO) -> None:
+        """Write a formatted compliance report to a text stream"""
+        write = out.write
         
-        report = "="*80 + "\n"
-        report += "IS 456:2000 COMPLIANCE REPORT\n"
-        report += "="*80 + "\n\n"
+        write("="*80 + "\n")
+        write("IS 456:2000 COMPLIANCE REPORT\n")
+        write("="*80 + "\n\n")
         
         # Overall compliance status
         status = "COMPLIANT" if results['overall_compliance'] else "NOT COMPLIANT"
-        report += f"OVERALL STATUS: {status}\n\n"
+        write(f"OVERALL STATUS: {status}\n\n")
         
         # Failed checks
         if results['failed_checks']:
-            report += "FAILED CHECKS:\n"
-            report += "-"*50 + "\n"
+            write("FAILED CHECKS:\n")
+            write("-"*50 + "\n")
             for i, check in enumerate(results['failed_checks'], 1):
-                report += f"{i}. {check}\n"
-            report += "\n"
+                write(f"{i}. {check}\n")
+            write("\n")
         
         # Passed checks
         if results['passed_checks']:
-            report += "PASSED CHECKS:\n"
-            report += "-"*50 + "\n"
+            write("PASSED CHECKS:\n")
+            write("-"*50 + "\n")
             for i, check in enumerate(results['passed_checks'], 1):
-                report += f"{i}. {check}\n"
-            report += "\n"
+                write(f"{i}. {check}\n")
+            write("\n")
         
         # Utilization ratios
         if results['utilization_ratios']:
-            report += "UTILIZATION RATIOS:\n"
-            report += "-"*50 + "\n"
+            write("UTILIZATION RATIOS:\n")
+            write("-"*50 + "\n")
             for component, ratio in results['utilization_ratios'].items():
-                report += f"{component.upper()}: {ratio:.3f}\n"
-            report += "\n"
+                write(f"{component.upper()}: {ratio:.3f}\n")
+            write("\n")
         
         # Recommendations
         if results['recommendations']:
-            report += "RECOMMENDATIONS:\n"
-            report += "-"*50 + "\n"
+            write("RECOMMENDATIONS:\n")
+            write("-"*50 + "\n")
             for i, rec in enumerate(results['recommendations'], 1):
-                report += f"{i}. {rec}\n"
-            report += "\n"
-        
-        report += "="*80
+                write(f"{i}. {rec}\n")
+            write("\n")
         
-        return report
+        write("="*80)
+    
+    def generate_compliance_report(self, results: Dict) -> str:
+        """Generate a formatted compliance report"""
+        out = io.StringIO()
+        self.write_compliance_report(results, out)
+        return out.getvalue()
 
 # =============================================================================
 # EXAMPLE USAGE AND TEST CASES
@@ -42,11 +42,11 @@ The code includes working examples for beam and column checking that demonstrate
 
 """
 
+import io
 import math
 from enum import Enum
-from typing import List, Dict, Tuple, Optional, Union
+from typing import List, Dict, Tuple, Optional, Union, TextIO
 from dataclasses import dataclass
-import warnings
 
 class MemberType(Enum):
     BEAM = "beam"
@@ -76,7 +76,7 @@ class ExposureCondition(Enum):
     VERY_SEVERE = "very_severe"
     EXTREME = "extreme"
 
-@dataclass
+@dataclass(slots=True)
 class ReinforcementBar:
     """Represents a reinforcement bar with its properties"""
     diameter: float  # mm
@@ -86,7 +86,7 @@ class ReinforcementBar:
     is_deformed: bool = True
     position: str = "bottom"  # bottom, top, side
 
-@dataclass
+@dataclass(slots=True)
 class MemberGeometry:
     """Geometric properties of structural member"""
     length: float  # mm
@@ -95,7 +95,7 @@ class MemberGeometry:
     effective_depth: float  # mm
     cover: float  # mm
 
-@dataclass
+@dataclass(slots=True)
 class CheckResult:
     """Result of a detailing check"""
     is_compliant: bool
@@ -1220,14 +1220,15 @@ class DetailingChecker:
         
         return results
     
-    def generate_compliance_report(self, results: Dict[str, CheckResult]) -> str:
-        """Generate a comprehensive compliance report"""
+    def write_compliance_report(self, results: Dict[str, CheckResult], out: TextIO) -> None:
+        """Write a comprehensive compliance report to a text stream"""
+        write = out.write
         compliant_checks = [name for name, result in results.items() if result.is_compliant]
         non_compliant_checks = [name for name, result in results.items() if not result.is_compliant]
         
         overall_compliance = len(non_compliant_checks) == 0
         
-        report = f"""
+        write(f"""
 SP 34:1987 DETAILING COMPLIANCE REPORT
 =====================================
 
@@ -1236,30 +1237,34 @@ Total Checks: {len(results)}
 Passed: {len(compliant_checks)}
 Failed: {len(non_compliant_checks)}
 
-"""
+""")
         
         if non_compliant_checks:
-            report += "FAILED CHECKS:\n"
-            report += "-" * 50 + "\n"
+            write("FAILED CHECKS:\n")
+            write("-" * 50 + "\n")
             for check_name in non_compliant_checks:
                 result = results[check_name]
-                report += f"• {check_name.upper()}:\n"
-                report += f"  Issue: {result.description}\n"
-                report += f"  Reference: {result.clause_reference}\n"
+                write(f"• {check_name.upper()}:\n")
+                write(f"  Issue: {result.description}\n")
+                write(f"  Reference: {result.clause_reference}\n")
                 if result.actual_value is not None and result.required_value is not None:
-                    report += f"  Actual: {result.actual_value}, Required: {result.required_value}\n"
+                    write(f"  Actual: {result.actual_value}, Required: {result.required_value}\n")
                 if result.remarks:
-                    report += f"  Remarks: {result.remarks}\n"
-                report += "\n"
+                    write(f"  Remarks: {result.remarks}\n")
+                write("\n")
         
         if compliant_checks:
-            report += "PASSED CHECKS:\n"
-            report += "-" * 50 + "\n"
+            write("PASSED CHECKS:\n")
+            write("-" * 50 + "\n")
             for check_name in compliant_checks:
                 result = results[check_name]
-                report += f"• {check_name.upper()}: {result.description}\n"
-        
-        return report
+                write(f"• {check_name.upper()}: {result.description}\n")
+    
+    def generate_compliance_report(self, results: Dict[str, CheckResult]) -> str:
+        """Generate a comprehensive compliance report"""
+        out = io.StringIO()
+        self.write_compliance_report(results, out)
+        return out.getvalue()
 
 # Example usage and test cases
 def example_beam_check():
@@ -0,0 +1,104 @@
+"""
+IS code compliance checkers.
+
+    IS.IS_456_2000  IS 456:2000 design checks (material, durability, flexure,
+                    shear, deflection, detailing)
+    IS.SP_34        SP 34:1987 reinforcement detailing checks
+    IS.member_store Struct-of-arrays storage for large building models
+    IS.reporting    Streaming compliance reports (text, markdown, JSONL, CSV, HTML)
+    IS.vectorized   NumPy versions of the IS 456:2000 capacity calculations
+    IS.optimizer    Lightest compliant reinforcement search for beams and slabs
+    IS.bbs          Bar bending schedule and steel quantity takeoff
+    IS.tolerance    Monte Carlo tolerance analysis of member checks
+    IS.load_combinations  Table 18 load combinations and moment/shear envelopes
+    IS.analysis     Continuous beam and two-way slab design moments and shears
+
+Submodules and the checker classes listed in __all__ are loaded on first
+access, so ``from IS import ShearCompliance`` imports IS_456_2000 only and
+``from IS import DetailingChecker`` imports SP_34 only. The enums
+(MemberType, SteelGrade, ConcreteGrade, ExposureCondition) differ between the
+two codes, so import them from the submodule you are using.
+"""
+
+import importlib
+
+_SUBMODULES = ("IS_456_2000", "SP_34", "member_store", "reporting", "vectorized", "optimizer",
+               "bbs", "tolerance", "load_combinations", "analysis")
+
+_EXPORTS = {
+    # IS 456:2000
+    "Material": "IS_456_2000",
+    "Loads": "IS_456_2000",
+    "Dimensions": "IS_456_2000",
+    "Reinforcement": "IS_456_2000",
+    "MaterialCompliance": "IS_456_2000",
+    "DurabilityCompliance": "IS_456_2000",
+    "FlexuralCompliance": "IS_456_2000",
+    "ShearCompliance": "IS_456_2000",
+    "DeflectionCompliance": "IS_456_2000",
+    "ReinforcementDetailing": "IS_456_2000",
+    "DesignChecker": "IS_456_2000",
+    # SP 34:1987
+    "ReinforcementBar": "SP_34",
+    "MemberGeometry": "SP_34",
+    "CheckResult": "SP_34",
+    "DetailingTables": "SP_34",
+    "SpacingChecker": "SP_34",
+    "DevelopmentLengthCalculator": "SP_34",
+    "AnchorageChecker": "SP_34",
+    "LapSpliceChecker": "SP_34",
+    "BeamDetailingChecker": "SP_34",
+    "ColumnDetailingChecker": "SP_34",
+    "SlabDetailingChecker": "SP_34",
+    "FootingDetailingChecker": "SP_34",
+    "DuctileDetailingChecker": "SP_34",
+    "DetailingChecker": "SP_34",
+    # Compact storage
+    "MemberStore": "member_store",
+    "MemberView": "member_store",
+    "BarStore": "member_store",
+    # Reports
+    "ReportRow": "reporting",
+    "ReportWriter": "reporting",
+    "write_reports": "reporting",
+    # Reinforcement optimizer
+    "BeamLayout": "optimizer",
+    "SlabLayout": "optimizer",
+    "optimize_beams": "optimizer",
+    "optimize_slabs": "optimizer",
+    "optimize_store": "optimizer",
+    # Quantity takeoff
+    "BarBendingSchedule": "bbs",
+    "takeoff": "bbs",
+    # Tolerance analysis
+    "Tolerance": "tolerance",
+    "ToleranceResult": "tolerance",
+    # Load combinations
+    "Envelope": "load_combinations",
+    "envelope": "load_combinations",
+    "store_envelope": "load_combinations",
+    # Structural analysis
+    "SpanForces": "analysis",
+    "analyse_beams": "analysis",
+    "continuous_beams": "analysis",
+    "coefficient_beams": "analysis",
+    "slab_moments": "analysis",
+}
+
+__all__ = list(_SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,392 @@
+"""
+Design moments and shears of continuous beams and two-way slabs.
+
+DesignChecker.check_compliance approximates a member as a single span
+(IS_456_2000.udl_demands: w L² / 8 simply supported, w L² / 10 continuous,
+w L² / 2 cantilever). This module gives the demands of whole floors:
+
+--Continuous beams, stiffness method: the beams of a floor with the same
+  number of spans form one sparse system of support rotations, solved once
+  for the dead load on all spans and for the imposed load on each span
+  position. The envelope of
+  IS 456 Clause 22.4.1 pattern loading is the dead load response plus the
+  adverse imposed load responses, evaluated at stations along each span.
+--Continuous beams, coefficients: IS 456 Table 12 (moments) and Table 13
+  (shears) for beams of three or more spans that differ by no more than 15
+  percent of the longest (Clause 22.5.1).
+--Two-way slabs: IS 456 Annex D, Table 26 for restrained panels and Table 27
+  for simply supported panels without corner restraint.
+
+Beams are given as flat per-span arrays: beam (an id per span, the spans of a
+beam next to each other and in order), span (mm), dead and live UDL (kN/m,
+unfactored). The system is solved with scipy.sparse when SciPy is installed
+and with a tridiagonal solve in NumPy otherwise.
+
+Units: spans in mm, loads in kN/m (kN/m² for slabs), moments in kNm (per
+metre width for slabs), shears in kN.
+
+Usage Example
+
+forces = continuous_beams(beam=[0, 0, 0, 1, 1], span=[5000, 6000, 5000, 4000, 4500],
+                          dead=[20, 20, 20, 15, 15], live=[12, 12, 12, 10, 10])
+forces.design_moment, forces.design_shear            # per span
+checker.check_compliance(..., design_moment=forces.design_moment[1],
+                         design_shear=forces.design_shear[1])
+
+coefficient_beams(beam, span, dead, live)            # Table 12 / 13
+slab_moments(lx=4000, ly=5000, w=12.5, case='two_adjacent_edges')
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+except ImportError:  # SciPy is optional; the NumPy tridiagonal solve is used instead
+    sparse = None
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+DEAD_FACTOR = 1.5
+LIVE_FACTOR = 1.5
+STATIONS = 21             # points per span at which the pattern envelope is evaluated
+SPAN_TOLERANCE = 0.15     # Clause 22.5.1: spans within 15 percent of the longest
+
+# Table 12: (dead, imposed) moment coefficients of w L²
+SPAN_MOMENT_COEFFICIENTS = {'end_span': (1 / 12, 1 / 10), 'interior_span': (1 / 16, 1 / 12)}
+SUPPORT_MOMENT_COEFFICIENTS = {'next_to_end': (-1 / 10, -1 / 9), 'interior': (-1 / 12, -1 / 9)}
+
+# Table 13: (dead, imposed) shear coefficients of w L
+SHEAR_COEFFICIENTS = {
+    'end_support': (0.40, 0.45),
+    'next_to_end_outer': (0.60, 0.60),
+    'next_to_end_inner': (0.55, 0.60),
+    'interior': (0.50, 0.60),
+}
+
+# Table 26: restrained two-way slabs. Short span (negative, positive) rows for
+# ly/lx in SLAB_RATIOS, then the long span (negative, positive) coefficients,
+# which do not depend on ly/lx; 0 where the edge is discontinuous.
+SLAB_RATIOS = (1.0, 1.1, 1.2, 1.3, 1.4, 1.5, 1.75, 2.0)
+SLAB_COEFFICIENTS = {
+    'interior': (
+        (0.032, 0.037, 0.043, 0.047, 0.051, 0.053, 0.060, 0.065),
+        (0.024, 0.028, 0.032, 0.036, 0.039, 0.041, 0.045, 0.049), 0.032, 0.024),
+    'one_short_edge': (
+        (0.037, 0.043, 0.048, 0.051, 0.055, 0.057, 0.064, 0.068),
+        (0.028, 0.032, 0.036, 0.039, 0.041, 0.044, 0.048, 0.052), 0.037, 0.028),
+    'one_long_edge': (
+        (0.037, 0.044, 0.052, 0.057, 0.063, 0.067, 0.077, 0.085),
+        (0.028, 0.033, 0.039, 0.044, 0.047, 0.051, 0.059, 0.065), 0.037, 0.028),
+    'two_adjacent_edges': (
+        (0.047, 0.053, 0.060, 0.065, 0.071, 0.075, 0.084, 0.091),
+        (0.035, 0.040, 0.045, 0.049, 0.053, 0.056, 0.063, 0.069), 0.047, 0.035),
+    'two_short_edges': (
+        (0.045, 0.049, 0.052, 0.056, 0.059, 0.060, 0.065, 0.069),
+        (0.035, 0.037, 0.040, 0.043, 0.044, 0.045, 0.049, 0.052), 0, 0.035),
+    'two_long_edges': (
+        (0, 0, 0, 0, 0, 0, 0, 0),
+        (0.035, 0.043, 0.051, 0.057, 0.063, 0.068, 0.080, 0.088), 0.045, 0.035),
+    'three_edges_long_continuous': (
+        (0.057, 0.064, 0.071, 0.076, 0.080, 0.084, 0.091, 0.097),
+        (0.043, 0.048, 0.053, 0.057, 0.060, 0.064, 0.069, 0.073), 0, 0.043),
+    'three_edges_short_continuous': (
+        (0, 0, 0, 0, 0, 0, 0, 0),
+        (0.043, 0.051, 0.059, 0.065, 0.071, 0.076, 0.087, 0.096), 0.057, 0.043),
+    'four_edges': (
+        (0, 0, 0, 0, 0, 0, 0, 0),
+        (0.056, 0.064, 0.072, 0.079, 0.085, 0.089, 0.100, 0.107), 0, 0.056),
+}
+
+# Table 27: simply supported slabs, corners free to lift; (short, long) span rows
+SIMPLY_SUPPORTED_RATIOS = (1.0, 1.1, 1.2, 1.3, 1.4, 1.5, 1.75, 2.0, 2.5, 3.0)
+SIMPLY_SUPPORTED_COEFFICIENTS = (
+    (0.062, 0.074, 0.084, 0.093, 0.099, 0.104, 0.113, 0.118, 0.122, 0.124),
+    (0.062, 0.061, 0.059, 0.055, 0.051, 0.046, 0.037, 0.029, 0.020, 0.014),
+)
+
+SLAB_CASES = tuple(SLAB_COEFFICIENTS) + ('simply_supported',)
+
+
+@dataclass(slots=True)
+class SpanForces:
+    """Design forces of each span; hogging moments are negative"""
+    beam: np.ndarray
+    span: np.ndarray             # mm
+    span_moment: np.ndarray      # largest sagging moment in the span (kNm)
+    left_moment: np.ndarray      # largest hogging moment at the left support (kNm)
+    right_moment: np.ndarray     # largest hogging moment at the right support (kNm)
+    left_shear: np.ndarray       # largest shear at the left support (kN)
+    right_shear: np.ndarray      # largest shear at the right support (kN)
+
+    def __len__(self) -> int:
+        return len(self.span)
+
+    @property
+    def design_moment(self) -> np.ndarray:
+        """Largest sagging or hogging moment of each span (kNm)"""
+        return np.maximum(self.span_moment, -np.minimum(self.left_moment, self.right_moment))
+
+    @property
+    def design_shear(self) -> np.ndarray:
+        """Largest shear of each span (kN)"""
+        return np.maximum(self.left_shear, self.right_shear)
+
+
+# =============================================================================
+# CONTINUOUS BEAMS
+# =============================================================================
+
+def _layout(beam):
+    """Beam number, first span and position within the beam of every span"""
+    beam = np.asarray(beam)
+    if beam.ndim != 1 or len(beam) == 0:
+        raise ValueError("beam must be a non-empty 1-D array with one id per span")
+    starts = np.flatnonzero(np.r_[True, beam[1:] != beam[:-1]])
+    number = np.cumsum(np.r_[True, beam[1:] != beam[:-1]]) - 1
+    if len(np.unique(beam)) != len(starts):
+        raise ValueError("The spans of each beam must be next to each other")
+    position = np.arange(len(beam)) - starts[number]
+    return number, starts, position
+
+
+def _thomas(lower, diagonal, upper, rhs):
+    """Solve a tridiagonal system for every column of rhs"""
+    n = len(diagonal)
+    c = np.zeros(n)
+    d = np.zeros_like(rhs)
+    c[0] = upper[0] / diagonal[0] if n > 1 else 0.0
+    d[0] = rhs[0] / diagonal[0]
+    for i in range(1, n):
+        m = diagonal[i] - lower[i - 1] * c[i - 1]
+        if i < n - 1:
+            c[i] = upper[i] / m
+        d[i] = (rhs[i] - lower[i - 1] * d[i - 1]) / m
+    for i in range(n - 2, -1, -1):
+        d[i] -= c[i] * d[i + 1]
+    return d
+
+
+def _solve_rotations(left, right, k, fixed, rhs):
+    """Support rotations from span stiffnesses k = EI/L, one column per load case"""
+    n = len(fixed)
+    diagonal = np.zeros(n)
+    np.add.at(diagonal, left, 4 * k)
+    np.add.at(diagonal, right, 4 * k)
+    coupling = np.zeros(n - 1)
+    coupling[left] = 2 * k                 # right == left + 1 for every span
+    coupling[fixed[:-1] | fixed[1:]] = 0.0
+    diagonal[fixed] = 1.0
+    rhs = np.where(fixed[:, None], 0.0, rhs)
+    if sparse is None:
+        return _thomas(coupling, diagonal, coupling, rhs)
+    stiffness = sparse.diags([coupling, diagonal, coupling], [-1, 0, 1], format='csc')
+    return splu(stiffness).solve(rhs)
+
+
+def continuous_beams(beam, span, dead, live, stiffness=1.0, left_fixed=False,
+                     right_fixed=False, dead_factor: float = DEAD_FACTOR,
+                     live_factor: float = LIVE_FACTOR, stations: int = STATIONS) -> SpanForces:
+    """
+    Pattern loading envelope of continuous beams by the stiffness method.
+
+    stiffness is EI of each span (only ratios matter); left_fixed and
+    right_fixed are scalars or one value per beam, for ends built into a
+    wall or column stiff enough to prevent rotation. Supports are rigid.
+
+    Beams with the same number of spans are solved together, so the load
+    cases of each group are only as many as its beams have spans, and one
+    long beam does not widen the case arrays of every other span.
+    """
+    number, starts, _ = _layout(beam)
+    beams = len(starts)
+    L = np.asarray(span, dtype=float) / 1000
+    wd = dead_factor * np.broadcast_to(np.asarray(dead, dtype=float), L.shape)
+    wl = live_factor * np.broadcast_to(np.asarray(live, dtype=float), L.shape)
+    k = np.broadcast_to(np.asarray(stiffness, dtype=float), L.shape) / L
+    left_fixed = np.broadcast_to(left_fixed, beams)
+    right_fixed = np.broadcast_to(right_fixed, beams)
+    count = np.diff(np.r_[starts, len(L)])
+
+    forces = [np.empty(len(L)) for _ in range(5)]
+    for n in np.unique(count):
+        group = np.flatnonzero(count == n)
+        spans = (starts[group][:, None] + np.arange(n)).ravel()
+        envelope = _pattern_envelope(L[spans], wd[spans], wl[spans], k[spans], int(n),
+                                     left_fixed[group], right_fixed[group], stations)
+        for out, values in zip(forces, envelope):
+            out[spans] = values
+    return SpanForces(np.asarray(beam), np.asarray(span, dtype=float), *forces)
+
+
+def _pattern_envelope(L, wd, wl, k, n, left_fixed, right_fixed, stations):
+    """
+    (span moment, left moment, right moment, left shear, right shear) of
+    beams of n spans each, their spans in order one beam after another
+    """
+    beams = len(L) // n
+    position = np.tile(np.arange(n), beams)
+
+    # Node of each support: the spans of beam b have nodes shifted by b
+    left = np.arange(len(L)) + np.repeat(np.arange(beams), n)
+    right = left + 1
+    fixed = np.zeros(len(L) + beams, dtype=bool)
+    fixed[np.arange(beams) * (n + 1)] = left_fixed
+    fixed[np.arange(beams) * (n + 1) + n] = right_fixed
+
+    # Case 0: dead load on every span; case p + 1: imposed load on span position p
+    w = np.zeros((len(L), n + 1))
+    w[:, 0] = wd
+    w[np.arange(len(L)), position + 1] = wl
+    fem = w * (L ** 2 / 12)[:, None]
+    rhs = np.zeros((len(fixed), n + 1))
+    np.add.at(rhs, left, fem)
+    np.add.at(rhs, right, -fem)
+    theta = _solve_rotations(left, right, k, fixed, rhs)
+
+    # Span end moments, sagging positive, and end shears of every case
+    kk = k[:, None]
+    m_left = kk * (4 * theta[left] + 2 * theta[right]) - fem
+    m_right = -(kk * (2 * theta[left] + 4 * theta[right]) + fem)
+    v_left = w * L[:, None] / 2 + (m_right - m_left) / L[:, None]
+    v_right = v_left - w * L[:, None]
+
+    def adverse(values, sign):
+        """Dead load response plus every imposed load case that adds to it in sign"""
+        live_cases = values[:, 1:]
+        return values[:, 0] + (np.clip(live_cases, 0, None) if sign > 0
+                               else np.clip(live_cases, None, 0)).sum(axis=1)
+
+    # Largest sagging moment along the span, one station at a time
+    span_moment = np.full(len(L), -np.inf)
+    for t in np.linspace(0.0, 1.0, stations):
+        x = L * t
+        moment = m_left * (1 - t) + m_right * t + w * (x * (L - x) / 2)[:, None]
+        span_moment = np.maximum(span_moment, adverse(moment, 1))
+    return (span_moment,
+            np.minimum(adverse(m_left, -1), 0.0), np.minimum(adverse(m_right, -1), 0.0),
+            np.abs(adverse(v_left, 1)), np.abs(adverse(v_right, -1)))
+
+
+def coefficients_apply(beam, span) -> np.ndarray:
+    """Per span: whether its beam qualifies for Tables 12 and 13 (Clause 22.5.1)"""
+    number, starts, _ = _layout(beam)
+    span = np.asarray(span, dtype=float)
+    count = np.diff(np.r_[starts, len(span)])
+    longest = np.maximum.reduceat(span, starts)
+    shortest = np.minimum.reduceat(span, starts)
+    ok = (count >= 3) & (longest - shortest <= SPAN_TOLERANCE * longest)
+    return ok[number]
+
+
+def coefficient_beams(beam, span, dead, live, dead_factor: float = DEAD_FACTOR,
+                      live_factor: float = LIVE_FACTOR) -> SpanForces:
+    """
+    Design forces from the Table 12 and Table 13 coefficients. Support
+    moments use the mean of the two spans meeting there. Raises ValueError
+    for beams the tables do not cover (see coefficients_apply).
+    """
+    if not coefficients_apply(beam, span).all():
+        raise ValueError("Tables 12 and 13 need three or more spans within "
+                         f"{SPAN_TOLERANCE:.0%} of the longest; use continuous_beams")
+    number, starts, position = _layout(beam)
+    L = np.asarray(span, dtype=float) / 1000
+    wd = dead_factor * np.broadcast_to(np.asarray(dead, dtype=float), L.shape)
+    wl = live_factor * np.broadcast_to(np.asarray(live, dtype=float), L.shape)
+    count = np.diff(np.r_[starts, len(L)])[number]
+    first, last = position == 0, position == count - 1
+
+    def pick(table, choices):
+        """(dead, imposed) coefficient arrays from (condition, table key) pairs"""
+        conditions = [condition for condition, _ in choices]
+        return tuple(np.select(conditions, [table[key][i] for _, key in choices])
+                     for i in range(2))
+
+    def combine(coefficients, length):
+        return coefficients[0] * wd * length + coefficients[1] * wl * length
+
+    end_span = first | last
+    span_c = pick(SPAN_MOMENT_COEFFICIENTS, [(end_span, 'end_span'), (~end_span, 'interior_span')])
+    previous = np.where(first, L, np.roll(L, 1))
+    following = np.where(last, L, np.roll(L, -1))
+    # Support p is on the left of span p; supports 1 and count - 1 are next to the ends
+    left_next = (position == 1) | (position == count - 1)
+    right_next = (position == 0) | (position == count - 2)
+    left_c = pick(SUPPORT_MOMENT_COEFFICIENTS, [(left_next, 'next_to_end'),
+                                                (~left_next, 'interior')])
+    right_c = pick(SUPPORT_MOMENT_COEFFICIENTS, [(right_next, 'next_to_end'),
+                                                 (~right_next, 'interior')])
+    left_moment = np.where(first, 0.0, combine(left_c, ((L + previous) / 2) ** 2))
+    right_moment = np.where(last, 0.0, combine(right_c, ((L + following) / 2) ** 2))
+
+    # End spans take the outer-side shear of the support next to the end support
+    left_v = pick(SHEAR_COEFFICIENTS, [(first, 'end_support'), (last, 'next_to_end_outer'),
+                                       (position == 1, 'next_to_end_inner'),
+                                       (position > 1, 'interior')])
+    right_v = pick(SHEAR_COEFFICIENTS, [(last, 'end_support'), (first, 'next_to_end_outer'),
+                                        (position == count - 2, 'next_to_end_inner'),
+                                        (position < count - 2, 'interior')])
+    return SpanForces(np.asarray(beam), np.asarray(span, dtype=float),
+                      combine(span_c, L ** 2), left_moment, right_moment,
+                      combine(left_v, L), combine(right_v, L))
+
+
+def analyse_beams(beam, span, dead, live, **kwargs) -> SpanForces:
+    """Table 12 / 13 forces where Clause 22.5.1 allows them, stiffness method elsewhere"""
+    forces = continuous_beams(beam, span, dead, live, **kwargs)
+    tabulated = coefficients_apply(beam, span)
+    if not tabulated.any():
+        return forces
+    kwargs = {k: v for k, v in kwargs.items() if k in ('dead_factor', 'live_factor')}
+    idx = np.flatnonzero(tabulated)
+    table = coefficient_beams(np.asarray(beam)[idx], np.asarray(span)[idx],
+                              np.broadcast_to(dead, len(tabulated))[idx],
+                              np.broadcast_to(live, len(tabulated))[idx], **kwargs)
+    for name in ('span_moment', 'left_moment', 'right_moment', 'left_shear', 'right_shear'):
+        getattr(forces, name)[idx] = getattr(table, name)
+    return forces
+
+
+# =============================================================================
+# TWO-WAY SLABS
+# =============================================================================
+
+def slab_moments(lx, ly, w, case: str = 'interior') -> Tuple[np.ndarray, ...]:
+    """
+    (short negative, short positive, long negative, long positive) moments
+    per metre width of two-way slabs - Annex D. lx and ly are the short and
+    long spans (mm), w the factored load (kN/m²); negative moments are
+    returned as hogging (< 0), 0 at discontinuous edges. Raises ValueError
+    for ly/lx beyond the table (2 for Table 26, 3 for Table 27): such panels
+    span one way.
+    """
+    lx = np.asarray(lx, dtype=float)
+    ratio = np.asarray(ly, dtype=float) / lx
+    if np.any(ratio < 1):
+        raise ValueError("lx must be the shorter span")
+    limit = SIMPLY_SUPPORTED_RATIOS[-1] if case == 'simply_supported' else SLAB_RATIOS[-1]
+    if np.any(ratio > limit + 1e-9):
+        raise ValueError(f"ly/lx up to {np.max(ratio):.2f} exceeds {limit:g}: "
+                         "design such panels as one-way slabs")
+    wlx2 = np.asarray(w, dtype=float) * (lx / 1000) ** 2
+    if case == 'simply_supported':
+        short, long = (np.interp(ratio, SIMPLY_SUPPORTED_RATIOS, row)
+                       for row in SIMPLY_SUPPORTED_COEFFICIENTS)
+        zero = np.zeros_like(wlx2)
+        return zero, short * wlx2, zero, long * wlx2
+    if case not in SLAB_COEFFICIENTS:
+        raise ValueError(f"Unknown slab case {case!r}. Available: {list(SLAB_CASES)}")
+    negative, positive, long_negative, long_positive = SLAB_COEFFICIENTS[case]
+    return (-np.interp(ratio, SLAB_RATIOS, negative) * wlx2,
+            np.interp(ratio, SLAB_RATIOS, positive) * wlx2,
+            -long_negative * wlx2, long_positive * wlx2)
+
+
+def slab_shear(lx, w) -> np.ndarray:
+    """Shear per metre width (kN) at the long edges of a two-way slab - Clause 24.5"""
+    return np.asarray(w, dtype=float) * np.asarray(lx, dtype=float) / 1000 / 2
@@ -0,0 +1,230 @@
+"""
+Bar bending schedule and steel quantity takeoff (SP 34:1987).
+
+Works on the columns of a BarStore, so a building-wide schedule is a handful
+of NumPy operations rather than a loop over ReinforcementBar objects:
+
+--Cut length: straight length + hook allowances (DetailingTables.get_anchorage_values)
+              + laps where a bar is longer than the stock length
+              (LapSpliceChecker.calculate_lap_length) - bend deductions
+--Unit weight: d²/162 kg/m
+--Totals: per bar row, per diameter, per member and per sheet
+
+Lap lengths are computed once per distinct (diameter, fy, fck, bar type) with
+the scalar SP 34 calculator and broadcast back to the rows.
+
+Usage Example
+
+schedule = takeoff(bars, members=store, hooks=2, hook_type="u_hook")
+schedule.total_weight / 1000               # tonnes
+schedule.by_diameter()                     # {diameter: (length m, weight kg)}
+schedule.by_sheet(sheet_of_member)         # {sheet: weight kg}
+with open("bbs.csv", "w", newline="") as out:
+    schedule.write_csv(out)
+"""
+
+import csv
+from typing import Dict, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+from .SP_34 import ConcreteGrade, DetailingTables, LapSpliceChecker, SteelGrade
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+STOCK_LENGTH = 12000  # mm, standard bar length supplied by mills
+
+# Bend deductions in bar diameters per bend (IS 2502 practice)
+BEND_DEDUCTION = {45: 1, 90: 2, 135: 3, 180: 4}
+
+HOOK_TYPES = ('none', 'u_hook', '90_bend')
+
+ArrayLike = Union[float, int, str, Sequence, np.ndarray]
+
+
+def hook_allowance(diameter, hook_type: str = 'u_hook'):
+    """Extra length per hook (mm) - SP 34:1987, Table 4.1 anchorage values"""
+    values = DetailingTables.get_anchorage_values()
+    if hook_type == 'u_hook':
+        factor = values['u_hook']
+    elif hook_type == '90_bend':
+        factor = 2 * values['90_bend']  # 4 x diameter per 45°
+    elif hook_type == 'none':
+        factor = 0
+    else:
+        raise ValueError(f"Unknown hook type {hook_type!r}. Available: {HOOK_TYPES}")
+    return factor * np.asarray(diameter, dtype=float)
+
+
+def lap_lengths(diameter, fy, fck, is_deformed, splice_type: str = "flexural_tension"):
+    """Lap length (mm) of each bar row, from LapSpliceChecker per distinct combination"""
+    columns = np.broadcast_arrays(*(np.ravel(np.asarray(x, dtype=float))
+                                    for x in (diameter, fy, fck, is_deformed)))
+    # One integer code per combination, so np.unique works on a flat int64 array
+    code = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        unique, inverse = np.unique(column, return_inverse=True)
+        code = code * len(unique) + inverse
+    _, first, inverse = np.unique(code, return_index=True, return_inverse=True)
+    laps = [LapSpliceChecker.calculate_lap_length(
+                dia, SteelGrade(int(fy_)), ConcreteGrade(int(fck_)), splice_type, bool(deformed))
+            for dia, fy_, fck_, deformed in zip(*(column[first] for column in columns))]
+    return np.asarray(laps, dtype=float)[inverse]
+
+
+def _per_row(value: ArrayLike, n: int, dtype=float) -> np.ndarray:
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,))
+
+
+# =============================================================================
+# SCHEDULE
+# =============================================================================
+
+class BarBendingSchedule:
+    """Cut lengths and weights of every bar row of a BarStore"""
+
+    def __init__(self, member, diameter, number, cut_length, laps, pieces, position=None,
+                 position_names=()):
+        self.member = member
+        self.diameter = diameter
+        self.number = number
+        self.cut_length = cut_length            # mm, one bar including laps and hooks
+        self.laps = laps                        # laps per bar
+        self.pieces = pieces                    # stock bars per bar
+        self.unit_weight = diameter ** 2 / 162  # kg/m
+        self.total_length = number * cut_length / 1000  # m
+        self.weight = self.total_length * self.unit_weight  # kg
+        self.position = position                # codes into position_names
+        self.position_names = list(position_names)
+
+    def __len__(self) -> int:
+        return len(self.diameter)
+
+    @property
+    def total_weight(self) -> float:
+        """Total steel (kg)"""
+        return float(self.weight.sum())
+
+    def _group(self, keys) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        length = np.bincount(inverse, weights=self.total_length, minlength=len(unique))
+        weight = np.bincount(inverse, weights=self.weight, minlength=len(unique))
+        return unique, length, weight
+
+    def by_diameter(self) -> Dict[float, Tuple[float, float]]:
+        """{diameter: (total length m, weight kg)}"""
+        unique, length, weight = self._group(self.diameter)
+        return {float(d): (float(l), float(w)) for d, l, w in zip(unique, length, weight)}
+
+    def by_member(self) -> Dict[int, float]:
+        """{member index: weight kg}"""
+        unique, _, weight = self._group(self.member)
+        return {int(m): float(w) for m, w in zip(unique, weight)}
+
+    def by_sheet(self, sheet_of_member: Sequence[str]) -> Dict[str, float]:
+        """{sheet: weight kg}, given the sheet label of every member index"""
+        sheets = np.asarray(sheet_of_member)[self.member]
+        unique, _, weight = self._group(sheets)
+        return {str(s): float(w) for s, w in zip(unique, weight)}
+
+    def by_member_and_diameter(self) -> Dict[Tuple[int, float], float]:
+        """{(member index, diameter): weight kg} - the usual BBS summary table"""
+        keys = self.member.astype(np.int64) * 1000 + np.round(self.diameter).astype(np.int64)
+        unique, _, weight = self._group(keys)
+        return {(int(k // 1000), float(k % 1000)): float(w) for k, w in zip(unique, weight)}
+
+    def write_csv(self, out: TextIO):
+        """Write one BBS line per bar row"""
+        writer = csv.writer(out)
+        writer.writerow(['bar_mark', 'member', 'position', 'diameter_mm', 'number',
+                         'cut_length_mm', 'laps', 'total_length_m', 'unit_weight_kg_m',
+                         'weight_kg'])
+        for i in range(len(self)):
+            writer.writerow([
+                i + 1, int(self.member[i]),
+                self.position_names[self.position[i]] if self.position is not None else '',
+                f"{self.diameter[i]:g}", int(self.number[i]), f"{self.cut_length[i]:.0f}",
+                int(self.laps[i]), f"{self.total_length[i]:.2f}", f"{self.unit_weight[i]:.3f}",
+                f"{self.weight[i]:.2f}"])
+
+    def write_summary(self, out: TextIO):
+        """Weight per diameter and total, as a plain text table"""
+        out.write(f"{'Dia (mm)':>9} {'Length (m)':>12} {'Weight (kg)':>12}\n")
+        for dia, (length, weight) in self.by_diameter().items():
+            out.write(f"{dia:>9g} {length:>12.1f} {weight:>12.1f}\n")
+        out.write(f"{'Total':>9} {self.total_length.sum():>12.1f} {self.total_weight:>12.1f}"
+                  f"  ({self.total_weight / 1000:.3f} t)\n")
+
+
+def takeoff(bars, members=None, fy: ArrayLike = 415, fck: ArrayLike = 25,
+            hooks: ArrayLike = 0, hook_type: str = 'u_hook', bends_90: ArrayLike = 0,
+            bends_45: ArrayLike = 0, stock_length: float = STOCK_LENGTH,
+            splice_type: str = "flexural_tension", width: ArrayLike = None,
+            cover: ArrayLike = 0) -> BarBendingSchedule:
+    """
+    Build the bar bending schedule of a BarStore.
+
+    Args:
+        bars: BarStore; `length` is the developed straight length of one bar (mm)
+        members: Optional MemberStore the bars' member indices refer to. When
+            given, fy/fck come from the members and rows with number 0 and a
+            spacing get their count from the member width and cover.
+        fy, fck: Steel and concrete grade (scalar or one value per bar row)
+        hooks: Hooks per bar (0, 1 or 2; scalar or per row)
+        hook_type: 'u_hook', '90_bend' or 'none'
+        bends_90, bends_45: Bends per bar, deducted from the cut length
+        stock_length: Longest bar that can be supplied; longer bars are lapped
+        splice_type: Passed to LapSpliceChecker.calculate_lap_length
+        width, cover: Member width and cover (mm, scalar or per row) that
+            rows with number 0 and a spacing are counted across when members
+            is not given. Raises ValueError for such rows without either.
+
+    Returns:
+        BarBendingSchedule
+    """
+    n = len(bars)
+    member = bars.column('member').astype(np.int64)
+    diameter = bars.column('diameter').astype(float)
+    number = bars.column('number').astype(float)
+    spacing = bars.column('spacing').astype(float)
+    length = bars.column('length').astype(float)
+    is_deformed = bars.column('is_deformed')
+
+    if members is not None:
+        fy = members.column('fy')[member]
+        fck = members.column('fck')[member]
+        width = members.column('width')[member]
+        cover = members.column('cover')[member]
+
+    # Distribution bars given only as a spacing: count across the member width
+    counted = (number == 0) & (spacing > 0)
+    if counted.any():
+        if width is None:
+            raise ValueError(f"{int(counted.sum())} bar row(s) have a spacing but no number; "
+                             "pass members or width to count them")
+        clear_width = _per_row(width, n) - 2 * _per_row(cover, n)
+        number = np.where(counted, np.floor(clear_width / np.where(counted, spacing, 1)) + 1,
+                          number)
+
+    fy = _per_row(fy, n)
+    fck = _per_row(fck, n)
+    lap = lap_lengths(diameter, fy, fck, is_deformed, splice_type) if n else np.zeros(0)
+
+    # Bars longer than a stock bar are made of pieces joined by laps:
+    # pieces * stock - (pieces - 1) * lap >= length
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pieces = np.where(length > stock_length,
+                          np.ceil((length - lap) / (stock_length - lap)), 1)
+    if np.any(lap >= stock_length):
+        raise ValueError("Lap length exceeds the stock length")
+    laps = pieces - 1
+
+    deductions = (_per_row(bends_90, n) * BEND_DEDUCTION[90]
+                  + _per_row(bends_45, n) * BEND_DEDUCTION[45]) * diameter
+    cut_length = (length + laps * lap
+                  + _per_row(hooks, n) * hook_allowance(diameter, hook_type) - deductions)
+
+    return BarBendingSchedule(member, diameter, number, cut_length, laps.astype(np.int64),
+                              pieces.astype(np.int64), bars.column('position'), bars.positions)
@@ -0,0 +1,148 @@
+"""
+IS 456:2000 Table 18 load combinations evaluated over whole building models.
+
+The combinations are those of IS_456_2000.LOAD_COMBINATIONS (Loads uses the
+same table one member at a time). Basic load cases are the columns of a
+(members x cases) array; each case is dead, live, wind or earthquake load,
+and a model may have several of a kind - wind along x and along y, say. Dead
+and live cases are factored together; each wind or earthquake case forms its
+own combinations in both directions. One matrix product gives every
+combination of every member, and the moment and shear envelopes follow from
+the same single-span demands as the checker (IS_456_2000.udl_demands).
+
+Units: loads in kN/m, spans in mm, moments in kNm, shears in kN.
+
+Usage Example
+
+loads = np.array([[15, 10, 4, 0], [20, 12, 0, 6]])       # DL, LL, WL, EL of two beams
+env = envelope(loads, span=[5000, 6000])
+env.design_moment, env.shear                              # kNm, kN per beam
+env.governing(0)                                          # ('DL+LL', 'DL+LL')
+
+# Two wind directions
+env = envelope(loads6, span, kinds=('dead', 'dead', 'live', 'wind', 'wind', 'earthquake'),
+               case_names=('SW', 'FF', 'LL', 'WX', 'WY', 'EQ'))
+
+# Every member of a MemberStore building model
+env = store_envelope(store)
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .IS_456_2000 import LOAD_COMBINATIONS, udl_demands
+
+LOAD_KINDS = ('dead', 'live', 'wind', 'earthquake')   # order of the Table 18 factors
+LATERAL_KINDS = ('wind', 'earthquake')
+
+
+def combination_matrix(kinds: Sequence[str] = LOAD_KINDS,
+                       case_names: Optional[Sequence[str]] = None,
+                       limit_state: str = 'collapse') -> Tuple[List[str], np.ndarray]:
+    """
+    Names and (combinations x cases) factors of the Table 18 combinations
+    for basic load cases of the given kinds. A combination with wind or
+    earthquake load is repeated for each case of that kind when there is more
+    than one, named e.g. 'DL+WL[WX]'.
+    """
+    unknown = set(kinds) - set(LOAD_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown load kind(s) {sorted(unknown)}. Available: {list(LOAD_KINDS)}")
+    if limit_state not in LOAD_COMBINATIONS:
+        raise ValueError(f"Unknown limit state {limit_state!r}. "
+                         f"Available: {list(LOAD_COMBINATIONS)}")
+    case_names = list(case_names or kinds)
+    kind_index = np.array([LOAD_KINDS.index(kind) for kind in kinds])
+    names, rows = [], []
+    for name, factors in LOAD_COMBINATIONS[limit_state].items():
+        factors = np.asarray(factors, dtype=float)
+        lateral = [k for k in LATERAL_KINDS if factors[LOAD_KINDS.index(k)]]
+        if not lateral:
+            names.append(name)
+            rows.append(factors[kind_index])
+            continue
+        cases = [i for i, kind in enumerate(kinds) if kind == lateral[0]]
+        for case in cases:
+            row = factors[kind_index]
+            row[[i for i in cases if i != case]] = 0.0
+            names.append(name if len(cases) == 1 else f"{name}[{case_names[case]}]")
+            rows.append(row)
+    return names, np.array(rows).reshape(len(rows), len(kinds))
+
+
+def factored_loads(loads, kinds: Sequence[str] = LOAD_KINDS, case_names=None,
+                   limit_state: str = 'collapse') -> Tuple[List[str], np.ndarray]:
+    """Combination names and the (..., combinations) factored loads of (..., cases) loads"""
+    names, factors = combination_matrix(kinds, case_names, limit_state)
+    return names, np.asarray(loads, dtype=float) @ factors.T
+
+
+@dataclass(slots=True)
+class Envelope:
+    """Moment and shear envelopes of a set of members over all combinations"""
+    combinations: List[str]
+    moment_max: np.ndarray          # largest sagging moment (kNm), negative when none sags
+    moment_min: np.ndarray          # largest reversed moment (kNm), positive when none reverses
+    shear: np.ndarray               # largest shear in either direction (kN)
+    moment_combination: np.ndarray  # index into combinations of the design moment
+    shear_combination: np.ndarray   # index into combinations of the design shear
+
+    def __len__(self) -> int:
+        return len(self.shear)
+
+    @property
+    def design_moment(self) -> np.ndarray:
+        """Largest moment in either direction (kNm)"""
+        return np.maximum(self.moment_max, -self.moment_min)
+
+    def governing(self, i: int) -> Tuple[str, str]:
+        """Combinations that govern the moment and the shear of member i"""
+        return (self.combinations[self.moment_combination[i]],
+                self.combinations[self.shear_combination[i]])
+
+
+def envelope(loads, span, support='simply_supported', kinds: Sequence[str] = LOAD_KINDS,
+             case_names=None, limit_state: str = 'collapse') -> Envelope:
+    """
+    Envelopes of members with (members x cases) UDLs on spans in mm.
+    support is a support condition name or an array of them, one per member.
+    """
+    names, w = factored_loads(np.atleast_2d(loads), kinds, case_names, limit_state)
+    span = np.asarray(span, dtype=float).reshape(-1, 1) / 1000
+    conditions, support = np.unique(np.asarray(support).reshape(-1), return_inverse=True)
+    return _envelope(names, *_demands(w, span, conditions, support))
+
+
+def _demands(w: np.ndarray, span: np.ndarray, conditions: Sequence[str],
+             support: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    udl_demands of (members x combinations) loads; support indexes conditions.
+    The demands are linear in w, so the coefficients of each condition come
+    from one call on a unit load and span.
+    """
+    unit = np.array([udl_demands(1.0, 1.0, str(c)) for c in conditions])[support]
+    return w * span ** 2 * unit[:, :1], np.abs(w) * span * unit[:, 1:]
+
+
+def _envelope(names: List[str], moments: np.ndarray, shears: np.ndarray) -> Envelope:
+    rows = np.arange(len(moments))
+    high, low = moments.argmax(axis=1), moments.argmin(axis=1)
+    moment_max, moment_min = moments[rows, high], moments[rows, low]
+    shear_combination = shears.argmax(axis=1)
+    return Envelope(names, moment_max, moment_min, shears[rows, shear_combination],
+                    np.where(moment_max >= -moment_min, high, low), shear_combination)
+
+
+def store_envelope(store, indices: Optional[Sequence[int]] = None,
+                   limit_state: str = 'collapse') -> Envelope:
+    """Envelopes of MemberStore members under their stored UDLs"""
+    from .member_store import LOAD_FIELDS, SUPPORT_CONDITIONS
+
+    idx = np.arange(len(store)) if indices is None else np.asarray(indices)
+    loads = np.column_stack([store.column(name)[idx].astype(float) for name in LOAD_FIELDS])
+    names, w = factored_loads(loads, limit_state=limit_state)
+    span = store.column('length')[idx].astype(float).reshape(-1, 1) / 1000
+    support = store.column('support_condition')[idx]
+    return _envelope(names, *_demands(w, span, SUPPORT_CONDITIONS, support))
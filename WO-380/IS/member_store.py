@@ -0,0 +1,309 @@
+"""
+Compact struct-of-arrays storage for large building models.
+
+A MemberStore keeps every IS 456:2000 member attribute in its own NumPy
+column (float32 values, int8 category codes), about 87 bytes per member
+instead of the ~400 bytes taken by a set of slotted dataclass instances, so a
+200k-member model fits in ~17 MB. Indexing a store returns a MemberView: a two-slot
+handle that builds the per-member dataclasses only when they are asked for.
+
+A BarStore does the same for SP 34:1987 reinforcement bars, with a member
+index column linking every bar row to its member.
+
+Usage Example
+
+store = MemberStore()
+store.append(MemberType.BEAM, dimensions, material, loads,
+             ExposureCondition.MODERATE, reinforcement)
+results = store[0].check(DesignChecker())
+widths = store.column('width')          # NumPy view, no copy
+"""
+
+from dataclasses import MISSING, fields
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .IS_456_2000 import (Dimensions, ExposureCondition, Loads, Material, MemberType,
+                          Reinforcement)
+from .SP_34 import ReinforcementBar
+
+# =============================================================================
+# CATEGORICAL COLUMNS
+# =============================================================================
+
+SUPPORT_CONDITIONS = ('simply_supported', 'continuous', 'cantilever')
+
+MEMBER_TYPES = list(MemberType)
+EXPOSURES = list(ExposureCondition)
+
+DIMENSION_FIELDS = ('length', 'width', 'depth', 'effective_depth', 'cover')
+MATERIAL_FIELDS = ('fck', 'fy', 'gamma_c', 'gamma_s', 'Es')
+LOAD_FIELDS = ('dead_load', 'live_load', 'wind_load', 'earthquake_load')
+REINFORCEMENT_FIELDS = ('main_steel_area', 'distribution_steel_area', 'shear_steel_area',
+                        'main_bar_dia', 'distribution_bar_dia', 'stirrup_dia',
+                        'stirrup_spacing')
+
+VALUE_FIELDS = DIMENSION_FIELDS + MATERIAL_FIELDS + LOAD_FIELDS + REINFORCEMENT_FIELDS
+CODE_FIELDS = ('member_type', 'exposure', 'support_condition')
+
+# Columns left out of from_columns / extend_columns take the dataclass default
+MATERIAL_DEFAULTS = {f.name: f.default for f in fields(Material)
+                     if f.name in MATERIAL_FIELDS and f.default is not MISSING}
+
+
+class _ColumnStore:
+    """Growable set of equal-length NumPy columns."""
+
+    COLUMNS: Dict[str, type] = {}
+    DEFAULTS: Dict[str, float] = {}   # fill value of columns left out of extend_columns
+
+    def __init__(self, capacity: int = 0):
+        self._size = 0
+        self._columns = {name: np.zeros(capacity, dtype=dtype)
+                         for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self._columns.values())))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns (including spare capacity)."""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one column over the stored rows (no copy)."""
+        return self._columns[name][:self._size]
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed > self.capacity:
+            capacity = max(needed, 2 * self.capacity, 64)
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self._columns[name] = grown
+
+    def extend_columns(self, **columns: Sequence) -> range:
+        """
+        Bulk-append rows given as one array per column.
+
+        Columns that are left out are filled with their DEFAULTS value, or
+        zeros. Returns the range of the new row indices.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same length")
+        unknown = set(columns) - set(self._columns)
+        if unknown:
+            raise ValueError(f"Unknown columns: {sorted(unknown)}")
+        n = lengths.pop()
+        self._reserve(n)
+        start = self._size
+        for name, values in columns.items():
+            self._columns[name][start:start + n] = values
+        for name in set(self._columns) - set(columns):
+            self._columns[name][start:start + n] = self.DEFAULTS.get(name, 0)
+        self._size += n
+        return range(start, self._size)
+
+    def trim(self):
+        """Release spare capacity once the store is complete."""
+        for name, column in self._columns.items():
+            self._columns[name] = column[:self._size].copy()
+
+
+# =============================================================================
+# MEMBERS (IS 456:2000)
+# =============================================================================
+
+class MemberStore(_ColumnStore):
+    """Struct-of-arrays container of IS 456:2000 members"""
+
+    COLUMNS = {**{name: np.float32 for name in VALUE_FIELDS},
+               **{name: np.int8 for name in CODE_FIELDS}}
+    DEFAULTS = MATERIAL_DEFAULTS
+
+    def append(self, member_type: MemberType, dimensions: Dimensions, material: Material,
+               loads: Loads, exposure: ExposureCondition, reinforcement: Reinforcement,
+               support_condition: str = 'simply_supported') -> int:
+        """Store one member and return its index"""
+        self._reserve(1)
+        i = self._size
+        columns = self._columns
+        for obj, fields in ((dimensions, DIMENSION_FIELDS), (material, MATERIAL_FIELDS),
+                            (loads, LOAD_FIELDS), (reinforcement, REINFORCEMENT_FIELDS)):
+            for name in fields:
+                columns[name][i] = getattr(obj, name)
+        columns['member_type'][i] = MEMBER_TYPES.index(member_type)
+        columns['exposure'][i] = EXPOSURES.index(exposure)
+        columns['support_condition'][i] = SUPPORT_CONDITIONS.index(support_condition)
+        self._size += 1
+        return i
+
+    @classmethod
+    def from_columns(cls, member_type: Iterable[MemberType], exposure: Iterable[ExposureCondition],
+                     support_condition: Optional[Iterable[str]] = None,
+                     **columns: Sequence) -> 'MemberStore':
+        """Build a store from whole columns (the fast path for large models)"""
+        codes = {
+            'member_type': [MEMBER_TYPES.index(value) for value in member_type],
+            'exposure': [EXPOSURES.index(value) for value in exposure],
+        }
+        if support_condition is not None:
+            codes['support_condition'] = [SUPPORT_CONDITIONS.index(value)
+                                          for value in support_condition]
+        store = cls()
+        store.extend_columns(**columns, **codes)
+        return store
+
+    def __getitem__(self, index: int) -> 'MemberView':
+        if not -self._size <= index < self._size:
+            raise IndexError("member index out of range")
+        return MemberView(self, index % self._size)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield MemberView(self, i)
+
+    def mask(self, member_type: Optional[MemberType] = None) -> np.ndarray:
+        """Boolean mask of the members of one type (all members if None)"""
+        if member_type is None:
+            return np.ones(self._size, dtype=bool)
+        return self.column('member_type') == MEMBER_TYPES.index(member_type)
+
+
+class MemberView:
+    """Lightweight handle to one member of a MemberStore"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: MemberStore, index: int):
+        self._store = store
+        self._index = index
+
+    def _values(self, fields):
+        columns = self._store._columns
+        return {name: float(columns[name][self._index]) for name in fields}
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def member_type(self) -> MemberType:
+        return MEMBER_TYPES[self._store._columns['member_type'][self._index]]
+
+    @property
+    def exposure(self) -> ExposureCondition:
+        return EXPOSURES[self._store._columns['exposure'][self._index]]
+
+    @property
+    def support_condition(self) -> str:
+        return SUPPORT_CONDITIONS[self._store._columns['support_condition'][self._index]]
+
+    @property
+    def dimensions(self) -> Dimensions:
+        return Dimensions(**self._values(DIMENSION_FIELDS))
+
+    @property
+    def material(self) -> Material:
+        # Shortest decimal of the float32 value: gamma_s comes back as 1.15, not 1.1499999761
+        columns = self._store._columns
+        return Material(**{name: float(np.format_float_positional(columns[name][self._index],
+                                                                   unique=True))
+                           for name in MATERIAL_FIELDS})
+
+    @property
+    def loads(self) -> Loads:
+        return Loads(**self._values(LOAD_FIELDS))
+
+    @property
+    def reinforcement(self) -> Reinforcement:
+        return Reinforcement(**self._values(REINFORCEMENT_FIELDS))
+
+    def check_arguments(self) -> Dict:
+        """Keyword arguments for DesignChecker.check_compliance"""
+        return {
+            'member_type': self.member_type,
+            'dimensions': self.dimensions,
+            'material': self.material,
+            'loads': self.loads,
+            'exposure': self.exposure,
+            'reinforcement': self.reinforcement,
+            'support_condition': self.support_condition,
+        }
+
+    def check(self, checker) -> Dict:
+        """Run a DesignChecker on this member"""
+        return checker.check_compliance(**self.check_arguments())
+
+    def __repr__(self):
+        return f"MemberView({self._index}, {self.member_type.value})"
+
+
+# =============================================================================
+# BARS (SP 34:1987)
+# =============================================================================
+
+class BarStore(_ColumnStore):
+    """Struct-of-arrays container of SP 34:1987 reinforcement bars"""
+
+    COLUMNS = {
+        'member': np.int32,      # index of the owning member
+        'diameter': np.float32,
+        'number': np.int32,
+        'spacing': np.float32,
+        'length': np.float32,
+        'is_deformed': np.bool_,
+        'position': np.int8,     # index into BarStore.positions
+    }
+
+    def __init__(self, capacity: int = 0):
+        super().__init__(capacity)
+        self.positions: List[str] = []
+
+    def position_code(self, position: str) -> int:
+        if position not in self.positions:
+            self.positions.append(position)
+        return self.positions.index(position)
+
+    def append(self, member: int, bar: ReinforcementBar) -> int:
+        """Store one bar row belonging to a member and return its index"""
+        self._reserve(1)
+        i = self._size
+        columns = self._columns
+        columns['member'][i] = member
+        columns['diameter'][i] = bar.diameter
+        columns['number'][i] = bar.number
+        columns['spacing'][i] = bar.spacing
+        columns['length'][i] = bar.length
+        columns['is_deformed'][i] = bar.is_deformed
+        columns['position'][i] = self.position_code(bar.position)
+        self._size += 1
+        return i
+
+    def extend(self, member: int, bars: Iterable[ReinforcementBar]) -> List[int]:
+        return [self.append(member, bar) for bar in bars]
+
+    def __getitem__(self, index: int) -> ReinforcementBar:
+        if not -self._size <= index < self._size:
+            raise IndexError("bar index out of range")
+        i = index % self._size
+        columns = self._columns
+        return ReinforcementBar(
+            diameter=float(columns['diameter'][i]),
+            number=int(columns['number'][i]),
+            spacing=float(columns['spacing'][i]),
+            length=float(columns['length'][i]),
+            is_deformed=bool(columns['is_deformed'][i]),
+            position=self.positions[columns['position'][i]],
+        )
+
+    def bars_of(self, member: int) -> List[ReinforcementBar]:
+        """The bars of one member as ReinforcementBar objects"""
+        return [self[i] for i in np.flatnonzero(self.column('member') == member)]
@@ -0,0 +1,360 @@
+"""
+Search for the lightest reinforcement that satisfies IS 456:2000 and SP 34:1987.
+
+Candidate layouts (bar diameter x count for beams, bar diameter x spacing for
+slabs, plus stirrup diameter x spacing for beams) are evaluated for a whole
+batch of members at once with the NumPy kernels in IS.vectorized. The search
+space is pruned per member before evaluation: for each diameter only the
+bar counts from the fewest that carry the moment (and minimum steel) upwards
+are tried, since more bars than that only help through the concrete shear
+strength. Each member's best layout is then re-checked with the scalar
+checkers (FlexuralCompliance, ShearCompliance, ReinforcementDetailing,
+SpacingChecker, BeamDetailingChecker / SlabDetailingChecker).
+
+Units: b, D, d, cover in mm; Mu in kNm (per metre width for slabs); Vu in kN.
+
+Usage Example
+
+layouts = optimize_beams(width=[230, 300], depth=[450, 600], effective_depth=[410, 550],
+                         cover=[25, 25], fck=25, fy=415, Mu=[120, 310], Vu=[90, 210])
+layouts[0][0]                              # lightest BeamLayout of the first beam
+
+# Every failing beam of a MemberStore building model, on all cores
+results = optimize_store(store)            # {member index: [BeamLayout, ...]}
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import vectorized as vec
+from .load_combinations import store_envelope
+from .IS_456_2000 import (FlexuralCompliance, MemberType, ReinforcementDetailing,
+                          ShearCompliance)
+from .SP_34 import (BeamDetailingChecker, ReinforcementBar, SlabDetailingChecker,
+                    SpacingChecker, SteelGrade)
+
+# =============================================================================
+# SEARCH SPACE
+# =============================================================================
+
+BEAM_BAR_DIAMETERS = (10, 12, 16, 20, 25, 32)
+SLAB_BAR_DIAMETERS = (8, 10, 12, 16)
+STIRRUP_DIAMETERS = (8, 10, 12)
+SLAB_SPACINGS = tuple(range(75, 301, 25))
+
+EXTRA_BARS = 4              # counts tried above the minimum for each diameter
+SPACING_STEP = 25           # stirrup spacings are rounded down to this (mm)
+MIN_STIRRUP_SPACING = 75    # practical lower limit (mm)
+HOOK_EXTENSION = 10         # 135° hook extension, in stirrup diameters, each end
+AGGREGATE_SIZE = 20         # mm
+
+CHUNK_SIZE = 4096           # members evaluated per NumPy batch
+
+
+@dataclass(slots=True)
+class BeamLayout:
+    """Tension bars and two-legged stirrups of one beam"""
+    bar_dia: float
+    bar_count: int
+    steel_area: float           # mm²
+    clear_spacing: float        # mm between bars in the layer
+    stirrup_dia: float
+    stirrup_spacing: float      # mm
+    weight: float               # kg per metre of beam (bars + stirrups)
+    moment_capacity: float      # kNm
+    utilization: float          # Mu / moment capacity
+    checks: Dict[str, Tuple[bool, str]] = field(default_factory=dict)
+
+    @property
+    def verified(self) -> Optional[bool]:
+        """Outcome of the scalar re-check (None if this layout was not re-checked)"""
+        return all(ok for ok, _ in self.checks.values()) if self.checks else None
+
+
+@dataclass(slots=True)
+class SlabLayout:
+    """Main bars of a one-metre slab strip"""
+    bar_dia: float
+    spacing: float              # mm c/c
+    steel_area: float           # mm² per metre width
+    weight: float               # kg per m² of slab
+    moment_capacity: float      # kNm per metre width
+    utilization: float
+    checks: Dict[str, Tuple[bool, str]] = field(default_factory=dict)
+
+    @property
+    def verified(self) -> Optional[bool]:
+        """Outcome of the scalar re-check (None if this layout was not re-checked)"""
+        return all(ok for ok, _ in self.checks.values()) if self.checks else None
+
+
+def _columns(**values):
+    """Broadcast scalars/sequences to float arrays of one common length"""
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float))
+                                   for v in values.values()))
+    return dict(zip(values, arrays))
+
+
+# =============================================================================
+# BEAMS
+# =============================================================================
+
+def _beam_chunk(m, top, aggregate_size):
+    """Evaluate the pruned candidate grid of a batch of beams (dict of arrays)"""
+    b, D, d, cover = m['width'], m['depth'], m['effective_depth'], m['cover']
+    fck, fy, Mu, Vu = m['fck'], m['fy'], m['Mu'], m['Vu']
+    M = len(b)
+
+    Ast_needed = np.maximum(vec.required_steel(Mu, b, d, fck, fy),
+                            vec.minimum_steel('beam', b, d, fy))
+    Ast_max = vec.maximum_steel(b, D)
+    tv = vec.nominal_shear_stress(Vu, b, d)
+    section_ok = np.isfinite(Ast_needed) & (tv <= vec.maximum_shear_stress(fck))
+
+    # Candidate grid, pruned per member: counts n_min .. n_min + EXTRA_BARS - 1
+    dias = np.repeat(BEAM_BAR_DIAMETERS, EXTRA_BARS).astype(float)          # (C,)
+    offsets = np.tile(np.arange(EXTRA_BARS), len(BEAM_BAR_DIAMETERS))       # (C,)
+    area = vec.bar_area(dias)
+    with np.errstate(invalid='ignore'):
+        n_min = np.ceil(Ast_needed[:, None] / area[None, :])
+    n_min = np.where(np.isfinite(n_min), np.maximum(n_min, 2), 2)
+    count = n_min + offsets[None, :]                                         # (M, C)
+    Ast = count * area[None, :]
+    capacity = vec.moment_capacity(b[:, None], d[:, None], Ast, fck[:, None], fy[:, None])
+    tc = vec.design_shear_strength(b[:, None], d[:, None], Ast, fck[:, None])
+    flexure_ok = ((capacity >= Mu[:, None]) & (Ast >= Ast_needed[:, None])
+                  & (Ast <= Ast_max[:, None]) & section_ok[:, None])
+    bar_weight = count * vec.bar_unit_weight(dias)[None, :]
+
+    best_weight = np.full((M, len(dias)), np.inf)
+    best_stirrup = np.zeros((M, len(dias)))
+    best_sv = np.zeros((M, len(dias)))
+    best_clear = np.zeros((M, len(dias)))
+    for sd in STIRRUP_DIAMETERS:
+        clear = (b[:, None] - 2 * cover[:, None] - 2 * sd - count * dias[None, :]) / (count - 1)
+        spacing_ok = ((clear >= np.maximum(dias[None, :], aggregate_size + 5)) & (clear <= 300))
+        sv = vec.stirrup_spacing(Vu[:, None], b[:, None], d[:, None], tc, fy[:, None], sd)
+        sv = np.floor(sv / SPACING_STEP) * SPACING_STEP
+        stirrup_length = (2 * (b - 2 * cover + D - 2 * cover) + 2 * HOOK_EXTENSION * sd)[:, None]
+        with np.errstate(divide='ignore'):
+            stirrup_weight = stirrup_length * vec.bar_unit_weight(sd) / sv
+        weight = np.where(flexure_ok & spacing_ok & (sv >= MIN_STIRRUP_SPACING),
+                          bar_weight + stirrup_weight, np.inf)
+        better = weight < best_weight
+        best_weight = np.where(better, weight, best_weight)
+        best_stirrup = np.where(better, sd, best_stirrup)
+        best_sv = np.where(better, sv, best_sv)
+        best_clear = np.where(better, clear, best_clear)
+
+    order = np.argsort(best_weight, axis=1, kind='stable')[:, :top]
+    layouts = []
+    for i in range(M):
+        found = []
+        for j in order[i]:
+            if not np.isfinite(best_weight[i, j]):
+                break
+            found.append(BeamLayout(
+                bar_dia=float(dias[j]), bar_count=int(count[i, j]), steel_area=float(Ast[i, j]),
+                clear_spacing=float(best_clear[i, j]), stirrup_dia=float(best_stirrup[i, j]),
+                stirrup_spacing=float(best_sv[i, j]), weight=float(best_weight[i, j]),
+                moment_capacity=float(capacity[i, j]),
+                utilization=float(Mu[i] / capacity[i, j]) if capacity[i, j] > 0 else math.inf))
+        if found:
+            found[0].checks = check_beam_layout(found[0], b[i], D[i], d[i], fck[i], fy[i],
+                                                Mu[i], Vu[i], aggregate_size)
+        layouts.append(found)
+    return layouts
+
+
+def check_beam_layout(layout: BeamLayout, width: float, depth: float, effective_depth: float,
+                      fck: float, fy: float, Mu: float, Vu: float,
+                      aggregate_size: float = AGGREGATE_SIZE) -> Dict[str, Tuple[bool, str]]:
+    """Re-check a beam layout with the scalar IS 456 and SP 34 checkers"""
+    Ast = layout.steel_area
+    capacity, _ = FlexuralCompliance.calculate_moment_capacity(width, effective_depth, Ast, fck, fy)
+    shear_ok, shear_msg, _ = ShearCompliance.check_shear_capacity(Vu, width, effective_depth, Ast, fck)
+    bar = ReinforcementBar(diameter=layout.bar_dia, number=layout.bar_count,
+                           spacing=layout.clear_spacing, length=0)
+    sp34 = {
+        'spacing': SpacingChecker.check_minimum_bar_spacing([bar, bar], aggregate_size),
+        'min_steel_sp34': BeamDetailingChecker.check_minimum_reinforcement(
+            Ast, width, effective_depth, SteelGrade(fy)),
+        'max_steel_sp34': BeamDetailingChecker.check_maximum_reinforcement(Ast, width, depth),
+    }
+    checks = {
+        'moment_capacity': (bool(capacity >= Mu - 1e-9),
+                            f"Clause 38: Mu,cap = {capacity:.1f} kNm for Mu = {Mu:.1f} kNm"),
+        'min_steel': FlexuralCompliance.check_minimum_steel(
+            MemberType.BEAM, Ast, width, effective_depth, fy),
+        'max_steel': FlexuralCompliance.check_maximum_steel(Ast, width, depth),
+        'shear': (shear_ok, shear_msg),
+        'bar_spacing': ReinforcementDetailing.check_spacing_requirements(
+            layout.clear_spacing, MemberType.BEAM, layout.bar_dia, effective_depth, aggregate_size),
+    }
+    for name, result in sp34.items():
+        checks[name] = (result.is_compliant, f"{result.clause_reference}: {result.description}")
+    return checks
+
+
+def optimize_beams(width, depth, effective_depth, cover, fck, fy, Mu, Vu, top: int = 3,
+                   aggregate_size: float = AGGREGATE_SIZE,
+                   workers: Optional[int] = 1) -> List[List[BeamLayout]]:
+    """
+    Lightest compliant tension bar + stirrup layouts of a batch of rectangular beams.
+
+    All arguments broadcast against each other. Returns, for each beam, up to
+    `top` layouts sorted by steel weight per metre; the first layout carries
+    the scalar re-check in `checks`. An empty list means no singly reinforced
+    layout in the search space works (section too small for Mu or Vu).
+    workers > 1 (or None for all cores) spreads batches over processes.
+    """
+    m = _columns(width=width, depth=depth, effective_depth=effective_depth, cover=cover,
+                 fck=fck, fy=fy, Mu=Mu, Vu=Vu)
+    return _run_chunks(_beam_chunk, m, top, aggregate_size, workers)
+
+
+# =============================================================================
+# SLABS
+# =============================================================================
+
+def _slab_chunk(m, top, aggregate_size):
+    """Evaluate every bar diameter x spacing of a batch of one-way slab strips"""
+    D, d, fck, fy, Mu, Vu = m['depth'], m['effective_depth'], m['fck'], m['fy'], m['Mu'], m['Vu']
+    b = 1000.0
+    M = len(D)
+    dias = np.repeat(SLAB_BAR_DIAMETERS, len(SLAB_SPACINGS)).astype(float)
+    spacings = np.tile(SLAB_SPACINGS, len(SLAB_BAR_DIAMETERS)).astype(float)
+    Ast = np.broadcast_to(b * vec.bar_area(dias) / spacings, (M, len(dias)))
+
+    Ast_min = np.maximum(vec.minimum_steel('slab', b, d, fy),                # IS 456 26.5.2.1
+                         np.where(fy <= 250, 0.0015, 0.0012) * b * D)       # SP 34 9.1
+    capacity = vec.moment_capacity(b, d[:, None], Ast, fck[:, None], fy[:, None])
+    tc = vec.design_shear_strength(b, d[:, None], Ast, fck[:, None])
+    tv = vec.nominal_shear_stress(Vu, b, d)[:, None]
+    max_spacing = np.minimum(3 * d, 300)[:, None]                           # 26.3.3(b)
+    ok = ((capacity >= Mu[:, None]) & (Ast >= Ast_min[:, None])
+          & (Ast <= vec.maximum_steel(b, D)[:, None])
+          & (spacings[None, :] >= np.maximum(dias, aggregate_size + 5)[None, :])
+          & (spacings[None, :] <= max_spacing) & (tv <= tc))
+    weight = np.where(ok, Ast * vec.STEEL_DENSITY * 1e-6, np.inf)
+
+    order = np.argsort(weight, axis=1, kind='stable')[:, :top]
+    layouts = []
+    for i in range(M):
+        found = []
+        for j in order[i]:
+            if not np.isfinite(weight[i, j]):
+                break
+            found.append(SlabLayout(
+                bar_dia=float(dias[j]), spacing=float(spacings[j]), steel_area=float(Ast[i, j]),
+                weight=float(weight[i, j]), moment_capacity=float(capacity[i, j]),
+                utilization=float(Mu[i] / capacity[i, j])))
+        if found:
+            found[0].checks = check_slab_layout(found[0], D[i], d[i], fck[i], fy[i], Mu[i], Vu[i],
+                                                aggregate_size)
+        layouts.append(found)
+    return layouts
+
+
+def check_slab_layout(layout: SlabLayout, depth: float, effective_depth: float, fck: float,
+                      fy: float, Mu: float, Vu: float = 0,
+                      aggregate_size: float = AGGREGATE_SIZE) -> Dict[str, Tuple[bool, str]]:
+    """Re-check a slab layout with the scalar IS 456 and SP 34 checkers"""
+    b = 1000.0
+    Ast = layout.steel_area
+    capacity, _ = FlexuralCompliance.calculate_moment_capacity(b, effective_depth, Ast, fck, fy)
+    tc = ShearCompliance.calculate_design_shear_strength(b, effective_depth, Ast, fck)
+    tv = Vu * 1000 / (b * effective_depth)
+    checks = {
+        'moment_capacity': (bool(capacity >= Mu - 1e-9),
+                            f"Clause 38: Mu,cap = {capacity:.1f} kNm/m for Mu = {Mu:.1f} kNm/m"),
+        'min_steel': FlexuralCompliance.check_minimum_steel(
+            MemberType.SLAB, Ast, b, effective_depth, fy),
+        'max_steel': FlexuralCompliance.check_maximum_steel(Ast, b, depth),
+        'shear': (bool(tv <= tc), f"Clause 40.2: tv={tv:.2f} ≤ tc={tc:.2f} N/mm² without stirrups"),
+        'bar_spacing': ReinforcementDetailing.check_spacing_requirements(
+            layout.spacing, MemberType.SLAB, layout.bar_dia, effective_depth, aggregate_size),
+    }
+    for name, result in {
+        'min_steel_sp34': SlabDetailingChecker.check_minimum_reinforcement(Ast, b * depth),
+        'spacing_sp34': SlabDetailingChecker.check_spacing_requirements(
+            layout.spacing, 0, effective_depth),
+    }.items():
+        checks[name] = (result.is_compliant, f"{result.clause_reference}: {result.description}")
+    return checks
+
+
+def optimize_slabs(depth, effective_depth, fck, fy, Mu, Vu=0, top: int = 3,
+                   aggregate_size: float = AGGREGATE_SIZE,
+                   workers: Optional[int] = 1) -> List[List[SlabLayout]]:
+    """
+    Lightest compliant main bar diameter and spacing of a batch of slab strips.
+
+    Mu and Vu are per metre width. Returns up to `top` layouts per slab
+    sorted by steel weight per m²; the first carries the scalar re-check.
+    """
+    m = _columns(depth=depth, effective_depth=effective_depth, fck=fck, fy=fy, Mu=Mu, Vu=Vu)
+    return _run_chunks(_slab_chunk, m, top, aggregate_size, workers)
+
+
+# =============================================================================
+# BATCHING
+# =============================================================================
+
+def _run_chunks(evaluate, m, top, aggregate_size, workers):
+    n = len(next(iter(m.values())))
+    chunks = [{name: values[start:start + CHUNK_SIZE] for name, values in m.items()}
+              for start in range(0, n, CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        results = [evaluate(chunk, top, aggregate_size) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(evaluate, chunks, [top] * len(chunks),
+                                    [aggregate_size] * len(chunks)))
+    return [layouts for chunk in results for layouts in chunk]
+
+
+# =============================================================================
+# BUILDING MODELS
+# =============================================================================
+
+def member_demands(store, indices: Optional[Sequence[int]] = None):
+    """
+    Factored Mu (kNm) and Vu (kN) of MemberStore members under their UDL.
+
+    Loads are kN/m on spans stored in mm; Mu and Vu are the design values of
+    the Table 18 envelope (IS.load_combinations), in either direction.
+    """
+    env = store_envelope(store, indices)
+    return env.design_moment, env.shear
+
+
+def failing_beams(store) -> np.ndarray:
+    """Indices of beams whose stored main steel fails flexure or the steel limits"""
+    beams = np.flatnonzero(store.mask(MemberType.BEAM))
+    Mu, _ = member_demands(store, beams)
+    col = {name: store.column(name)[beams].astype(float)
+           for name in ('width', 'depth', 'effective_depth', 'fck', 'fy', 'main_steel_area')}
+    Ast = col['main_steel_area']
+    capacity = vec.moment_capacity(col['width'], col['effective_depth'], Ast, col['fck'], col['fy'])
+    failing = ((capacity < Mu)
+               | (Ast < vec.minimum_steel('beam', col['width'], col['effective_depth'], col['fy']))
+               | (Ast > vec.maximum_steel(col['width'], col['depth'])))
+    return beams[failing]
+
+
+def optimize_store(store, indices: Optional[Sequence[int]] = None, top: int = 3,
+                   workers: Optional[int] = None) -> Dict[int, List[BeamLayout]]:
+    """Optimize the beams of a MemberStore (default: every failing beam) on all cores"""
+    idx = failing_beams(store) if indices is None else np.asarray(indices)
+    Mu, Vu = member_demands(store, idx)
+    col = {name: store.column(name)[idx]
+           for name in ('width', 'depth', 'effective_depth', 'cover', 'fck', 'fy')}
+    layouts = optimize_beams(Mu=Mu, Vu=Vu, top=top, workers=workers, **col)
+    return dict(zip(idx.tolist(), layouts))
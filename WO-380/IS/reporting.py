@@ -0,0 +1,339 @@
+"""
+Streaming compliance reports in several output formats.
+
+Results are written to the output stream member by member as they are
+produced, so a report over 100k members is written in constant memory. Both
+result shapes are accepted:
+
+--IS 456:2000: the dict returned by DesignChecker.check_compliance
+--SP 34:1987: the Dict[str, CheckResult] returned by DetailingChecker.check_member_detailing
+--Both: {"IS456": ..., "SP34": ...} as returned by compliance.check_member
+
+Formats: text, markdown, jsonl, csv, html and summary (failures aggregated by
+clause).
+
+Usage Example
+
+with open("report.csv", "w", newline="") as out:
+    writer = ReportWriter(out, "csv")
+    for member_id, results in checked_members:
+        writer.write_member(member_id, results)
+    writer.close()
+
+# Several formats in one pass
+write_reports(checked_members, {"text": "report.txt", "summary": "summary.md"})
+"""
+
+import csv
+import html
+import json
+import re
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .IS_456_2000 import DesignChecker
+from .SP_34 import CheckResult, DetailingChecker
+
+# =============================================================================
+# NORMALIZED ROWS
+# =============================================================================
+
+@dataclass(slots=True)
+class ReportRow:
+    """One check of one member, in a code-independent shape"""
+    member_id: str
+    code: str                   # "IS 456:2000" or "SP 34:1987"
+    check: str                  # check name (SP 34) or "" (IS 456 messages are unnamed)
+    passed: bool
+    clause: str                 # e.g. "26.3.3" or "Section 8.2.1"; "" when not stated
+    description: str
+    actual: Optional[float] = None
+    required: Optional[float] = None
+    utilization: Optional[float] = None
+    remarks: str = ""
+
+
+ROW_FIELDS = ('member_id', 'code', 'check', 'passed', 'clause', 'description',
+              'actual', 'required', 'utilization', 'remarks')
+
+IS456 = "IS 456:2000"
+SP34 = "SP 34:1987"
+
+_IS456_CLAUSE = re.compile(r"Clause\s+([\d.]+(?:\([a-z]\))?)")
+_SP34_CLAUSE = re.compile(r"SP 34:1987,\s*(.*)")
+
+# Messages of the IS 456 checker that carry a utilization ratio
+_UTILIZATION_PREFIXES = {
+    'Flexural capacity': 'flexure',
+    'Clause 40.2.3': 'shear',
+    'Shear reinforcement required': 'shear',
+    'No shear reinforcement required': 'shear',
+}
+
+
+def is456_rows(member_id: str, results: Dict) -> Iterator[ReportRow]:
+    """Rows for a DesignChecker.check_compliance result"""
+    ratios = results.get('utilization_ratios', {})
+    values = results.get('check_values', {})
+    for passed, messages in ((False, results['failed_checks']), (True, results['passed_checks'])):
+        for message in messages:
+            match = _IS456_CLAUSE.search(message)
+            utilization = None
+            for prefix, component in _UTILIZATION_PREFIXES.items():
+                if message.startswith(prefix):
+                    utilization = ratios.get(component)
+            actual, required = values.get(message, (None, None))
+            yield ReportRow(member_id, IS456, "", passed, match.group(1) if match else "",
+                            message, actual, required, utilization)
+
+
+def sp34_rows(member_id: str, results: Dict[str, CheckResult]) -> Iterator[ReportRow]:
+    """Rows for a DetailingChecker.check_member_detailing result"""
+    for name, result in results.items():
+        match = _SP34_CLAUSE.match(result.clause_reference)
+        yield ReportRow(member_id, SP34, name, result.is_compliant,
+                        match.group(1) if match else result.clause_reference,
+                        result.description, result.actual_value, result.required_value,
+                        remarks=result.remarks)
+
+
+def result_kind(results) -> str:
+    """Tell which checker produced a result object: 'IS456', 'SP34' or 'both'"""
+    if isinstance(results, dict) and 'failed_checks' in results:
+        return 'IS456'
+    if isinstance(results, dict) and ('IS456' in results or 'SP34' in results):
+        return 'both'
+    return 'SP34'
+
+
+def _sp34_results(results) -> Dict[str, CheckResult]:
+    # compliance.check_member returns SP 34 results as plain dicts
+    if isinstance(results, dict) and 'checks' in results:
+        return {name: CheckResult(**values) for name, values in results['checks'].items()}
+    return results
+
+
+def rows_for(member_id: str, results) -> List[ReportRow]:
+    """Rows for any supported result shape"""
+    kind = result_kind(results)
+    if kind == 'IS456':
+        return list(is456_rows(member_id, results))
+    if kind == 'SP34':
+        return list(sp34_rows(member_id, results))
+    rows = []
+    if 'IS456' in results:
+        rows.extend(is456_rows(member_id, results['IS456']))
+    if 'SP34' in results:
+        rows.extend(sp34_rows(member_id, _sp34_results(results['SP34'])))
+    return rows
+
+
+# =============================================================================
+# RENDERERS
+# =============================================================================
+
+class Renderer:
+    """Writes a report to a stream: begin, one call per member, end"""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+
+    def begin(self):
+        pass
+
+    def member(self, member_id: str, results, rows: List[ReportRow]):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+
+class TextRenderer(Renderer):
+    """Plain text, one block per member as produced by the checkers' reports"""
+
+    def __init__(self, out: TextIO):
+        super().__init__(out)
+        self.design_checker = DesignChecker()
+        self.detailing_checker = DetailingChecker()
+
+    def member(self, member_id, results, rows):
+        write = self.out.write
+        write(f"\nMEMBER: {member_id}\n")
+        kind = result_kind(results)
+        is456 = results if kind == 'IS456' else results.get('IS456') if kind == 'both' else None
+        sp34 = results if kind == 'SP34' else results.get('SP34') if kind == 'both' else None
+        if is456 is not None:
+            self.design_checker.write_compliance_report(is456, self.out)
+            write("\n")
+        if sp34 is not None:
+            self.detailing_checker.write_compliance_report(_sp34_results(sp34), self.out)
+            write("\n")
+
+
+class MarkdownRenderer(Renderer):
+    """One section with a check table per member"""
+
+    def begin(self):
+        self.out.write("# Compliance Report\n")
+
+    def member(self, member_id, results, rows):
+        write = self.out.write
+        failed = sum(not row.passed for row in rows)
+        status = "COMPLIANT" if failed == 0 else f"NOT COMPLIANT ({failed} failed)"
+        write(f"\n## {member_id}: {status}\n\n")
+        write("| Code | Check | Status | Clause | Description | Actual | Required |\n")
+        write("|------|-------|--------|--------|-------------|--------|----------|\n")
+        for row in rows:
+            description = row.description.replace("|", "\\|")
+            write(f"| {row.code} | {row.check} | {'PASS' if row.passed else 'FAIL'} | "
+                  f"{row.clause} | {description} | {_fmt(row.actual)} | {_fmt(row.required)} |\n")
+
+
+class JsonLinesRenderer(Renderer):
+    """One JSON object per check"""
+
+    def member(self, member_id, results, rows):
+        for row in rows:
+            self.out.write(json.dumps(asdict(row)) + "\n")
+
+
+class CsvRenderer(Renderer):
+    """One CSV row per check (open the file with newline="")"""
+
+    def begin(self):
+        self.writer = csv.writer(self.out)
+        self.writer.writerow(ROW_FIELDS)
+
+    def member(self, member_id, results, rows):
+        self.writer.writerows(
+            [getattr(row, name) for name in ROW_FIELDS] for row in rows)
+
+
+class HtmlRenderer(Renderer):
+    """A single HTML table, rows streamed as they arrive"""
+
+    def begin(self):
+        self.out.write(
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            "<title>Compliance Report</title>\n<style>\n"
+            "table { border-collapse: collapse; font-family: sans-serif; font-size: 13px; }\n"
+            "td, th { border: 1px solid #ccc; padding: 4px 8px; }\n"
+            "tr.fail td { background: #fde2e2; }\n"
+            "</style>\n</head>\n<body>\n<h1>Compliance Report</h1>\n<table>\n<tr>"
+            + "".join(f"<th>{name}</th>" for name in ROW_FIELDS) + "</tr>\n")
+
+    def member(self, member_id, results, rows):
+        write = self.out.write
+        for row in rows:
+            cells = "".join(f"<td>{html.escape(_fmt(getattr(row, name)))}</td>"
+                            for name in ROW_FIELDS)
+            write(f"<tr class=\"{'pass' if row.passed else 'fail'}\">{cells}</tr>\n")
+
+    def end(self):
+        self.out.write("</table>\n</body>\n</html>\n")
+
+
+class SummaryRenderer(Renderer):
+    """Failures aggregated by clause, written at the end"""
+
+    def begin(self):
+        self.members = 0
+        self.failed_members = 0
+        self.checks = 0
+        self.failures: Counter = Counter()
+        self.examples: Dict[Tuple[str, str], str] = {}
+
+    def member(self, member_id, results, rows):
+        self.members += 1
+        self.checks += len(rows)
+        failed = [row for row in rows if not row.passed]
+        if failed:
+            self.failed_members += 1
+        for row in failed:
+            key = (row.code, row.clause or row.description.split(':')[0])
+            self.failures[key] += 1
+            self.examples.setdefault(key, member_id)
+
+    def end(self):
+        write = self.out.write
+        write("# Compliance Summary\n\n")
+        write(f"- Members checked: {self.members}\n")
+        write(f"- Members failing: {self.failed_members}\n")
+        write(f"- Checks run: {self.checks}\n")
+        write(f"- Checks failed: {sum(self.failures.values())}\n\n")
+        if self.failures:
+            write("| Code | Clause | Failures | First member |\n")
+            write("|------|--------|----------|--------------|\n")
+            for (code, clause), count in self.failures.most_common():
+                write(f"| {code} | {clause} | {count} | {self.examples[(code, clause)]} |\n")
+
+
+RENDERERS = {
+    'text': TextRenderer,
+    'markdown': MarkdownRenderer,
+    'jsonl': JsonLinesRenderer,
+    'csv': CsvRenderer,
+    'html': HtmlRenderer,
+    'summary': SummaryRenderer,
+}
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+
+class ReportWriter:
+    """Streams member results to one output in one format"""
+
+    def __init__(self, out: TextIO, fmt: str = 'text'):
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unknown report format {fmt!r}. Available: {sorted(RENDERERS)}")
+        self.renderer = RENDERERS[fmt](out)
+        self.renderer.begin()
+        self.closed = False
+
+    def write_member(self, member_id, results):
+        self.renderer.member(str(member_id), results, rows_for(str(member_id), results))
+
+    def close(self):
+        """Finish the report (writes footers and summaries); does not close the stream"""
+        if not self.closed:
+            self.renderer.end()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_reports(members: Iterable[Tuple[str, object]], outputs: Dict[str, str]) -> int:
+    """
+    Write several report formats in a single pass over the results.
+
+    members yields (member_id, results); outputs maps a format to a file path.
+    Returns the number of members written.
+    """
+    count = 0
+    with ExitStack() as stack:
+        writers = []
+        for fmt, path in outputs.items():
+            out = stack.enter_context(open(path, "w", encoding="utf-8", newline=""))
+            writers.append(stack.enter_context(ReportWriter(out, fmt)))
+        for member_id, results in members:
+            rows = rows_for(str(member_id), results)
+            for writer in writers:
+                writer.renderer.member(str(member_id), results, rows)
+            count += 1
+    return count
@@ -0,0 +1,278 @@
+"""
+Monte Carlo tolerance analysis of IS 456:2000 member checks.
+
+Extracted dimensions carry uncertainty (scale detection, ft-in conversion,
+misread callouts), so instead of checking one point value each input is
+sampled from a tolerance distribution and the numeric checks of
+DesignChecker.check_compliance are evaluated over all samples at once with
+NumPy. The result gives the probability of non-compliance overall and per
+check, and which input drives it.
+
+The checks follow DesignChecker.check_compliance formula for formula
+(including its demand approximations), so with zero tolerances the result
+agrees with the scalar checker.
+
+Usage Example
+
+result = analyse(MemberType.BEAM, dimensions, material, loads, ExposureCondition.MODERATE,
+                 reinforcement, samples=5000)
+result.probability_of_failure              # 0.0 .. 1.0
+result.check_probabilities                 # {'cover': 0.31, 'flexure': 0.0, ...}
+result.dominant_input                      # e.g. 'cover'
+
+results = analyse_store(store)             # every member of a MemberStore
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from . import vectorized as vec
+from .load_combinations import factored_loads
+from .IS_456_2000 import (DeflectionCompliance, Dimensions, DurabilityCompliance,
+                          ExposureCondition, Loads, Material, MemberType, Reinforcement,
+                          udl_demands)
+
+# =============================================================================
+# TOLERANCES
+# =============================================================================
+
+@dataclass(slots=True)
+class Tolerance:
+    """Spread of one input: standard deviation (normal) or half-width (uniform)"""
+    spread: float
+    relative: bool = True           # spread is a fraction of the nominal value
+    distribution: str = 'normal'    # 'normal' or 'uniform'
+
+    def sample(self, nominal: float, rng: np.random.Generator, n: int) -> np.ndarray:
+        width = self.spread * abs(nominal) if self.relative else self.spread
+        if self.distribution == 'normal':
+            offsets = rng.normal(0.0, width, n)
+        elif self.distribution == 'uniform':
+            offsets = rng.uniform(-width, width, n)
+        else:
+            raise ValueError(f"Unknown distribution {self.distribution!r}")
+        return nominal + offsets
+
+
+# Inputs that can be sampled, and typical extraction tolerances
+DEFAULT_TOLERANCES: Dict[str, Tolerance] = {
+    'length': Tolerance(0.02),
+    'width': Tolerance(0.02),
+    'depth': Tolerance(0.02),
+    'effective_depth': Tolerance(0.03),
+    'cover': Tolerance(5, relative=False),
+    'main_steel_area': Tolerance(0.05),
+    'dead_load': Tolerance(0.05),
+    'live_load': Tolerance(0.10),
+    'wind_load': Tolerance(0.10),
+    'earthquake_load': Tolerance(0.10),
+}
+
+# Common drawing scale error applied to every dimension of a sample together
+DEFAULT_SCALE_TOLERANCE: Optional[Tolerance] = Tolerance(0.01)
+
+DIMENSION_INPUTS = ('length', 'width', 'depth', 'effective_depth', 'cover')
+LOAD_INPUTS = ('dead_load', 'live_load', 'wind_load', 'earthquake_load')
+SCALE = 'scale'
+
+
+@dataclass(slots=True)
+class ToleranceResult:
+    """Outcome of a Monte Carlo run on one member"""
+    samples: int
+    probability_of_failure: float
+    check_probabilities: Dict[str, float]
+    input_probabilities: Dict[str, float]     # failure probability with only this input varied
+    input_correlations: Dict[str, float]      # rank correlation of input with the worst margin
+    nominal_failures: List[str] = field(default_factory=list)
+    input_contributions: Dict[str, float] = field(default_factory=dict)  # failure probability
+                                              # removed by holding this input at its nominal value
+    input_margin_spread: Dict[str, float] = field(default_factory=dict)  # std of the worst
+                                              # margin with only this input varied
+
+    @property
+    def dominant_input(self) -> Optional[str]:
+        """
+        Input that accounts for the most failure probability. When no single
+        input does (the member fails whatever it varies), the input that
+        moves the worst margin the most; None when the member never fails.
+        """
+        if self.probability_of_failure == 0:
+            return None
+        if self.input_contributions and max(self.input_contributions.values()) > 0:
+            return max(self.input_contributions, key=self.input_contributions.get)
+        moving = {name: v for name, v in self.input_margin_spread.items() if v > 0}
+        return max(moving, key=moving.get) if moving else None
+
+
+# =============================================================================
+# VECTORIZED CHECKS
+# =============================================================================
+
+def check_margins(member_type: MemberType, exposure: ExposureCondition, support_condition: str,
+                  fck: float, fy: float, main_bar_dia: float,
+                  inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Normalized margin of each numeric check over all samples (>= 0 passes).
+
+    Mirrors the numeric checks of DesignChecker.check_compliance; material
+    grade checks do not depend on sampled inputs and are left out.
+    """
+    L, b, D, d, cover = (inputs[name] for name in DIMENSION_INPUTS)
+    Ast = inputs['main_steel_area']
+    loads = np.stack([inputs[name] for name in LOAD_INPUTS], axis=-1)
+    margins = {}
+
+    # Clause 26.4.2
+    required_cover = max(DurabilityCompliance.get_minimum_cover(exposure), main_bar_dia)
+    margins['cover'] = cover / required_cover - 1
+
+    # Clause 26.5.1
+    kind = member_type.value if member_type in (MemberType.BEAM, MemberType.SLAB) else 'other'
+    margins['minimum_steel'] = Ast / vec.minimum_steel(kind, b, d, fy) - 1
+    margins['maximum_steel'] = 1 - Ast / vec.maximum_steel(b, D)
+
+    # Flexure and shear with the checker's demand approximations
+    w = np.abs(factored_loads(loads)[1]).max(axis=-1)
+    span = L / 1000
+    Mu, Vu = udl_demands(w, span, support_condition)
+    capacity = vec.moment_capacity(b, d, Ast, fck, fy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margins['flexure'] = np.where(capacity > 0, 1 - Mu / capacity, -np.inf)
+    tv = vec.nominal_shear_stress(Vu, b, d)
+    margins['shear'] = 1 - tv / vec.maximum_shear_stress(fck)
+
+    # Clause 23.2 with Ast,required = 0.8 Ast,provided as in the checker
+    basic = DeflectionCompliance.get_basic_span_to_depth_ratios().get(support_condition, 20)
+    fs = 0.58 * fy * 0.8
+    mf = 2.0 if fs <= 150 else 1.5 if fs <= 200 else 1.2 if fs <= 250 else 1.0 if fs <= 300 else 0.8
+    span_factor = np.where(span > 10, np.minimum(10.0 / span, 1.0), 1.0)
+    margins['deflection'] = 1 - (L / d) / (basic * mf * span_factor)
+
+    # Clause 26.3 with the checker's approximate bar spacing
+    if main_bar_dia > 0:
+        num_bars = Ast / vec.bar_area(main_bar_dia)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spacing = np.where(num_bars > 1, (b - 2 * cover) / (num_bars - 1), b)
+        min_spacing = max(main_bar_dia, 5 + 20)
+        max_spacing = np.minimum(3 * d, 300) if member_type == MemberType.SLAB else 300
+        margins['spacing'] = np.minimum(spacing / min_spacing - 1, 1 - spacing / max_spacing)
+        margins['spacing'] = np.where(Ast > 0, margins['spacing'], 0.0)
+    return margins
+
+
+def _nominal_inputs(dimensions: Dimensions, loads: Loads, reinforcement: Reinforcement):
+    return {
+        **{name: getattr(dimensions, name) for name in DIMENSION_INPUTS},
+        'main_steel_area': reinforcement.main_steel_area,
+        'dead_load': loads.dead_load,
+        'live_load': loads.live_load,
+        'wind_load': loads.wind_load,
+        'earthquake_load': loads.earthquake_load,
+    }
+
+
+def _spearman(x: np.ndarray, y: np.ndarray) -> float:
+    if np.ptp(x) == 0 or np.ptp(y) == 0:
+        return 0.0
+    rx = np.argsort(np.argsort(x))
+    ry = np.argsort(np.argsort(y))
+    return float(np.corrcoef(rx, ry)[0, 1])
+
+
+# =============================================================================
+# MONTE CARLO
+# =============================================================================
+
+def analyse(member_type: MemberType, dimensions: Dimensions, material: Material, loads: Loads,
+            exposure: ExposureCondition, reinforcement: Reinforcement,
+            support_condition: str = 'simply_supported', samples: int = 2000,
+            tolerances: Optional[Dict[str, Tolerance]] = None,
+            scale_tolerance: Optional[Tolerance] = DEFAULT_SCALE_TOLERANCE,
+            seed: Optional[int] = None) -> ToleranceResult:
+    """
+    Sample the member's inputs and evaluate the checks over every sample.
+
+    Args take the same values as DesignChecker.check_compliance, plus:
+        samples: Number of Monte Carlo samples
+        tolerances: Per-input Tolerance (defaults to DEFAULT_TOLERANCES; an
+            input missing from the dict is held at its nominal value)
+        scale_tolerance: Common scale error applied to all dimensions
+        seed: Seed for reproducible runs
+    """
+    tolerances = DEFAULT_TOLERANCES if tolerances is None else tolerances
+    rng = np.random.default_rng(seed)
+    nominal = _nominal_inputs(dimensions, loads, reinforcement)
+    fixed = {name: np.full(samples, float(value)) for name, value in nominal.items()}
+    sampled = {name: (np.maximum(tolerances[name].sample(value, rng, samples), 0.0)
+                      if name in tolerances and value else fixed[name])
+               for name, value in nominal.items()}
+    scale = scale_tolerance.sample(1.0, rng, samples) if scale_tolerance else np.ones(samples)
+
+    def evaluate(inputs, scale_factor):
+        scaled = {name: values * scale_factor if name in DIMENSION_INPUTS else values
+                  for name, values in inputs.items()}
+        return check_margins(member_type, exposure, support_condition, material.fck,
+                             material.fy, reinforcement.main_bar_dia, scaled)
+
+    margins = evaluate(sampled, scale)
+    failed = {name: margin < 0 for name, margin in margins.items()}
+    any_failed = np.logical_or.reduce(list(failed.values()))
+    worst = np.minimum.reduce(list(margins.values()))
+
+    nominal_margins = evaluate({name: values[:1] for name, values in fixed.items()}, 1.0)
+    nominal_failures = [name for name, margin in nominal_margins.items() if margin[0] < 0]
+
+    def failure_probability(margins):
+        return float(np.mean(np.logical_or.reduce([m < 0 for m in margins.values()])))
+
+    # Per input: failure probability when it varies alone, and the failure
+    # probability it accounts for (the drop when it alone is held at nominal)
+    varied = [name for name in nominal if sampled[name] is not fixed[name]]
+    if scale_tolerance:
+        varied.append(SCALE)
+    probability = float(any_failed.mean())
+    input_probabilities, input_correlations, input_contributions = {}, {}, {}
+    input_margin_spread = {}
+    for name in varied:
+        alone = dict(fixed)
+        if name != SCALE:
+            alone[name] = sampled[name]
+        margins_alone = evaluate(alone, scale if name == SCALE else 1.0)
+        input_probabilities[name] = failure_probability(margins_alone)
+        input_margin_spread[name] = float(np.std(np.minimum.reduce(list(margins_alone.values()))))
+        held = dict(sampled)
+        if name != SCALE:
+            held[name] = fixed[name]
+        input_contributions[name] = probability - failure_probability(
+            evaluate(held, 1.0 if name == SCALE else scale))
+        input_correlations[name] = _spearman(scale if name == SCALE else sampled[name], worst)
+
+    return ToleranceResult(
+        samples=samples,
+        probability_of_failure=probability,
+        check_probabilities={name: float(f.mean()) for name, f in failed.items()},
+        input_probabilities=input_probabilities,
+        input_correlations=input_correlations,
+        nominal_failures=nominal_failures,
+        input_contributions=input_contributions,
+        input_margin_spread=input_margin_spread,
+    )
+
+
+def analyse_store(store, indices: Optional[Iterable[int]] = None, samples: int = 2000,
+                  tolerances: Optional[Dict[str, Tolerance]] = None,
+                  scale_tolerance: Optional[Tolerance] = DEFAULT_SCALE_TOLERANCE,
+                  seed: Optional[int] = None) -> Dict[int, ToleranceResult]:
+    """Run analyse() on members of a MemberStore (default: all)"""
+    indices = range(len(store)) if indices is None else indices
+    rng = np.random.default_rng(seed)
+    results = {}
+    for i in indices:
+        arguments = store[int(i)].check_arguments()
+        results[int(i)] = analyse(**arguments, samples=samples, tolerances=tolerances,
+                                  scale_tolerance=scale_tolerance,
+                                  seed=int(rng.integers(2 ** 32)))
+    return results
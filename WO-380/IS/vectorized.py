@@ -0,0 +1,147 @@
+"""
+NumPy versions of the IS 456:2000 capacity calculations.
+
+Each function takes arrays (or scalars that broadcast) and returns the same
+values as its scalar counterpart in IS_456_2000, so a whole batch of
+members or candidate layouts is evaluated in one call. The scalar checkers
+remain the reference: results from here are meant for screening and search,
+and anything reported to a user is re-checked with IS_456_2000/SP_34.
+
+Usage Example
+
+b = np.array([230, 300]); d = np.array([410, 450]); Ast = np.array([804, 1256])
+moment_capacity(b, d, Ast, 25, 415)        # kNm, like FlexuralCompliance.calculate_moment_capacity
+design_shear_strength(b, d, Ast, 25)       # N/mm², like ShearCompliance.calculate_design_shear_strength
+"""
+
+import numpy as np
+
+# Unit weight of steel bars (kg/m) is d²/162 (density 7850 kg/m³)
+STEEL_DENSITY = 7850.0  # kg/m³
+
+
+def bar_area(diameter):
+    """Cross-sectional area (mm²) of bars of the given diameter (mm)"""
+    return np.pi * np.asarray(diameter, dtype=float) ** 2 / 4
+
+
+def bar_unit_weight(diameter):
+    """Weight per metre (kg/m) of bars of the given diameter (mm)"""
+    return np.asarray(diameter, dtype=float) ** 2 / 162
+
+
+# =============================================================================
+# FLEXURE (Clause 38, 26.5.1)
+# =============================================================================
+
+def xu_max_ratio(fy):
+    """Limiting xu,max/d - Clause 38.1 (as FlexuralCompliance.calculate_moment_capacity)"""
+    fy = np.asarray(fy)
+    return np.where(fy == 415, 0.48, np.where(fy == 500, 0.46, 0.53))
+
+
+def moment_capacity(b, d, Ast, fck, fy):
+    """Moment of resistance (kNm) by LSM - Clause 38"""
+    b, d, Ast, fck, fy = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                               for x in (b, d, Ast, fck, fy)))
+    ratio = xu_max_ratio(fy)
+    xu = (0.87 * fy * Ast) / (0.36 * fck * b)
+    under = 0.87 * fy * Ast * (d - 0.42 * xu)
+    limiting = 0.36 * fck * b * d ** 2 * ratio * (1 - 0.42 * ratio)
+    return np.where(xu <= ratio * d, under, limiting) / 1e6
+
+
+def limiting_moment(b, d, fck, fy):
+    """Limiting moment of a singly reinforced section (kNm) - Annex G-1.1"""
+    ratio = xu_max_ratio(fy)
+    return 0.36 * np.asarray(fck) * b * np.asarray(d, dtype=float) ** 2 * ratio * (1 - 0.42 * ratio) / 1e6
+
+
+def required_steel(Mu, b, d, fck, fy):
+    """
+    Tension steel (mm²) needed for a factored moment Mu (kNm) - Annex G-1.1(b)
+
+    Solves the same stress block as moment_capacity rather than the rounded
+    Annex G expression, so moment_capacity(required_steel(Mu)) == Mu.
+    Returns inf where Mu exceeds the limiting moment of the section.
+    """
+    Mu, b, d, fck, fy = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                              for x in (Mu, b, d, fck, fy)))
+    # Mu = 0.87 fy Ast (d - 0.42 xu), xu = 0.87 fy Ast / (0.36 fck b)
+    #   ->  a Ast² - c Ast + Mu = 0
+    a = 0.87 * fy * 0.42 * 0.87 * fy / (0.36 * fck * b)
+    c = 0.87 * fy * d
+    discriminant = c ** 2 - 4 * a * Mu * 1e6
+    with np.errstate(invalid='ignore'):
+        Ast = (c - np.sqrt(discriminant)) / (2 * a)
+    over = (discriminant < 0) | (Mu > limiting_moment(b, d, fck, fy))
+    return np.where(over, np.inf, np.maximum(Ast, 0.0))
+
+
+def minimum_steel(member_type, b, d, fy):
+    """Minimum tension steel (mm²) - Clause 26.5.1.1 / 26.5.2.1 (as FlexuralCompliance)"""
+    b, d, fy = (np.asarray(x, dtype=float) for x in (b, d, fy))
+    if member_type == 'beam':
+        return 0.85 * b * d / fy
+    if member_type == 'slab':
+        return np.where(fy <= 250, 0.0015, 0.0012) * b * d
+    return 0.0012 * b * d
+
+
+def maximum_steel(b, D):
+    """Maximum tension steel (mm²) - Clause 26.5.1.1(b)"""
+    return 0.04 * np.asarray(b, dtype=float) * D
+
+
+# =============================================================================
+# SHEAR (Clause 40, Tables 19 and 20)
+# =============================================================================
+
+_PT_STEPS = np.array([0.15, 0.25, 0.50, 0.75, 1.00, 1.25, 1.50, 1.75, 2.00])
+_TC_M15 = np.array([0.28, 0.35, 0.46, 0.54, 0.60, 0.64, 0.68, 0.71, 0.71, 0.71])
+_TC_M20 = np.array([0.28, 0.36, 0.48, 0.56, 0.62, 0.67, 0.72, 0.75, 0.79, 0.82])
+_TC_M25 = np.array([0.29, 0.36, 0.49, 0.57, 0.64, 0.70, 0.74, 0.78, 0.82, 0.85])
+
+_TC_MAX_GRADES = np.array([15, 20, 25, 30, 35, 40])
+_TC_MAX_VALUES = np.array([2.5, 2.8, 3.1, 3.5, 3.7, 4.0])
+
+
+def design_shear_strength(b, d, Ast, fck):
+    """Design shear strength of concrete tc (N/mm²) - Table 19 (as ShearCompliance)"""
+    b, d, Ast, fck = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (b, d, Ast, fck)))
+    pt = np.minimum(100 * Ast / (b * d), 3.0)
+    step = np.searchsorted(_PT_STEPS, pt, side='left')
+    grade_factor = np.minimum(1.0 + (fck - 25) / 100, 1.2)
+    high = _TC_M25[np.minimum((pt * 2).astype(int), len(_TC_M25) - 1)] * grade_factor
+    return np.select([fck == 15, fck == 20, fck >= 25],
+                     [_TC_M15[step], _TC_M20[step], high], default=0.28)
+
+
+def maximum_shear_stress(fck):
+    """tc,max (N/mm²) - Table 20; 4.0 for grades not in the table"""
+    fck = np.asarray(fck, dtype=float)
+    match = fck[..., None] == _TC_MAX_GRADES
+    return np.where(match.any(axis=-1), _TC_MAX_VALUES[match.argmax(axis=-1)], 4.0)
+
+
+def nominal_shear_stress(Vu, b, d):
+    """tv (N/mm²) for a factored shear Vu (kN) - Clause 40.1"""
+    return np.asarray(Vu, dtype=float) * 1000 / (np.asarray(b, dtype=float) * d)
+
+
+def stirrup_spacing(Vu, b, d, tc, fy, stirrup_dia, legs=2):
+    """
+    Largest vertical stirrup spacing (mm) for Vu (kN) - Clause 40.4(a) and 26.5.1.5/26.5.1.6
+
+    Spacing is governed by the strength requirement Vus = 0.87 fy Asv d / sv,
+    the minimum shear reinforcement Asv / (b sv) >= 0.4 / (0.87 fy) and the
+    maximum spacing min(0.75 d, 300 mm).
+    """
+    Vu, b, d, tc, fy = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                             for x in (Vu, b, d, tc, fy)))
+    Asv = legs * bar_area(stirrup_dia)
+    Vus = np.maximum(Vu * 1000 - tc * b * d, 0.0)
+    with np.errstate(divide='ignore'):
+        strength = np.where(Vus > 0, 0.87 * fy * Asv * d / Vus, np.inf)
+    minimum = 0.87 * fy * Asv / (0.4 * b)
+    return np.minimum.reduce([strength, minimum, 0.75 * d, np.full_like(d, 300.0)])
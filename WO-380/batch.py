@@ -0,0 +1,557 @@
+"""
+Provider batch jobs for overnight bulk analysis.
+
+Instead of one synchronous vision call per sheet, pending queue jobs are
+rasterized and packed into a provider batch file: Gemini's
+batchGenerateContent JSONL, or the OpenAI-compatible /v1/batches JSONL. The
+file is uploaded and submitted, and a manifest in batches/ maps each request
+key back to its job. Polling downloads the results of finished batches,
+saves each sheet's text as the job's "analyse" checkpoint and runs the rest
+of the pipeline (check, report, result store, search index), exactly as a
+worker would have after a synchronous call. Batch requests are billed at a
+discount and do not count against the interactive rate limits.
+
+The jobs stay claimed by the batch (with a long lease) until their results
+come back, so a worker pool running at the same time leaves them alone.
+
+Usage:
+    python batch.py submit --provider gemini --limit 500
+    python batch.py poll                 # finish every batch that is done
+    python batch.py poll --wait          # ... and keep polling until all are
+    python batch.py status
+
+    python batch.py serve --port 8765    # local stand-in for both batch APIs
+    GEMINI_BATCH_ROOT=http://localhost:8765 python batch.py submit --provider gemini
+    OPENAI_BATCH_URL=http://localhost:8765/v1 python batch.py submit --provider openai
+"""
+
+import argparse
+import glob
+import json
+import os
+import socket
+import time
+
+from job_queue import DEFAULT_DB_PATH, JobQueue
+
+BATCH_DIR = "batches"
+BATCH_LEASE = 48 * 3600        # seconds a job stays claimed by its batch
+POLL_INTERVAL = 300            # seconds between polls with --wait
+MAX_BATCH_BYTES = 190 << 20    # below the providers' batch file limits
+MAX_BATCH_REQUESTS = 10000
+
+GEMINI_BATCH_ROOT = os.getenv("GEMINI_BATCH_ROOT", "https://generativelanguage.googleapis.com")
+OPENAI_BATCH_URL = os.getenv("OPENAI_BATCH_URL", "https://api.openai.com/v1")
+OPENAI_BATCH_MODEL = os.getenv("OPENAI_BATCH_MODEL", "gpt-4o")
+
+RUNNING, SUCCEEDED, FAILED = "running", "succeeded", "failed"
+
+
+# =============================================================================
+# PROVIDER FORMATS
+# =============================================================================
+
+class GeminiBatch:
+    """Gemini Batch API: JSONL file of {key, request} lines, one output line per key."""
+
+    name = "gemini"
+
+    def __init__(self, session, root=GEMINI_BATCH_ROOT):
+        import gemini_vision
+
+        self.vision = gemini_vision
+        self.session = session
+        self.root = root.rstrip("/")
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables.")
+        self.headers = {"x-goog-api-key": api_key}
+
+    def line(self, key, image_path, prompt):
+        return {"key": key, "request": self.vision.request_body(image_path, prompt)}
+
+    def submit(self, path, display_name):
+        size = os.path.getsize(path)
+        start = self.session.post(
+            f"{self.root}/upload/v1beta/files",
+            headers=dict(self.headers, **{
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(size),
+                "X-Goog-Upload-Header-Content-Type": "application/jsonl",
+            }),
+            json={"file": {"display_name": display_name}})
+        start.raise_for_status()
+        with open(path, "rb") as f:
+            upload = self.session.post(
+                start.headers["X-Goog-Upload-URL"], data=f,
+                headers=dict(self.headers, **{
+                    "Content-Length": str(size),
+                    "X-Goog-Upload-Offset": "0",
+                    "X-Goog-Upload-Command": "upload, finalize",
+                }))
+        upload.raise_for_status()
+        created = self.session.post(
+            f"{self.root}/v1beta/models/{self.vision.MODEL}:batchGenerateContent",
+            headers=self.headers,
+            json={"batch": {"display_name": display_name,
+                            "input_config": {"file_name": upload.json()["file"]["name"]}}})
+        created.raise_for_status()
+        return created.json()["name"]
+
+    def status(self, remote):
+        """(RUNNING | SUCCEEDED | FAILED, output file or error message)"""
+        response = self.session.get(f"{self.root}/v1beta/{remote}", headers=self.headers)
+        response.raise_for_status()
+        batch = response.json()
+        state = batch.get("metadata", {}).get("state", "")
+        output = batch.get("response", {}).get("responsesFile") or \
+            batch.get("metadata", {}).get("output", {}).get("responsesFile")
+        if state.endswith("SUCCEEDED") and output:
+            return SUCCEEDED, output
+        if batch.get("error") or state.endswith(("FAILED", "CANCELLED", "EXPIRED")):
+            return FAILED, batch.get("error", {}).get("message", state)
+        return RUNNING, state
+
+    def results(self, output):
+        """(key, response fields or error message) for every line of the output file"""
+        response = self.session.get(f"{self.root}/download/v1beta/{output}:download",
+                                    params={"alt": "media"}, headers=self.headers)
+        response.raise_for_status()
+        for line in response.text.splitlines():
+            if line.strip():
+                item = json.loads(line)
+                if "error" in item:
+                    yield item["key"], str(item["error"].get("message", item["error"]))
+                else:
+                    yield item["key"], self.vision.response_fields(item["response"])
+
+
+class OpenAIBatch:
+    """OpenAI-compatible /v1/batches: JSONL of {custom_id, method, url, body} lines."""
+
+    name = "openai"
+    endpoint = "/v1/chat/completions"
+
+    def __init__(self, session, base_url=OPENAI_BATCH_URL, model=OPENAI_BATCH_MODEL):
+        import grok_vision
+
+        self.vision = grok_vision           # same chat completions request format
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables.")
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+
+    def line(self, key, image_path, prompt):
+        body = dict(self.vision.request_body(image_path, prompt), model=self.model)
+        return {"custom_id": key, "method": "POST", "url": self.endpoint, "body": body}
+
+    def submit(self, path, display_name):
+        with open(path, "rb") as f:
+            upload = self.session.post(f"{self.base_url}/files", headers=self.headers,
+                                       data={"purpose": "batch"},
+                                       files={"file": (display_name + ".jsonl", f)})
+        upload.raise_for_status()
+        created = self.session.post(
+            f"{self.base_url}/batches", headers=self.headers,
+            json={"input_file_id": upload.json()["id"], "endpoint": self.endpoint,
+                  "completion_window": "24h", "metadata": {"name": display_name}})
+        created.raise_for_status()
+        return created.json()["id"]
+
+    def status(self, remote):
+        response = self.session.get(f"{self.base_url}/batches/{remote}", headers=self.headers)
+        response.raise_for_status()
+        batch = response.json()
+        if batch["status"] in ("completed", "expired", "cancelled") and batch.get("output_file_id"):
+            # expired and cancelled batches still return the requests that finished
+            return SUCCEEDED, [batch["output_file_id"], batch.get("error_file_id")]
+        if batch["status"] in ("failed", "expired", "cancelled"):
+            errors = batch.get("errors") or {}
+            messages = [e.get("message", "") for e in errors.get("data", [])]
+            return FAILED, "; ".join(messages) or batch["status"]
+        if batch["status"] == "completed":
+            return SUCCEEDED, [None, batch.get("error_file_id")]
+        return RUNNING, batch["status"]
+
+    def results(self, output):
+        for file_id in output:
+            if not file_id:
+                continue
+            response = self.session.get(f"{self.base_url}/files/{file_id}/content",
+                                        headers=self.headers)
+            response.raise_for_status()
+            for line in response.text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                answer = item.get("response") or {}
+                if item.get("error") or answer.get("status_code", 200) != 200:
+                    error = item.get("error") or answer.get("body", {}).get("error", {})
+                    yield item["custom_id"], str(error.get("message", error))
+                else:
+                    yield item["custom_id"], self.vision.response_fields(answer["body"])
+
+
+FORMATS = {"gemini": GeminiBatch, "openai": OpenAIBatch}
+
+
+def open_format(name, session=None):
+    import requests
+
+    if name not in FORMATS:
+        raise ValueError(f"Unknown batch format {name!r}. Available: {sorted(FORMATS)}")
+    return FORMATS[name](session or requests.Session())
+
+
+# =============================================================================
+# SUBMIT
+# =============================================================================
+
+def _manifest_path(batch_id):
+    return os.path.join(BATCH_DIR, f"{batch_id}.json")
+
+
+def _save_manifest(manifest):
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    path = _manifest_path(manifest["id"])
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def manifests(state=None):
+    """Every batch manifest, oldest first, optionally only those in one state."""
+    found = []
+    for path in sorted(glob.glob(os.path.join(BATCH_DIR, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if state is None or manifest["state"] == state:
+            found.append(manifest)
+    return found
+
+
+def _claim_sheets(queue, worker_id, limit):
+    """Claim up to limit pending jobs and rasterize them; yields (job, image_path)"""
+    from pipeline import checkpoint_is_valid, rasterize
+
+    for _ in range(limit):
+        job = queue.claim(worker_id, BATCH_LEASE)
+        if job is None:
+            return
+        done = queue.checkpoints(job["id"])
+        try:
+            if "rasterize" in done and checkpoint_is_valid("rasterize", done["rasterize"]):
+                image_path = done["rasterize"]
+            else:
+                image_path = rasterize(job)
+                queue.save_checkpoint(job["id"], "rasterize", image_path)
+        except Exception as e:
+            print(f"❌ job {job['id']} {queue.fail(job['id'], worker_id, e)}: {e}")
+            continue
+        yield job, image_path
+
+
+def _send(backend, queue, worker_id, prompt, path, entries):
+    """Submit one batch file and write its manifest; the jobs are released on failure"""
+    from prompt_manager import prompt_version
+
+    batch_id = os.path.splitext(os.path.basename(path))[0]
+    try:
+        remote = backend.submit(path, batch_id)
+    except Exception as e:
+        for entry in entries.values():
+            queue.fail(entry["job_id"], worker_id, f"batch submission failed: {e}")
+        raise RuntimeError(f"Submitting {path} failed: {e}")
+    manifest = {
+        "id": batch_id, "format": backend.name, "remote": remote, "worker": worker_id,
+        "prompt_version": prompt_version(prompt), "submitted_at": time.time(),
+        "state": RUNNING, "requests": entries,
+    }
+    _save_manifest(manifest)
+    print(f"📤 {batch_id}: {len(entries)} sheet(s) submitted as {remote}")
+    return manifest
+
+
+def submit(queue, backend, prompt, limit=MAX_BATCH_REQUESTS):
+    """
+    Claim up to limit pending jobs, pack their sheets into batch files of at
+    most MAX_BATCH_BYTES / MAX_BATCH_REQUESTS and submit them. Returns the
+    manifests of the submitted batches.
+    """
+    worker_id = f"batch-{socket.gethostname()}-{os.getpid()}"
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    submitted, entries, out, path = [], {}, None, None
+
+    def flush():
+        out.close()
+        submitted.append(_send(backend, queue, worker_id, prompt, path, dict(entries)))
+        entries.clear()
+
+    for job, image_path in _claim_sheets(queue, worker_id, limit):
+        line = json.dumps(backend.line(f"job-{job['id']}", image_path, prompt)) + "\n"
+        if out is not None and (out.tell() + len(line) > MAX_BATCH_BYTES
+                                or len(entries) >= MAX_BATCH_REQUESTS):
+            try:
+                flush()
+            except Exception as e:
+                # not in entries yet, so _send did not release it
+                queue.fail(job["id"], worker_id, f"batch submission failed: {e}")
+                raise
+            out = None
+        if out is None:
+            path = os.path.join(BATCH_DIR, f"{backend.name}-{time.strftime('%Y%m%d-%H%M%S')}"
+                                           f"-{len(submitted) + 1}.jsonl")
+            out = open(path, "w", encoding="utf-8")
+        out.write(line)
+        entries[f"job-{job['id']}"] = {"job_id": job["id"], "image_path": image_path}
+    if out is not None:
+        flush()
+    return submitted
+
+
+# =============================================================================
+# POLL
+# =============================================================================
+
+def finish_job(queue, job_id, worker_id, text, image_path):
+    """Save a batch answer as the job's analyse checkpoint and run the rest of the pipeline"""
+    from phash import PageIndex, keep_raster, signature
+    from pipeline import (PAGE_INDEX_PATH, index_report, record_results, run_job,
+                          write_report)
+
+    queue.save_checkpoint(job_id, "analyse", text)
+    index = PageIndex(PAGE_INDEX_PATH)
+    try:
+        page = signature(image_path)
+        index.add(keep_raster(image_path, page.digest), text, page)   # later reissues reuse it
+    finally:
+        index.close()
+    context = run_job(queue, queue.get(job_id))
+    md_filename = write_report(context)
+    record_results(context)
+    index_report(md_filename)
+    if not queue.complete(job_id, worker_id):
+        print(f"⚠️ job {job_id}: lease lost, result left to its new worker")
+    return md_filename
+
+
+def poll(queue, manifest, backend):
+    """
+    Check one batch. A finished batch is demultiplexed: every answer goes to
+    its job, and jobs without an answer are failed so they are retried (by a
+    worker or the next batch). Returns the batch state.
+    """
+    state, detail = backend.status(manifest["remote"])
+    entries, worker = manifest["requests"], manifest["worker"]
+    if state == RUNNING:
+        for entry in entries.values():
+            queue.heartbeat(entry["job_id"], worker, BATCH_LEASE)
+        print(f"⏳ {manifest['id']}: {detail}")
+        return state
+
+    answered, tokens = set(), [0, 0]
+    if state == SUCCEEDED:
+        for key, answer in backend.results(detail):
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            answered.add(key)
+            if isinstance(answer, str):
+                print(f"❌ {key}: {answer}")
+                queue.fail(entry["job_id"], worker, f"batch request failed: {answer}")
+                continue
+            if answer["finish_reason"] in ("MAX_TOKENS", "length"):
+                print(f"✂️ {key}: answer cut off at the output limit")
+            tokens[0] += answer["input_tokens"] or 0
+            tokens[1] += answer["output_tokens"] or 0
+            try:
+                md_filename = finish_job(queue, entry["job_id"], worker, answer["text"],
+                                         entry["image_path"])
+                print(f"✅ {key}: {md_filename}")
+            except Exception as e:
+                print(f"❌ {key} {queue.fail(entry['job_id'], worker, e)}: {e}")
+    for key in set(entries) - answered:
+        queue.fail(entries[key]["job_id"], worker, f"no answer in batch {manifest['id']}: {detail}")
+
+    manifest.update(state=state, finished_at=time.time(), answered=len(answered),
+                    input_tokens=tokens[0], output_tokens=tokens[1])
+    _save_manifest(manifest)
+    print(f"📥 {manifest['id']} {state}: {len(answered)}/{len(entries)} answered, "
+          f"{tokens[0]} input / {tokens[1]} output tokens")
+    return state
+
+
+# =============================================================================
+# LOCAL STAND-IN
+# =============================================================================
+
+STAND_IN_ANSWER = ("**Drawing Information**\n- Stand-in batch answer for {key}\n\n"
+                   "**Reinforcement Details by Panel/Section**\n- Y10@150 c/c bottom\n")
+
+
+def stand_in_server(port=8765, answer=STAND_IN_ANSWER):
+    """
+    HTTP server speaking just enough of both batch APIs to run submit/poll
+    end to end offline: uploads are kept in memory and every batch finishes
+    on its first poll with answer.format(key=...) for each request.
+    """
+    import email.parser
+    import itertools
+    import re
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    files, batches, ids = {}, {}, itertools.count(1)
+
+    def answer_line(kind, item):
+        if kind == "gemini":
+            return {"key": item["key"], "response": {
+                "candidates": [{"content": {"parts": [{"text": answer.format(key=item["key"])}],
+                                            "role": "model"}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0}}}
+        return {"custom_id": item["custom_id"], "error": None, "response": {
+            "status_code": 200, "body": {
+                "choices": [{"message": {"role": "assistant",
+                                         "content": answer.format(key=item["custom_id"])},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0}}}}
+
+    def run(kind, input_name):
+        lines = [json.loads(l) for l in files[input_name].decode().splitlines() if l.strip()]
+        output = f"files/{next(ids)}" if kind == "gemini" else f"file-{next(ids)}"
+        files[output] = "".join(json.dumps(answer_line(kind, item)) + "\n"
+                                for item in lines).encode()
+        return output
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, body, status=200, headers=()):
+            data = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_POST(self):
+            path, body = self.path.split("?")[0], self._body()
+            if path == "/upload/v1beta/files" and self.headers.get("X-Goog-Upload-Command") == "start":
+                upload = f"http://{self.headers['Host']}/upload/v1beta/files?upload_id={next(ids)}"
+                return self._send({}, headers=[("X-Goog-Upload-URL", upload)])
+            if path == "/upload/v1beta/files":
+                name = f"files/{next(ids)}"
+                files[name] = body
+                return self._send({"file": {"name": name}})
+            if path.endswith(":batchGenerateContent"):
+                name = f"batches/{next(ids)}"
+                batches[name] = ("gemini", json.loads(body)["batch"]["input_config"]["file_name"])
+                return self._send({"name": name, "metadata": {"state": "BATCH_STATE_PENDING"}})
+            if path == "/v1/files":
+                message = email.parser.BytesParser().parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+                name = f"file-{next(ids)}"
+                for part in message.get_payload():
+                    if part.get_param("name", header="content-disposition") == "file":
+                        files[name] = part.get_payload(decode=True)
+                return self._send({"id": name, "object": "file", "purpose": "batch"})
+            if path == "/v1/batches":
+                name = f"batch_{next(ids)}"
+                batches[name] = ("openai", json.loads(body)["input_file_id"])
+                return self._send({"id": name, "status": "validating"})
+            self._send({"error": {"message": f"unknown endpoint {path}"}}, 404)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path.startswith("/v1beta/batches/"):
+                name = path[len("/v1beta/"):]
+                output = run(*batches[name])
+                return self._send({"name": name, "done": True,
+                                   "metadata": {"state": "BATCH_STATE_SUCCEEDED",
+                                                "output": {"responsesFile": output}},
+                                   "response": {"responsesFile": output}})
+            match = re.fullmatch(r"/download/v1beta/(files/\d+):download", path)
+            if match:
+                return self._send(files[match.group(1)])
+            if path.startswith("/v1/batches/"):
+                name = path[len("/v1/batches/"):]
+                return self._send({"id": name, "status": "completed",
+                                   "output_file_id": run(*batches[name]), "error_file_id": None})
+            match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+            if match:
+                return self._send(files[match.group(1)])
+            self._send({"error": {"message": f"unknown endpoint {path}"}}, 404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provider batch jobs for bulk analysis")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Queue database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_cmd = commands.add_parser("submit", help="Send pending jobs as batch requests")
+    submit_cmd.add_argument("--provider", default="gemini", choices=sorted(FORMATS))
+    submit_cmd.add_argument("--limit", type=int, default=MAX_BATCH_REQUESTS,
+                            help="Most jobs to take from the queue")
+    submit_cmd.add_argument("--prompt", default="prompt1", help="Prompt name in prompt.py")
+
+    poll_cmd = commands.add_parser("poll", help="Finish the jobs of batches that are done")
+    poll_cmd.add_argument("--wait", action="store_true", help="Poll until every batch is done")
+
+    commands.add_parser("status", help="List the batches")
+
+    serve_cmd = commands.add_parser("serve", help="Run the local stand-in batch server")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = stand_in_server(args.port)
+        print(f"🧪 Stand-in batch server on http://127.0.0.1:{args.port}")
+        print(f"   GEMINI_BATCH_ROOT=http://127.0.0.1:{args.port} "
+              f"OPENAI_BATCH_URL=http://127.0.0.1:{args.port}/v1")
+        server.serve_forever()
+        return
+    if args.command == "status":
+        for manifest in manifests():
+            print(f"{manifest['state']:>9}  {manifest['id']}  {manifest['remote']}  "
+                  f"{len(manifest['requests'])} sheet(s)  {manifest['prompt_version']}")
+        return
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    queue = JobQueue(args.db)
+    try:
+        if args.command == "submit":
+            import prompt as prompts
+
+            backend = open_format(args.provider)
+            batches = submit(queue, backend, getattr(prompts, args.prompt), args.limit)
+            if not batches:
+                print("📭 No pending jobs")
+        elif args.command == "poll":
+            backends = {}
+            while True:
+                for manifest in manifests(RUNNING):
+                    if manifest["format"] not in backends:
+                        backends[manifest["format"]] = open_format(manifest["format"])
+                    poll(queue, manifest, backends[manifest["format"]])
+                if not args.wait or not manifests(RUNNING):
+                    break
+                time.sleep(POLL_INTERVAL)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
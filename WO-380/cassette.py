@@ -0,0 +1,227 @@
+"""
+Record/replay transport for the vision client's HTTP session.
+
+A cassette is a gzip-compressed JSONL file of HTTP exchanges. In record mode
+every request the session sends goes to the network and the response is
+appended to the cassette; in replay mode responses come from the cassette
+and nothing leaves the machine, so the whole pipeline runs offline, without
+API keys and at full speed - or at the recorded speed, to profile it as it
+would behave live. Requests are matched by a fingerprint of method, URL and
+body with the credentials left out, so a cassette recorded with one key
+replays with any key (or none).
+
+    VISION_CASSETTE=cassettes/sheets.jsonl.gz VISION_CASSETTE_MODE=record python worker.py run
+    VISION_CASSETTE=cassettes/sheets.jsonl.gz python worker.py run        # replay
+    VISION_CASSETTE_LATENCY=recorded ...                                  # replay at live speed
+
+    client = VisionClient(cassette=Cassette("cassettes/sheets.jsonl.gz", mode="auto"))
+
+    python cassette.py list cassettes/sheets.jsonl.gz
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+MODES = ("replay", "record", "auto")     # auto: replay what is recorded, record the rest
+SECRET_PARAMS = {"key", "api_key"}
+SECRET_HEADERS = {"authorization", "x-goog-api-key", "x-api-key"}
+KEY_VARIABLES = ("GEMINI_API_KEY", "OPENROUTER_API_KEY")
+
+
+def _redacted_url(url):
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _body_bytes(body):
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    return b""                      # streamed uploads are matched on method and URL
+
+
+def fingerprint(method, url, body):
+    """Hash of a request without its credentials; JSON bodies are compared by content"""
+    data = _body_bytes(body)
+    try:
+        data = json.dumps(json.loads(data), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha256(f"{method.upper()} {_redacted_url(url)}\n".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class CassetteMiss(Exception):
+    """A replayed request that the cassette has no response for."""
+
+
+class Cassette:
+    """
+    Recorded exchanges of one cassette file.
+
+    latency: None replays instantly, "recorded" sleeps as long as the live
+    call took, a number sleeps that many seconds per request.
+    """
+
+    def __init__(self, path, mode="replay", latency=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}. Available: {list(MODES)}")
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"Cassette not found: {path}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = defaultdict(list)
+        self._played = defaultdict(int)
+        self.hits = 0
+        self.recorded = 0
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["fingerprint"]].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def entries(self):
+        return [entry for entries in self._entries.values() for entry in entries]
+
+    def find(self, key):
+        """Next recorded response for a fingerprint; repeats cycle through their recordings"""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            entry = entries[self._played[key] % len(entries)]
+            self._played[key] += 1
+            self.hits += 1
+            return entry
+
+    def add(self, key, request, response, elapsed):
+        entry = {
+            "fingerprint": key,
+            "method": request.method,
+            "url": _redacted_url(request.url),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items()
+                        if k.lower() not in SECRET_HEADERS},
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed": round(elapsed, 3),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._entries[key].append(entry)
+            self.recorded += 1
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:   # one gzip member per exchange
+                f.write(json.dumps(entry) + "\n")
+
+    def delay(self, entry):
+        if self.latency == "recorded":
+            time.sleep(entry["elapsed"])
+        elif self.latency:
+            time.sleep(float(self.latency))
+
+    def mount(self, session):
+        """Route every request of a requests.Session through this cassette"""
+        adapter = CassetteAdapter(self)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if self.mode == "replay":
+            for name in KEY_VARIABLES:    # providers insist on a key; replays never send it
+                os.environ.setdefault(name, "cassette-replay")
+        return adapter
+
+    def stats(self):
+        return {"path": self.path, "mode": self.mode, "entries": len(self),
+                "hits": self.hits, "recorded": self.recorded}
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests transport adapter that replays from, or records to, a Cassette"""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        key = fingerprint(request.method, request.url, request.body)
+        if self.cassette.mode != "record":
+            entry = self.cassette.find(key)
+            if entry is not None:
+                self.cassette.delay(entry)
+                return self._response(request, entry)
+            if self.cassette.mode == "replay":
+                raise ConnectionError(
+                    CassetteMiss(f"No recording of {request.method} {_redacted_url(request.url)} "
+                                 f"in {self.cassette.path}"), request=request)
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        response.content            # read the body before it is stored
+        self.cassette.add(key, request, response, time.perf_counter() - started)
+        return response
+
+    def _response(self, request, entry):
+        response = Response()
+        response.status_code = entry["status"]
+        response.reason = entry.get("reason")
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers.pop("Content-Encoding", None)      # the body is stored decoded
+        response._content = base64.b64decode(entry["body"])
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def from_env():
+    """Cassette configured by VISION_CASSETTE / _MODE / _LATENCY, or None"""
+    path = os.getenv("VISION_CASSETTE")
+    if not path:
+        return None
+    latency = os.getenv("VISION_CASSETTE_LATENCY") or None
+    return Cassette(path, os.getenv("VISION_CASSETTE_MODE", "replay"), latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a vision client cassette")
+    parser.add_argument("command", choices=["list", "stats"])
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.path)
+    entries = cassette.entries()
+    if args.command == "list":
+        for entry in sorted(entries, key=lambda e: e["recorded_at"]):
+            print(f"{entry['fingerprint'][:12]}  {entry['status']}  {entry['elapsed']:>6.2f}s  "
+                  f"{entry['method']} {entry['url']}")
+    size = os.path.getsize(args.path)
+    print(f"📼 {args.path}: {len(entries)} exchange(s), {len({e['fingerprint'] for e in entries})} "
+          f"distinct, {sum(e['elapsed'] for e in entries):.1f}s recorded, {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Bridge between extracted drawing data and the IS code checkers.
+"""
+
+import importlib
+import math
+import re
+from dataclasses import asdict, fields
+
+from units import BAR_CALLOUT, bar_callouts
+
+
+def is456():
+    return importlib.import_module("IS.IS_456_2000")
+
+
+def sp34():
+    return importlib.import_module("IS.SP_34")
+
+
+CONCRETE_GRADE = re.compile(r"\bM\s?(\d{2})\b")
+STEEL_GRADE = re.compile(r"\bFe\s?(\d{3})\b", re.IGNORECASE)
+STRUCK = re.compile(r"~~.*?~~")  # superseded by a later revision (raster_diff.merge_extraction)
+
+
+def current_text(text):
+    """Extraction text without the facts struck out as superseded."""
+    return STRUCK.sub("", text)
+
+
+def parse_extraction(text):
+    """
+    Pull the values the checkers can use out of an extraction report.
+
+    Returns a dict with the distinct bar callouts as (diameter, spacing_mm)
+    tuples and the concrete and steel grades mentioned on the sheet, leaving
+    out struck-out (superseded) text.
+    """
+    text = current_text(text)
+    # Callouts as they appear in extraction reports, e.g. Y10@150, Y8 @ 7"c/c, #4@6"
+    found = bar_callouts([match.group(0) for match in BAR_CALLOUT.finditer(text)])
+    callouts = {(float(dia), round(spacing)) for dia, spacing in found if not math.isnan(dia)}
+    return {
+        "bar_callouts": sorted(callouts),
+        "concrete_grades": sorted({int(g) for g in CONCRETE_GRADE.findall(text)}),
+        "steel_grades": sorted({int(g) for g in STEEL_GRADE.findall(text)}),
+    }
+
+
+def check_extraction(text, effective_depth=None):
+    """
+    Run the rule checks that need no member geometry on an extraction report.
+
+    Bar callouts are checked as slab reinforcement against Clause 26.3; when
+    the slab effective depth is unknown only the absolute 300 mm cap applies.
+    Returns a results dict in the DesignChecker.check_compliance format.
+    """
+    code = is456()
+    data = parse_extraction(text)
+    results = {
+        'overall_compliance': True,
+        'failed_checks': [],
+        'passed_checks': [],
+        'utilization_ratios': {},
+        'check_values': {},
+        'recommendations': []
+    }
+
+    def record(is_valid, msg):
+        if is_valid:
+            results['passed_checks'].append(msg)
+        else:
+            results['failed_checks'].append(msg)
+            results['overall_compliance'] = False
+
+    for fck in data["concrete_grades"]:
+        record(*code.MaterialCompliance.check_concrete_grade(fck))
+    for fy in data["steel_grades"]:
+        record(*code.MaterialCompliance.check_steel_grade(fy))
+
+    depth = effective_depth if effective_depth else float('inf')
+    for dia, spacing in data["bar_callouts"]:
+        is_valid, msg = code.ReinforcementDetailing.check_spacing_requirements(
+            spacing, code.MemberType.SLAB, dia, depth)
+        msg = f"Y{dia:g}@{spacing}: {msg}"
+        record(is_valid, msg)
+        results['check_values'][msg] = (spacing, code.ReinforcementDetailing.spacing_limit(
+            spacing, code.MemberType.SLAB, dia, depth))
+
+    if not data["bar_callouts"]:
+        results['recommendations'].append(
+            "No bar callouts found in the extraction; detailing checks were skipped")
+
+    return results
+
+
+def _enum(enum_cls, value, field):
+    try:
+        return enum_cls(value)
+    except (ValueError, TypeError):
+        valid = [member.value for member in enum_cls]
+        raise ValueError(f"Invalid {field} {value!r}. Valid values: {valid}")
+
+
+def _object(value, field):
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"Invalid {field}: expected an object, got {type(value).__name__}")
+    return value
+
+
+def _list(value, field):
+    if not isinstance(value, list):
+        raise ValueError(f"Invalid {field}: expected a list, got {type(value).__name__}")
+    return value
+
+
+def _number(value, field):
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError(f"Invalid {field}: expected a number, got {value!r}")
+    return value
+
+
+def _dataclass(cls, values, field):
+    values = _object(values, field)
+    for f in fields(cls):
+        if f.name not in values:
+            continue
+        value = values[f.name]
+        if f.type in (int, float):
+            _number(value, f"{field}.{f.name}")
+        elif f.type in (bool, str) and not isinstance(value, f.type):
+            raise ValueError(f"Invalid {field}.{f.name}: expected {f.type.__name__}, got {value!r}")
+    try:
+        return cls(**values)
+    except TypeError as e:
+        raise ValueError(f"Invalid {field}: {e}")
+
+
+def check_member(member):
+    """
+    Run the IS 456 and SP 34 checks on one member described as plain JSON data.
+
+    Expected keys (all dimensions in mm, loads in kN/m):
+        member_type, exposure, support_condition,
+        dimensions, material, loads, reinforcement  -> IS 456:2000 checks
+        design_moment, design_shear                 -> analysed demands (kNm, kN), optional
+        bars, options                               -> SP 34:1987 checks
+        codes: ["IS456", "SP34"] to restrict which checkers run
+
+    Raises ValueError for malformed input. Returns {"IS456": ..., "SP34": ...}.
+    """
+    member = _object(member, "member")
+    codes = _list(member.get("codes", ["IS456", "SP34"]), "codes")
+    support_condition = member.get("support_condition", "simply_supported")
+    if not isinstance(support_condition, str):
+        raise ValueError(f"Invalid support_condition {support_condition!r}")
+    output = {}
+
+    if "IS456" in codes:
+        code = is456()
+        if support_condition not in code.MOMENT_DIVISORS:
+            raise ValueError(f"Unknown support_condition {support_condition!r}. "
+                             f"Available: {list(code.MOMENT_DIVISORS)}")
+        output["IS456"] = design_checker().check_compliance(
+            member_type=_enum(code.MemberType, member.get("member_type", "beam"), "member_type"),
+            dimensions=_dataclass(code.Dimensions, member.get("dimensions"), "dimensions"),
+            material=_dataclass(code.Material, member.get("material"), "material"),
+            loads=_dataclass(code.Loads, member.get("loads"), "loads"),
+            exposure=_enum(code.ExposureCondition, member.get("exposure", "moderate"), "exposure"),
+            reinforcement=_dataclass(code.Reinforcement, member.get("reinforcement"), "reinforcement"),
+            support_condition=support_condition,
+            design_moment=_number(member.get("design_moment"), "design_moment"),
+            design_shear=_number(member.get("design_shear"), "design_shear"))
+
+    if "SP34" in codes:
+        code = sp34()
+        dims = _object(member.get("dimensions"), "dimensions")
+        material = _object(member.get("material"), "material")
+        geometry = _dataclass(code.MemberGeometry, {
+            key: dims.get(key, 0)
+            for key in ("length", "width", "depth", "effective_depth", "cover")
+        }, "dimensions")
+        bars = [_dataclass(code.ReinforcementBar, bar, "bars")
+                for bar in _list(member.get("bars", []), "bars")]
+        options = _object(member.get("options"), "options")
+        is_ductile = member.get("is_ductile", False)
+        if not isinstance(is_ductile, bool):
+            raise ValueError(f"Invalid is_ductile {is_ductile!r}: expected true or false")
+        try:
+            results = detailing_checker().check_member_detailing(
+                member_type=_enum(code.MemberType, member.get("member_type", "beam"), "member_type"),
+                geometry=geometry,
+                reinforcement=bars,
+                concrete_grade=_enum(code.ConcreteGrade, material.get("fck", 25), "concrete grade"),
+                steel_grade=_enum(code.SteelGrade, material.get("fy", 415), "steel grade"),
+                exposure_condition=_enum(code.ExposureCondition, member.get("exposure", "moderate"), "exposure"),
+                is_ductile=is_ductile,
+                **options)
+        except TypeError as e:
+            raise ValueError(f"Invalid options: {e}")
+        output["SP34"] = {
+            'overall_compliance': all(result.is_compliant for result in results.values()),
+            'checks': {name: asdict(result) for name, result in results.items()}
+        }
+
+    return output
+
+
+_checkers = {}
+
+
+def design_checker():
+    if "IS456" not in _checkers:
+        _checkers["IS456"] = is456().DesignChecker()
+    return _checkers["IS456"]
+
+
+def detailing_checker():
+    if "SP34" not in _checkers:
+        _checkers["SP34"] = sp34().DetailingChecker()
+    return _checkers["SP34"]
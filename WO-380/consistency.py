@@ -0,0 +1,288 @@
+"""
+Cross-sheet consistency checks for multi-sheet drawing sets.
+
+A drawing set shows the same members on several sheets (a column on the
+foundation layout and on the column schedule, a slab panel on the layout and
+on the reinforcement sheet). Every member mentioned in an extraction report
+becomes a record keyed by its mark ("C1", "FB1") or grid panel
+("A-1 to B-2"). Records go into a hash index on that key, so joining a set
+of hundreds of sheets is linear in the number of records rather than a
+pairwise comparison of sheets. Members found on more than one sheet are
+compared for bars, concrete grade, steel grade and cover.
+
+Usage:
+    checker = ConsistencyChecker()
+    for path in glob.glob("results/*.md"):
+        checker.add_sheet(path, open(path, encoding="utf-8").read())
+    for issue in checker.check():
+        print(issue.describe())
+
+    python consistency.py results/*.md
+    python consistency.py results/*.md --json
+"""
+
+import argparse
+import glob
+import json
+import re
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from compliance import CONCRETE_GRADE, STEEL_GRADE, current_text, parse_extraction
+
+# Member marks as drawn: FB1, C3, RF2, S12, W1 ...
+MEMBER_MARK = re.compile(r"\b(FB|GB|PB|TB|RB|SB|B|C|RF|CF|F|S|SW|W)(\d{1,3}[A-Z]?)\b")
+PANEL_REFERENCE = re.compile(r"\b([A-Z]{1,2})\s*-\s*(\d{1,2})\s+to\s+([A-Z]{1,2})\s*-\s*(\d{1,2})\b")
+BAR_COUNT = re.compile(r"\b(\d{1,2})\s*[YT](\d{1,2})\b")
+KIND_COVER = re.compile(
+    r"((?:footing|wall|column|slab|beam)s?(?:\s*/\s*(?:footing|wall|column|slab|beam)s?)*)"
+    r"\**\s*[:=\-]?\**\s*(\d{2,3})\s*mm", re.IGNORECASE)
+COVER_VALUE = re.compile(r"cover\**\s*[:=\-]?\**\s*(\d{2,3})\s*mm", re.IGNORECASE)
+
+MARK_KINDS = {
+    'FB': 'beam', 'GB': 'beam', 'PB': 'beam', 'TB': 'beam', 'RB': 'beam', 'SB': 'beam',
+    'B': 'beam', 'C': 'column', 'RF': 'footing', 'CF': 'footing', 'F': 'footing',
+    'S': 'slab', 'SW': 'wall', 'W': 'wall',
+}
+
+# Attributes compared between sheets
+ATTRIBUTES = ('bars', 'concrete_grade', 'steel_grade', 'cover')
+
+
+@dataclass(slots=True)
+class MemberRecord:
+    """What one sheet says about one member"""
+    sheet: str
+    key: str                                # mark or panel reference
+    kind: str
+    bars: FrozenSet[str] = frozenset()      # normalized callouts: 'Y10@150', '12Y16'
+    concrete_grade: Optional[int] = None
+    steel_grade: Optional[int] = None
+    cover: Optional[float] = None
+
+
+@dataclass(slots=True)
+class Inconsistency:
+    """One attribute of one member that differs between sheets"""
+    key: str
+    kind: str
+    attribute: str
+    values: Dict[str, object] = field(default_factory=dict)   # {sheet: value}
+
+    def describe(self) -> str:
+        shown = "; ".join(f"{sheet}: {_format(value, self.attribute)}"
+                          for sheet, value in self.values.items())
+        return f"{self.kind} {self.key}: {self.attribute.replace('_', ' ')} differs ({shown})"
+
+
+UNIT_FORMATS = {'concrete_grade': "M{:g}", 'steel_grade': "Fe{:g}", 'cover': "{:g} mm"}
+
+
+def _format(value, attribute: str = '') -> str:
+    if isinstance(value, frozenset):
+        return ", ".join(sorted(value)) or "-"
+    return UNIT_FORMATS.get(attribute, "{:g}").format(value)
+
+
+# =============================================================================
+# EXTRACTION
+# =============================================================================
+
+def _blocks(text: str) -> List[List[str]]:
+    """
+    Split a report into item blocks: a top-level line with its indented
+    sub-bullets, or consecutive top-level lines up to a blank line
+    ("What:" / "Where:" / "Represents:" items)
+    """
+    blocks, current, indented = [], [], False
+    for line in text.splitlines():
+        if not line.strip():
+            if current:
+                blocks.append(current)
+            current, indented = [], False
+            continue
+        is_indented = line[:1].isspace()
+        if current and not is_indented and indented:
+            blocks.append(current)
+            current, indented = [], False
+        current.append(line)
+        indented = indented or is_indented
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def panel_key(x0: str, y0: str, x1: str, y1: str) -> str:
+    """Normalized panel reference: corners ordered, e.g. 'A-1 to B-2'"""
+    first, second = sorted([(x0.upper(), int(y0)), (x1.upper(), int(y1))])
+    return f"{first[0]}-{first[1]} to {second[0]}-{second[1]}"
+
+
+def _keys(text: str) -> Dict[str, str]:
+    """{key: kind} of the member marks and panels mentioned in text"""
+    keys = {f"{prefix}{number}": MARK_KINDS[prefix] for prefix, number in MEMBER_MARK.findall(text)}
+    for groups in PANEL_REFERENCE.findall(text):
+        keys[panel_key(*groups)] = 'panel'
+    return keys
+
+
+def _bars(text: str) -> FrozenSet[str]:
+    callouts = {f"Y{dia:g}@{spacing}" for dia, spacing in parse_extraction(text)["bar_callouts"]}
+    counts = {f"{int(n)}Y{int(dia)}" for n, dia in BAR_COUNT.findall(text)}
+    return frozenset(callouts | counts)
+
+
+def _single(values: Iterable[str]) -> Optional[int]:
+    values = {int(v) for v in values}
+    return values.pop() if len(values) == 1 else None
+
+
+def _kind_covers(lines: Iterable[str]) -> Dict[str, float]:
+    covers = {}
+    for line in lines:
+        for kinds, value in KIND_COVER.findall(line):
+            for kind in re.split(r"\s*/\s*", kinds.lower()):
+                covers.setdefault(kind.rstrip('s'), float(value))
+    return covers
+
+
+def records_from_extraction(sheet: str, text: str) -> List[MemberRecord]:
+    """
+    Member records of one extraction report.
+
+    A block whose first line names members (e.g. "Column C1:") describes
+    those members; otherwise every member or panel mentioned in the block
+    gets the block's bars. Grades and covers given for one member override
+    the sheet-wide values from the general notes. Struck-out (superseded)
+    text is left out.
+    """
+    text = current_text(text)
+    concrete = _single(CONCRETE_GRADE.findall(text))
+    steel = _single(STEEL_GRADE.findall(text))
+    sheet_covers = {}
+    found: Dict[str, MemberRecord] = {}
+
+    for block in _blocks(text):
+        body = "\n".join(block)
+        if "cover" in body.lower():
+            for kind, value in _kind_covers(block).items():
+                sheet_covers.setdefault(kind, value)
+        keys = _keys(block[0]) or _keys(body)
+        if not keys:
+            continue
+        bars = _bars(body)
+        cover = COVER_VALUE.search(body)
+        block_concrete = _single(CONCRETE_GRADE.findall(body))
+        block_steel = _single(STEEL_GRADE.findall(body))
+        for key, kind in keys.items():
+            record = found.get(key)
+            if record is None:
+                record = found[key] = MemberRecord(sheet, key, kind)
+            record.bars = record.bars | bars
+            if cover:
+                record.cover = float(cover.group(1))
+            record.concrete_grade = block_concrete or record.concrete_grade
+            record.steel_grade = block_steel or record.steel_grade
+
+    for record in found.values():
+        record.concrete_grade = record.concrete_grade or concrete
+        record.steel_grade = record.steel_grade or steel
+        if record.cover is None:
+            record.cover = sheet_covers.get('slab' if record.kind == 'panel' else record.kind)
+    return list(found.values())
+
+
+# =============================================================================
+# CONSISTENCY CHECKER
+# =============================================================================
+
+class ConsistencyChecker:
+    """Joins member records of many sheets on their key and compares them"""
+
+    def __init__(self):
+        self.index: Dict[str, Dict[str, MemberRecord]] = defaultdict(dict)   # key -> {sheet: record}
+        self.sheets: List[str] = []
+
+    def add(self, record: MemberRecord):
+        """Add one record; records of the same member on one sheet are merged"""
+        existing = self.index[record.key].get(record.sheet)
+        if existing is None:
+            self.index[record.key][record.sheet] = record
+            return
+        existing.bars = existing.bars | record.bars
+        for attribute in ('concrete_grade', 'steel_grade', 'cover'):
+            if getattr(existing, attribute) is None:
+                setattr(existing, attribute, getattr(record, attribute))
+
+    def add_sheet(self, sheet: str, text: str) -> int:
+        """Add every member of an extraction report; returns the number of records"""
+        records = records_from_extraction(sheet, text)
+        for record in records:
+            self.add(record)
+        self.sheets.append(sheet)
+        return len(records)
+
+    def shared(self) -> Dict[str, Dict[str, MemberRecord]]:
+        """Members that appear on more than one sheet"""
+        return {key: sheets for key, sheets in self.index.items() if len(sheets) > 1}
+
+    def check(self, attributes: Iterable[str] = ATTRIBUTES) -> List[Inconsistency]:
+        """
+        Every attribute of a shared member whose values differ between sheets.
+        Sheets that do not give a value (no bars, no grade) are left out of the
+        comparison rather than counted as a mismatch. Bars only differ when two
+        sheets each give a callout the other lacks; a sheet that shows a subset
+        of another's bars is less detailed, not inconsistent.
+        """
+        issues = []
+        for key, sheets in sorted(self.shared().items()):
+            kind = next(iter(sheets.values())).kind
+            for attribute in attributes:
+                values = {sheet: getattr(record, attribute) for sheet, record in sheets.items()
+                          if getattr(record, attribute)}
+                differs = (_bars_conflict(values.values()) if attribute == 'bars'
+                           else len(set(values.values())) > 1)
+                if differs:
+                    issues.append(Inconsistency(key, kind, attribute, values))
+        return issues
+
+
+def _bars_conflict(bar_sets: Iterable[FrozenSet[str]]) -> bool:
+    """True unless the bar sets nest, each contained in the next larger one"""
+    ordered = sorted(set(bar_sets), key=len)
+    return any(not smaller <= larger for smaller, larger in zip(ordered, ordered[1:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-sheet consistency of extracted members")
+    parser.add_argument("paths", nargs="+", help="Extraction reports (globs allowed)")
+    parser.add_argument("--attribute", action="append", choices=ATTRIBUTES,
+                        help="Only compare these attributes (repeatable)")
+    parser.add_argument("--json", action="store_true", help="Print the issues as JSON")
+    args = parser.parse_args()
+
+    checker = ConsistencyChecker()
+    paths = sorted({p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])})
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            checker.add_sheet(path, f.read())
+    issues = checker.check(args.attribute or ATTRIBUTES)
+
+    if args.json:
+        json.dump([{**asdict(issue),
+                    'values': {s: _format(v, issue.attribute) for s, v in issue.values.items()}}
+                   for issue in issues], sys.stdout, indent=2)
+        print()
+        return
+    print(f"📄 {len(paths)} sheets, {len(checker.index)} members, "
+          f"{len(checker.shared())} on more than one sheet")
+    for issue in issues:
+        print(f"❌ {issue.describe()}")
+    if not issues:
+        print("✅ No inconsistencies between sheets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Warm-start daemon and its thin command line client.
+
+The daemon imports requests/dotenv/convertapi, reads .env, loads the IS rule
+tables and opens the vision client's connection pool once, then serves
+requests over a Unix socket. The client only imports the standard library,
+so a re-check returns without the cold-start cost of main.py.
+
+Protocol: one JSON object per line in each direction.
+
+Usage:
+    python daemon.py serve &
+    python daemon.py ping
+    python daemon.py check member.json
+    python daemon.py check-report results/1.md
+    python daemon.py analyse sample_pdfs/1.pdf --page 1
+    python daemon.py stats
+    python daemon.py shutdown
+"""
+
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+DEFAULT_SOCKET = os.getenv("WO380_SOCKET", "/tmp/wo380.sock")
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class WarmState:
+    """Everything the daemon keeps loaded between requests."""
+
+    def __init__(self):
+        from dotenv import load_dotenv
+
+        import compliance
+        import pipeline
+        from vision_client import VisionClient
+
+        load_dotenv()
+        # Importing these up front is the point of the daemon
+        import convertapi  # noqa: F401
+        import requests  # noqa: F401
+
+        self.compliance = compliance
+        self.pipeline = pipeline
+        compliance.is456(), compliance.sp34()
+        compliance.design_checker(), compliance.detailing_checker()
+        self.vision = VisionClient(hedge=os.getenv("VISION_HEDGE") == "1")
+        self.images = {}
+        self._page_locks = {}
+        self._lock = threading.Lock()   # handler threads share images and the counters
+        self.started = time.time()
+        self.requests = 0
+
+    def rasterize(self, pdf_path, page_number):
+        """Convert a page once per PDF revision (path, mtime)."""
+        key = (os.path.abspath(pdf_path), os.path.getmtime(pdf_path), page_number)
+        with self._lock:
+            page_lock = self._page_locks.setdefault(key, threading.Lock())
+        with page_lock:                 # one conversion per page, however many requests wait
+            with self._lock:
+                image_path = self.images.get(key)
+            if image_path is None or not os.path.exists(image_path):
+                image_path = self.pipeline.rasterize(
+                    {"pdf_path": pdf_path, "page_number": page_number})
+                with self._lock:
+                    self.images[key] = image_path
+        return image_path
+
+    def handle(self, request):
+        with self._lock:
+            self.requests += 1
+        command = request.get("command")
+
+        if command == "ping":
+            return {"ok": True, "uptime": time.time() - self.started}
+
+        if command == "stats":
+            with self._lock:
+                requests, pages = self.requests, len(self.images)
+            return {
+                "uptime": time.time() - self.started,
+                "requests": requests,
+                "rasterized_pages": pages,
+                "vision": self.vision.stats(),
+            }
+
+        if command == "check":
+            if "members" in request:
+                return {"results": [self.compliance.check_member(m) for m in request["members"]]}
+            return self.compliance.check_member(request["member"])
+
+        if command == "check_extraction":
+            return self.compliance.check_extraction(
+                request["text"], request.get("effective_depth"))
+
+        if command == "analyse":
+            from prompt import prompt1
+
+            image_path = self.rasterize(request["pdf_path"], request.get("page_number", 1))
+            text = self.vision.analyse_image(
+                image_path, prompt1, provider=request.get("provider", "gemini"))
+            return {
+                "image_path": image_path,
+                "extraction": text,
+                "checks": self.compliance.check_extraction(text),
+            }
+
+        raise ValueError(f"Unknown command {command!r}")
+
+
+def serve(socket_path=DEFAULT_SOCKET):
+    """Run the daemon until a shutdown command arrives."""
+    import socketserver
+
+    state = WarmState()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    if request.get("command") == "shutdown":
+                        self._reply({"ok": True, "result": "shutting down"})
+                        threading.Thread(target=self.server.shutdown).start()
+                        return
+                    self._reply({"ok": True, "result": state.handle(request)})
+                except Exception as e:
+                    self._reply({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+        def _reply(self, response):
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    _remove_stale_socket(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    created = os.stat(socket_path).st_ino
+    server.daemon_threads = True
+    print(f"🔥 Daemon warm and listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        state.vision.close()
+        try:
+            if os.stat(socket_path).st_ino == created:   # not replaced by another daemon
+                os.remove(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path):
+    """Remove a socket left by a daemon that died; refuse to touch anything else"""
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket; not removing it")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(socket_path)
+            return
+    raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+def call(request, socket_path=DEFAULT_SOCKET, timeout=None):
+    """Send one request to the daemon and return its result."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            response = json.loads(reader.readline())
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-start analysis daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="Start the daemon")
+    commands.add_parser("ping")
+    commands.add_parser("stats")
+    commands.add_parser("shutdown")
+    check = commands.add_parser("check", help="Check member JSON ({...} or {\"members\": [...]})")
+    check.add_argument("json_file")
+    check_report = commands.add_parser("check-report", help="Rule-check an extraction report")
+    check_report.add_argument("report")
+    analyse = commands.add_parser("analyse", help="Rasterize, analyse and check a PDF page")
+    analyse.add_argument("pdf_path")
+    analyse.add_argument("--page", type=int, default=1)
+    analyse.add_argument("--provider", default="gemini")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket)
+        return
+
+    if args.command == "check":
+        with open(args.json_file, encoding="utf-8") as f:
+            payload = json.load(f)
+        request = {"command": "check", **(payload if "members" in payload else {"member": payload})}
+    elif args.command == "check-report":
+        with open(args.report, encoding="utf-8") as f:
+            request = {"command": "check_extraction", "text": f.read()}
+    elif args.command == "analyse":
+        request = {"command": "analyse", "pdf_path": os.path.abspath(args.pdf_path),
+                   "page_number": args.page, "provider": args.provider}
+    else:
+        request = {"command": args.command}
+
+    try:
+        result = call(request, args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No daemon listening on {args.socket}. Start it with: python daemon.py serve")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
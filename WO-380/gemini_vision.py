@@ -3,6 +3,11 @@ import os
 import requests
 import json
 
+API_URL = "https://generativelanguage.googleapis.com/v1beta"
+MODEL = "gemini-2.0-flash-exp"
+TIMEOUT = (10, 300)  # seconds to connect, seconds between bytes of the response
+MAX_OUTPUT_TOKENS = 12000  # Higher token limit for more detailed responses
+
 def encode_image(image_path):
     """Encode the image to base64."""
     try:
@@ -15,24 +20,61 @@ def encode_image(image_path):
         print(f"Error: {e}")
         return None
 
-def analyse_image(image_path, prompt):
+def analyse_image(image_path, prompt, session=None):
     """Analyze the image using Gemini Vision API directly."""
-    base64_image = encode_image(image_path)
-    if base64_image is None:
-        raise ValueError("Failed to encode the image.")
+    return generate(image_path, prompt, session=session)["text"]
+
+def generate(image_path, prompt, session=None, history=(), max_output_tokens=MAX_OUTPUT_TOKENS):
+    """
+    analyse_image with the response metadata: a dict with text, finish_reason
+    (MAX_TOKENS when cut off) and input_tokens / output_tokens. history holds
+    (model_text, user_text) turns that continue the conversation.
+    """
+    data = request_body(image_path, prompt, history, max_output_tokens)
 
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found in environment variables.")
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={api_key}"
+    url = f"{API_URL}/models/{MODEL}:generateContent?key={api_key}"
     
     headers = {
         "Content-Type": "application/json"
     }
-    
-    data = {
+
+    try:
+        print(f"Making API call to: {url}")
+        response = (session or requests).post(url, headers=headers, data=json.dumps(data),
+                                              timeout=TIMEOUT)
+        print(f"Response status: {response.status_code}")
+        
+        if response.status_code != 200:
+            print(f"Error response: {response.text}")
+            response.raise_for_status()
+        
+        result = response.json()
+        print("API call successful!")
+        return response_fields(result)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        raise RuntimeError(f"Error calling Gemini API: {e}")
+    except KeyError as e:
+        print(f"Key error in response: {e}")
+        print(f"Response content: {result}")
+        raise RuntimeError(f"Unexpected response format from API: {e}")
+    except Exception as e:
+        print(f"General error: {e}")
+        raise RuntimeError(f"Error processing API response: {e}")
+
+def request_body(image_path, prompt, history=(), max_output_tokens=MAX_OUTPUT_TOKENS):
+    """generateContent request for the image and prompt; also one line of a batch job."""
+    base64_image = encode_image(image_path)
+    if base64_image is None:
+        raise ValueError("Failed to encode the image.")
+
+    return {
         "contents": [
             {
+                "role": "user",
                 "parts": [
                     {
                         "text": prompt
@@ -45,34 +87,27 @@ def analyse_image(image_path, prompt):
                     }
                 ]
             }
+        ] + [
+            turn
+            for model_text, user_text in history
+            for turn in ({"role": "model", "parts": [{"text": model_text}]},
+                         {"role": "user", "parts": [{"text": user_text}]})
         ],
         "generationConfig": {
-            "maxOutputTokens": 12000,  # Higher token limit for more detailed responses
+            "maxOutputTokens": max_output_tokens,
             "temperature": 0.1,  # Lower temperature for more focused responses
             "topP": 0.8,
             "topK": 40
         }
     }
 
-    try:
-        print(f"Making API call to: {url}")
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        print(f"Response status: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"Error response: {response.text}")
-            response.raise_for_status()
-        
-        result = response.json()
-        print("API call successful!")
-        return result["candidates"][0]["content"]["parts"][0]["text"]
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
-        raise RuntimeError(f"Error calling Gemini API: {e}")
-    except KeyError as e:
-        print(f"Key error in response: {e}")
-        print(f"Response content: {result}")
-        raise RuntimeError(f"Unexpected response format from API: {e}")
-    except Exception as e:
-        print(f"General error: {e}")
-        raise RuntimeError(f"Error processing API response: {e}")
\ No newline at end of file
+def response_fields(result):
+    """text, finish_reason and token counts of a generateContent response."""
+    candidate = result["candidates"][0]
+    usage = result.get("usageMetadata", {})
+    return {
+        "text": "".join(part.get("text", "") for part in candidate["content"]["parts"]),
+        "finish_reason": candidate.get("finishReason", "STOP"),
+        "input_tokens": usage.get("promptTokenCount"),
+        "output_tokens": usage.get("candidatesTokenCount"),
+    }
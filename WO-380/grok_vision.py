@@ -3,6 +3,10 @@ import os
 import requests
 import json
 
+MODEL = "x-ai/grok-4"
+TIMEOUT = (10, 300)  # seconds to connect, seconds between bytes of the response
+MAX_OUTPUT_TOKENS = 8000
+
 def encode_image(image_path):
     """Encode the image to base64."""
     try:
@@ -15,11 +19,17 @@ def encode_image(image_path):
         print(f"Error: {e}")
         return None
 
-def analyse_image(image_path, prompt):
+def analyse_image(image_path, prompt, session=None):
     """Analyze the image using Grok Vision API via OpenRouter."""
-    base64_image = encode_image(image_path)
-    if base64_image is None:
-        raise ValueError("Failed to encode the image.")
+    return generate(image_path, prompt, session=session)["text"]
+
+def generate(image_path, prompt, session=None, history=(), max_output_tokens=MAX_OUTPUT_TOKENS):
+    """
+    analyse_image with the response metadata: a dict with text, finish_reason
+    (length when cut off) and input_tokens / output_tokens. history holds
+    (assistant_text, user_text) turns that continue the conversation.
+    """
+    data = request_body(image_path, prompt, history, max_output_tokens)
 
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
@@ -33,32 +43,11 @@ def analyse_image(image_path, prompt):
         "HTTP-Referer": "https://github.com/your-username/your-repo",  # Optional
         "X-Title": "PDF Data Extraction Tool",  # Optional
     }
-    
-    data = {
-        "model": "x-ai/grok-4",
-        "max_tokens": 8000,
-        "messages": [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": prompt
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    }
-                ]
-            }
-        ]
-    }
 
     try:
         print(f"Making API call to: {url}")
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = (session or requests).post(url, headers=headers, data=json.dumps(data),
+                                              timeout=TIMEOUT)
         print(f"Response status: {response.status_code}")
         
         if response.status_code != 200:
@@ -67,7 +56,7 @@ def analyse_image(image_path, prompt):
         
         result = response.json()
         print("API call successful!")
-        return result["choices"][0]["message"]["content"]
+        return response_fields(result)
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
         raise RuntimeError(f"Error calling OpenRouter API: {e}")
@@ -77,4 +66,50 @@ def analyse_image(image_path, prompt):
         raise RuntimeError(f"Unexpected response format from API: {e}")
     except Exception as e:
         print(f"General error: {e}")
-        raise RuntimeError(f"Error processing API response: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Error processing API response: {e}")
+
+def request_body(image_path, prompt, history=(), max_output_tokens=MAX_OUTPUT_TOKENS):
+    """Chat completions request for the image and prompt; also one line of a batch job."""
+    base64_image = encode_image(image_path)
+    if base64_image is None:
+        raise ValueError("Failed to encode the image.")
+
+    data = {
+        "model": MODEL,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{base64_image}"
+                        }
+                    }
+                ]
+            }
+        ] + [
+            turn
+            for assistant_text, user_text in history
+            for turn in ({"role": "assistant", "content": assistant_text},
+                         {"role": "user", "content": user_text})
+        ]
+    }
+    if max_output_tokens:
+        data["max_tokens"] = max_output_tokens
+    return data
+
+def response_fields(result):
+    """text, finish_reason and token counts of a chat completions response."""
+    choice = result["choices"][0]
+    usage = result.get("usage") or {}
+    return {
+        "text": choice["message"]["content"],
+        "finish_reason": choice.get("finish_reason") or "stop",
+        "input_tokens": usage.get("prompt_tokens"),
+        "output_tokens": usage.get("completion_tokens"),
+    }
@@ -0,0 +1,270 @@
+"""
+Durable SQLite-backed job queue for drawing analysis.
+
+Each PDF page is one job. A job moves through the states
+pending -> running -> done/failed, and every pipeline stage that finishes
+writes a checkpoint so a restarted worker resumes at the last completed stage
+instead of paying for rasterization and vision calls again.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_DB_PATH = "jobs.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pdf_path TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    stage TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (pdf_path, page_number)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, available_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    stage TEXT NOT NULL,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+"""
+
+
+def count_pdf_pages(pdf_path):
+    """Return the number of pages in a PDF file."""
+    from PyPDF2 import PdfReader
+
+    return len(PdfReader(pdf_path).pages)
+
+
+class JobQueue:
+    """
+    Local durable job queue.
+
+    Several worker processes may share one database file: claims happen inside
+    an immediate transaction, so a job is handed to exactly one worker. Running
+    jobs hold a lease; if a worker dies the lease expires and the job is handed
+    out again, resuming from its checkpoints.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, max_attempts=3, retry_backoff=30.0):
+        """
+        :param db_path: Path to the SQLite database file
+        :param max_attempts: Attempts before a job is marked failed
+        :param retry_backoff: Base delay in seconds before a failed job is retried
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # -------------------------------------------------------------------------
+    # Producing jobs
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, pdf_path, page_number=1):
+        """Add one page as a job. Re-adding an existing page returns its id."""
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (pdf_path, page_number, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (pdf_path, page_number, now, now))
+        row = self.conn.execute(
+            "SELECT id FROM jobs WHERE pdf_path = ? AND page_number = ?",
+            (pdf_path, page_number)).fetchone()
+        return row["id"]
+
+    def enqueue_pdf(self, pdf_path):
+        """Add every page of a PDF as a separate job and return the job ids."""
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        pages = count_pdf_pages(pdf_path)
+        return [self.enqueue(pdf_path, page) for page in range(1, pages + 1)]
+
+    # -------------------------------------------------------------------------
+    # Consuming jobs
+    # -------------------------------------------------------------------------
+
+    def claim(self, worker_id, lease_seconds=600):
+        """
+        Atomically take the next runnable job for a worker.
+
+        Expired leases of crashed workers are returned to the pending pool
+        first; the expired run counts as an attempt, so a job that keeps
+        killing its worker fails after max_attempts. Returns the job as a
+        dict, or None if nothing is runnable.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts >= ? THEN 'lease expired: worker ' || worker || "
+                "' stopped responding' ELSE error END, "
+                "worker = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE state = ? AND lease_expires < ?",
+                (self.max_attempts, FAILED, PENDING, self.max_attempts, now, RUNNING, now))
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE state = ? AND available_at <= ? "
+                "ORDER BY id LIMIT 1",
+                (PENDING, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (RUNNING, worker_id, now + lease_seconds, now, row["id"]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job["state"] = RUNNING
+        job["worker"] = worker_id
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=600):
+        """Extend the lease of a running job. Returns False if it was lost."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND state = ?",
+            (time.time() + lease_seconds, time.time(), job_id, worker_id, RUNNING))
+        return cur.rowcount == 1
+
+    def save_checkpoint(self, job_id, stage, output):
+        """Persist the JSON-serializable output of a completed stage."""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, stage, output, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, stage, json.dumps(output), now))
+            self.conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE id = ?",
+                (stage, now, job_id))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def checkpoints(self, job_id):
+        """Return {stage: output} for every completed stage of a job."""
+        rows = self.conn.execute(
+            "SELECT stage, output FROM checkpoints WHERE job_id = ?", (job_id,))
+        return {row["stage"]: json.loads(row["output"]) for row in rows}
+
+    def discard_checkpoint(self, job_id, stage):
+        """Forget a stage output so the stage runs again."""
+        self.conn.execute(
+            "DELETE FROM checkpoints WHERE job_id = ? AND stage = ?", (job_id, stage))
+
+    def complete(self, job_id, worker_id):
+        """
+        Mark a job as done. Returns False, changing nothing, when the worker
+        no longer holds the job's lease (it expired and the job was handed on).
+        """
+        cur = self.conn.execute(
+            "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, "
+            "error = NULL, updated_at = ? WHERE id = ? AND worker = ? AND state = ?",
+            (DONE, time.time(), job_id, worker_id, RUNNING))
+        return cur.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Record a failed attempt.
+
+        The job goes back to pending with an exponential backoff until it has
+        used up max_attempts, so a provider outage mid-batch only delays work.
+        Returns the new state, or None when the worker no longer holds the
+        job's lease.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND state = ?",
+                (job_id, worker_id, RUNNING)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            if row["attempts"] >= self.max_attempts:
+                state, available_at = FAILED, now
+            else:
+                state = PENDING
+                available_at = now + self.retry_backoff * 2 ** (row["attempts"] - 1)
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, "
+                "available_at = ?, error = ?, updated_at = ? WHERE id = ?",
+                (state, available_at, str(error), now, job_id))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return state
+
+    def retry_failed(self):
+        """Put every failed job back in the pending pool with fresh attempts."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET state = ?, attempts = 0, available_at = 0, updated_at = ? "
+            "WHERE state = ?",
+            (PENDING, time.time(), FAILED))
+        return cur.rowcount
+
+    # -------------------------------------------------------------------------
+    # Inspection
+    # -------------------------------------------------------------------------
+
+    def get(self, job_id):
+        row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self, state=None):
+        if state is None:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY id")
+        else:
+            rows = self.conn.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,))
+        return [dict(row) for row in rows]
+
+    def jobs_for_pdf(self, pdf_path):
+        """Return the page jobs of one PDF in page order."""
+        rows = self.conn.execute(
+            "SELECT * FROM jobs WHERE pdf_path = ? ORDER BY page_number", (pdf_path,))
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        """Return {state: number of jobs}."""
+        rows = self.conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state")
+        return {row["state"]: row["n"] for row in rows}
+
+    def has_pending(self):
+        """True while there is work that is waiting, backing off or running."""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM jobs WHERE state IN (?, ?)",
+            (PENDING, RUNNING)).fetchone()
+        return row["n"] > 0
@@ -0,0 +1,416 @@
+"""
+Layout segmentation of a drawing sheet.
+
+prompt1 asks one model call for everything on the sheet, which makes for a
+long response and a long wait. This module splits a rasterized sheet into
+the title block, schedules (ruled tables), notes blocks and drawing views
+(plans, sections) from the page image alone, so each region can go to the
+model with a short prompt of its own, all regions at once. The answers are
+put back together under the section headings prompt1 asks for, so the rest
+of the pipeline reads the report as before.
+
+    layout = segment_page("convertedimages/5.jpg")
+    layout.regions              # [Region('title_block', (left, top, right, bottom)), ...]
+    crops = save_crops("convertedimages/5.jpg", layout.regions)
+    report = assemble(layout.regions, [analyse(crop) for crop in crops])
+
+    python layout.py convertedimages/5.jpg --save-crops
+"""
+
+import argparse
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from raster_diff import connected_boxes, merge_boxes
+
+WORKING_SIZE = 2048       # longest side the sheet is segmented at
+INK = 230                 # grey level below which a pixel is ink (light pen weights print pale)
+LINE_RUN = 40             # working pixels; straight ink runs at least this long are lines
+CELL_SIZE = 8             # working pixels per cell
+MIN_TEXT_PIXELS = 3       # text pixels for a cell to count as text
+
+FRAME_SPAN = 0.95         # share of the frame a border or title-block line runs across
+TITLE_STRIP_SHARE = 0.35  # a title strip is at most this share of the frame
+TABLE_MIN_LINES = 3       # ruled lines each way for a box of lines to be a table
+TABLE_LINE_SPAN = 0.8     # share of the table a ruled line runs across
+TABLE_ROW_PITCH = 60      # working pixels; schedule rows are a line or two of text, grid bays are not
+TABLE_MAX_SHARE = 0.5     # larger boxes of lines are the drawing itself
+NOTES_MIN_CELLS = 600     # smallest notes block, cells
+NOTES_MIN_FILL = 0.3      # share of a notes block's cells that hold text
+NOTES_MIN_LINES = 4       # text lines in a notes block
+VIEW_GAP = 3              # cells; drawing content closer than this is one view
+MIN_VIEW_SHARE = 0.02     # smaller views are merged into the nearest larger one
+CONTEXT_MARGIN = 40       # page pixels around notes, tables and views
+MAX_REGIONS = 8
+
+Box = Tuple[int, int, int, int]
+
+KINDS = ('title_block', 'table', 'notes', 'plan')
+
+# prompt1's report sections, in its order
+SECTIONS = (
+    "Drawing Information", "Personnel & Consultants", "Revision History",
+    "Grid System & Dimensions", "Slab Specifications", "Reinforcement Details by Panel/Section",
+    "Beam Details & Schedule", "Material Specifications", "Cover & Development Requirements",
+    "Building Classification", "General Notes", "Miscellaneous Codes/Symbols",
+    "Hatched/Shaded Areas",
+)
+SUMMARY_SECTION = "Summary of All Numeric Data"
+SUMMARY_HEADER = "| Value | Units | Location | Purpose |\n|---|---|---|---|"
+
+# Where a region's answer goes when it has none of the headings asked for, and
+# the text an answer gives before its first heading
+DEFAULT_SECTIONS = {
+    'title_block': "Drawing Information",
+    'table': "Beam Details & Schedule",
+    'notes': "General Notes",
+    'plan': "Reinforcement Details by Panel/Section",
+}
+
+HEADING = re.compile(
+    r"^[ \t]*(?:#{1,4}[ \t]*)?(?:\*\*)?[ \t]*(?:\d+\.[ \t]*)?("
+    + "|".join(re.escape(s) for s in SECTIONS + (SUMMARY_SECTION,))
+    + r")[ \t]*:?[ \t]*(?:\*\*)?[ \t]*:?[ \t]*$", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass(slots=True)
+class Region:
+    """One part of the sheet and what it holds"""
+    kind: str
+    box: Box                    # page pixels (left, top, right, bottom)
+
+    @property
+    def area(self) -> int:
+        return (self.box[2] - self.box[0]) * (self.box[3] - self.box[1])
+
+
+@dataclass(slots=True)
+class Layout:
+    """Regions of one sheet, title block first, then tables, notes and views"""
+    size: Tuple[int, int]
+    frame: Box
+    regions: List[Region] = field(default_factory=list)
+
+    def of_kind(self, kind: str) -> List[Region]:
+        return [r for r in self.regions if r.kind == kind]
+
+
+# =============================================================================
+# SEGMENTATION
+# =============================================================================
+
+def load_ink(path: str, max_side: int = WORKING_SIZE) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Ink mask of the sheet at working resolution, its scale and the file size"""
+    image = Image.open(path)
+    size = image.size
+    image.draft('L', (max_side, max_side))
+    image = image.convert('L')
+    scale = max_side / max(size)
+    image = image.resize((round(size[0] * scale), round(size[1] * scale)), Image.BILINEAR)
+    return np.asarray(image) < INK, scale, size
+
+
+def line_runs(ink: np.ndarray, length: int) -> np.ndarray:
+    """Pixels that lie on a horizontal run of at least length ink pixels"""
+    height, width = ink.shape
+    if width < length:
+        return np.zeros_like(ink)
+    counts = np.zeros((height, width + 1), dtype=np.int32)
+    np.cumsum(ink, axis=1, out=counts[:, 1:])
+    starts = (counts[:, length:] - counts[:, :-length]) == length     # run of length from x
+    started = np.zeros((height, starts.shape[1] + 1), dtype=np.int32)
+    np.cumsum(starts, axis=1, out=started[:, 1:])
+    x = np.arange(width)
+    return (started[:, np.minimum(x + 1, starts.shape[1])]
+            - started[:, np.clip(x - length + 1, 0, starts.shape[1])]) > 0
+
+
+def _lines(coverage: np.ndarray, minimum: float) -> List[int]:
+    """Centres of the groups of adjacent rows (or columns) with coverage >= minimum"""
+    indices = np.nonzero(coverage >= minimum)[0]
+    if not len(indices):
+        return []
+    groups = np.split(indices, np.nonzero(np.diff(indices) > 1)[0] + 1)
+    return [int(g.mean()) for g in groups]
+
+
+def _bands(mask: np.ndarray) -> int:
+    """Number of separate runs of True in a 1-D mask"""
+    return int(mask[0]) + int(np.count_nonzero(mask[1:] & ~mask[:-1])) if len(mask) else 0
+
+
+def _cells(mask: np.ndarray, minimum: int = 1) -> np.ndarray:
+    rows, cols = mask.shape[0] // CELL_SIZE, mask.shape[1] // CELL_SIZE
+    return mask[:rows * CELL_SIZE, :cols * CELL_SIZE] \
+        .reshape(rows, CELL_SIZE, cols, CELL_SIZE).sum(axis=(1, 3)) >= minimum
+
+
+def _dilate(cells: np.ndarray, n: int) -> np.ndarray:
+    image = Image.fromarray(cells.astype(np.uint8) * 255)
+    return np.asarray(image.filter(ImageFilter.MaxFilter(2 * n + 1))) > 0
+
+
+def _frame(horizontal: np.ndarray, vertical: np.ndarray) -> Tuple[Box, Optional[Tuple[str, int]]]:
+    """
+    Drawing frame (working pixels) and the title-block separator: a line
+    across the whole frame near one of its edges, as (edge, position)
+    """
+    height, width = horizontal.shape
+    rows = _lines(horizontal.sum(axis=1), 0.6 * width)
+    cols = _lines(vertical.sum(axis=0), 0.6 * height)
+    top, bottom = (rows[0], rows[-1]) if len(rows) > 1 else (0, height - 1)
+    left, right = (cols[0], cols[-1]) if len(cols) > 1 else (0, width - 1)
+
+    frame_w, frame_h = right - left, bottom - top
+    across = _lines(horizontal[:, left:right + 1].sum(axis=1), FRAME_SPAN * frame_w)
+    down = _lines(vertical[top:bottom + 1].sum(axis=0), FRAME_SPAN * frame_h)
+    candidates = []
+    for x in down:
+        if left + CELL_SIZE < x <= left + TITLE_STRIP_SHARE * frame_w:
+            candidates.append((x - left, ('left', x)))
+        elif right - TITLE_STRIP_SHARE * frame_w <= x < right - CELL_SIZE:
+            candidates.append((right - x, ('right', x)))
+    for y in across:
+        if top + CELL_SIZE < y <= top + TITLE_STRIP_SHARE * frame_h:
+            candidates.append((y - top, ('top', y)))
+        elif bottom - TITLE_STRIP_SHARE * frame_h <= y < bottom - CELL_SIZE:
+            candidates.append((bottom - y, ('bottom', y)))
+    # The innermost separator bounds the whole strip
+    separator = max(candidates)[1] if candidates else None
+    return (left, top, right, bottom), separator
+
+
+def _is_table(horizontal: np.ndarray, vertical: np.ndarray, cell_box: Box) -> bool:
+    left, top, right, bottom = (v * CELL_SIZE for v in cell_box)
+    across = _lines(horizontal[top:bottom, left:right].sum(axis=1), TABLE_LINE_SPAN * (right - left))
+    down = _lines(vertical[top:bottom, left:right].sum(axis=0), TABLE_LINE_SPAN * (bottom - top))
+    if len(across) < TABLE_MIN_LINES or len(down) < TABLE_MIN_LINES:
+        return False
+    # Rows run along the longer lines; a table rotated with the sheet has them vertical
+    rows = across if right - left >= bottom - top else down
+    return float(np.median(np.diff(rows))) <= TABLE_ROW_PITCH
+
+
+def _is_notes(text: np.ndarray, text_cells: np.ndarray, cell_box: Box) -> bool:
+    c0, r0, c1, r1 = cell_box
+    if (c1 - c0) * (r1 - r0) < NOTES_MIN_CELLS or text_cells[r0:r1, c0:c1].mean() < NOTES_MIN_FILL:
+        return False
+    block = text[r0 * CELL_SIZE:r1 * CELL_SIZE, c0 * CELL_SIZE:c1 * CELL_SIZE]
+    # Lines of text, either way up (sheets are often drawn rotated)
+    return max(_bands(block.any(axis=1)), _bands(block.any(axis=0))) >= NOTES_MIN_LINES
+
+
+def _gap(a: Box, b: Box) -> int:
+    """Distance between two boxes along the axis where they are furthest apart (0 if they touch)"""
+    return max(a[0] - b[2], b[0] - a[2], a[1] - b[3], b[1] - a[3], 0)
+
+
+def _absorb(boxes: List[Box], minimum: float) -> List[Box]:
+    """
+    Merge the smallest box into its closest neighbour until every box has at
+    least minimum area, so scattered details gather into views before they
+    join a large one
+    """
+    boxes = list(boxes)
+    while len(boxes) > 1:
+        small = min(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+        if (small[2] - small[0]) * (small[3] - small[1]) >= minimum:
+            break
+        boxes.remove(small)
+        i = min(range(len(boxes)), key=lambda k: _gap(small, boxes[k]))
+        target = boxes[i]
+        boxes[i] = (min(small[0], target[0]), min(small[1], target[1]),
+                    max(small[2], target[2]), max(small[3], target[3]))
+        boxes = merge_boxes(boxes, 0)
+    return boxes
+
+
+def _limit(regions: List[Region], maximum: int) -> List[Region]:
+    """Fold the smallest regions into their nearest neighbour until at most maximum remain"""
+    regions = list(regions)
+    while len(regions) > maximum:
+        movable = [r for r in regions if r.kind != 'title_block']
+        small = min(movable, key=lambda r: r.area)
+        others = [r for r in movable if r is not small]
+        if not others:
+            break
+        same = [r for r in others if r.kind == small.kind] or others
+        cx, cy = (small.box[0] + small.box[2]) / 2, (small.box[1] + small.box[3]) / 2
+        target = min(same, key=lambda r: abs((r.box[0] + r.box[2]) / 2 - cx)
+                     + abs((r.box[1] + r.box[3]) / 2 - cy))
+        target.box = (min(small.box[0], target.box[0]), min(small.box[1], target.box[1]),
+                      max(small.box[2], target.box[2]), max(small.box[3], target.box[3]))
+        regions.remove(small)
+    return regions
+
+
+def segment_page(path: str, margin: int = CONTEXT_MARGIN) -> Layout:
+    """Title block, tables, notes blocks and drawing views of a sheet image"""
+    ink, scale, size = load_ink(path)
+    return segment_ink(ink, scale, size, margin)
+
+
+def segment_ink(ink: np.ndarray, scale: float, size: Tuple[int, int],
+                margin: int = CONTEXT_MARGIN) -> Layout:
+    """
+    segment_page on an ink mask at working resolution; scale maps sheet
+    units (pixels, or points for a rendered PDF) to the mask
+    """
+    horizontal = line_runs(ink, LINE_RUN)
+    vertical = line_runs(ink.T, LINE_RUN).T
+    lines = horizontal | vertical
+    text = ink & ~lines
+
+    (left, top, right, bottom), separator = _frame(horizontal, vertical)
+    inset = 3  # past the frame's own line weight
+    area = [left + inset, top + inset, right - inset, bottom - inset]
+    title = None
+    if separator:
+        edge, position = separator
+        title = list(area)
+        index = {'left': 0, 'top': 1, 'right': 2, 'bottom': 3}[edge]
+        title[(index + 2) % 4] = position                   # the strip ends at the separator
+        area[index] = position + inset if index < 2 else position - inset
+    x0, y0, x1, y1 = area
+    found: List[Tuple[str, Box]] = []                        # (kind, box in cells)
+
+    # Tables: boxes of ruled lines with at least three lines each way
+    in_area = np.zeros_like(ink)
+    in_area[y0:y1, x0:x1] = True
+    drawing_cells = (x1 - x0) * (y1 - y0) / CELL_SIZE ** 2
+    line_boxes = connected_boxes(_cells(lines & in_area, 2))
+    for box in line_boxes:
+        c0, r0, c1, r1 = box
+        if min(c1 - c0, r1 - r0) > 2 and (c1 - c0) * (r1 - r0) < TABLE_MAX_SHARE * drawing_cells \
+                and _is_table(horizontal, vertical, box):
+            found.append(('table', box))
+
+    # Notes: dense blocks of several lines of text outside the tables,
+    # with the rectangle drawn around them if there is one
+    text_cells = _cells(text & in_area, MIN_TEXT_PIXELS)
+    for _, (c0, r0, c1, r1) in found:
+        text_cells[r0:r1, c0:c1] = False
+    for box in connected_boxes(_dilate(text_cells, 1)):
+        if _is_notes(text, text_cells, box):
+            area = (box[2] - box[0]) * (box[3] - box[1])
+            frames = [b for b in line_boxes if b[0] <= box[0] and b[1] <= box[1]
+                      and b[2] >= box[2] and b[3] >= box[3] and (b[2] - b[0]) * (b[3] - b[1]) <= 2 * area]
+            found.append(('notes', min(frames, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]),
+                                       default=box)))
+
+    # Views: everything else in the drawing area, grouped by proximity
+    content = _cells(ink & in_area, MIN_TEXT_PIXELS)
+    for _, (c0, r0, c1, r1) in found:
+        content[r0:r1, c0:c1] = False
+    views = [(c0 + VIEW_GAP, r0 + VIEW_GAP, c1 - VIEW_GAP, r1 - VIEW_GAP)
+             for c0, r0, c1, r1 in connected_boxes(_dilate(content, VIEW_GAP))]
+    found.extend(('plan', box)
+                 for box in _absorb(merge_boxes(views, 0), MIN_VIEW_SHARE * drawing_cells))
+
+    width, height = size
+
+    def to_page(box: Box, pad: int, unit: int = 1) -> Box:
+        return (max(int(box[0] * unit / scale) - pad, 0), max(int(box[1] * unit / scale) - pad, 0),
+                min(int(box[2] * unit / scale) + pad, width), min(int(box[3] * unit / scale) + pad, height))
+
+    regions = [Region('title_block', to_page(tuple(title), 0))] if title else []
+    ordered = sorted(found, key=lambda item: (KINDS.index(item[0]), item[1][1], item[1][0]))
+    regions.extend(Region(kind, to_page(box, margin, CELL_SIZE)) for kind, box in ordered)
+    return Layout(size=size, frame=to_page((left, top, right, bottom), 0),
+                  regions=_limit(regions, MAX_REGIONS))
+
+
+# =============================================================================
+# REASSEMBLY
+# =============================================================================
+
+def save_crops(image_path: str, regions: List[Region]) -> List[str]:
+    """Crop each region out of the sheet image; returns the crop paths"""
+    stem, ext = os.path.splitext(image_path)
+    paths = []
+    with Image.open(image_path) as image:
+        for n, region in enumerate(regions, 1):
+            path = f"{stem}_{region.kind}{n}{ext}"
+            image.crop(region.box).save(path)
+            paths.append(path)
+    return paths
+
+
+def split_sections(text: str, default: str) -> Dict[str, str]:
+    """{section: body} of one region's answer; text before the first heading goes to default"""
+    headings = list(HEADING.finditer(text))
+    if not headings:
+        return {default: text.strip()}
+    names = {s.lower(): s for s in SECTIONS + (SUMMARY_SECTION,)}
+    sections: Dict[str, str] = {}
+    leading = text[:headings[0].start()].strip()
+    if leading:
+        sections[default] = leading
+    for heading, following in zip(headings, headings[1:] + [None]):
+        body = text[heading.end():following.start() if following else len(text)].strip()
+        if body:
+            name = names[heading.group(1).lower()]
+            sections[name] = f"{sections[name]}\n\n{body}" if name in sections else body
+    return sections
+
+
+def _table_rows(text: str) -> List[str]:
+    """Data rows of the markdown tables in text, without header and separator rows"""
+    rows = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        if re.fullmatch(r"\|[\s:|-]+\|?", line):
+            if rows:
+                rows.pop()                  # the row above the separator is the header
+        else:
+            rows.append(line)
+    return rows
+
+
+def assemble(regions: List[Region], texts: List[str]) -> str:
+    """
+    One report in prompt1's layout from the answers for each region: each
+    section gathers what every region said under it, and the numeric
+    summary tables are joined into one
+    """
+    gathered: Dict[str, List[str]] = {name: [] for name in SECTIONS}
+    summary: List[str] = []
+    for region, text in zip(regions, texts):
+        for name, body in split_sections(text, DEFAULT_SECTIONS[region.kind]).items():
+            if name == SUMMARY_SECTION:
+                summary.extend(_table_rows(body))
+            else:
+                gathered[name].append(body)
+    parts = [f"**{name}**\n\n" + "\n\n".join(bodies)
+             for name, bodies in gathered.items() if bodies]
+    if summary:
+        parts.append(f"**{SUMMARY_SECTION}**\n\n{SUMMARY_HEADER}\n" + "\n".join(summary))
+    return "\n\n".join(parts) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Title block, tables, notes and views of a sheet")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--save-crops", action="store_true", help="Write each region as an image")
+    args = parser.parse_args()
+
+    for path in args.images:
+        layout = segment_page(path)
+        print(f"📐 {path}: {len(layout.regions)} region(s)")
+        for region in layout.regions:
+            share = region.area / (layout.size[0] * layout.size[1])
+            print(f"   {region.kind:<12} {region.box}  {share:.0%} of the sheet")
+        if args.save_crops:
+            for crop in save_crops(path, layout.regions):
+                print(f"💾 {crop}")
+
+
+if __name__ == "__main__":
+    main()
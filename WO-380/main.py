@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 from pdf_to_image import pdf_to_image
 from gemini_vision import analyse_image
 from prompt import prompt1
+from units import dimension_table
 import os
 from datetime import datetime
 
@@ -48,6 +49,9 @@ try:
         md_file.write(f"**Generated Image:** {image_path}\n\n")
         md_file.write("---\n\n")
         md_file.write(result)
+        dimensions = dimension_table(result)
+        if dimensions:
+            md_file.write("\n\n---\n\n" + dimensions)
     
     print(f"\n💾 Extracted data saved to: {md_filename}")
     
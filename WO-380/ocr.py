@@ -0,0 +1,358 @@
+"""
+Local OCR of rasterized drawing pages (Tesseract through pytesseract).
+
+A free first pass that needs no network: the page is reduced to 300 DPI
+(from the resolution the image records), split into strips (horizontal text, and the page turned 90° for
+text drawn along vertical lines) and OCR'd in a process pool. Words come
+back with boxes in page pixels and confidences, and a small grammar picks
+out the values the checkers use: bar callouts (Y8@6"c/c, Y10@150), bar
+counts (12Y16), ft-in and mm dimensions, grades, drawing scale and member
+marks. needs_vision_model() decides whether that is enough or the page
+still has to go to the vision model.
+
+pytesseract and the tesseract binary are optional; available() tells
+whether this module can run.
+
+    result = ocr_page("convertedimages/5.jpg")
+    result.tokens                     # [Token(kind='bar_callout', text='Y8@6"C/C', value=...), ...]
+    needed, reasons = needs_vision_model(result)
+    text = ocr_report(result)         # extraction-style markdown for check_extraction
+
+    python ocr.py convertedimages/5.jpg
+"""
+
+import argparse
+import math
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from compliance import CONCRETE_GRADE, STEEL_GRADE
+from consistency import MEMBER_MARK
+from raster_diff import page_dpi
+from units import BAR_CALLOUT, FEET_INCHES, SCALE, bar_callout, length_mm
+
+OCR_DPI = 300                # Tesseract's sweet spot; rasters here are 302 and 604 DPI
+MIN_REDUCTION = 0.9          # pages within 10% of OCR_DPI are read as they are
+STRIP_HEIGHT = 1200          # px at OCR scale
+STRIP_OVERLAP = 120          # px shared by neighbouring strips so no text line is cut
+ROTATIONS = (0, 90)          # 90: text drawn bottom-to-top along vertical lines
+TESSERACT_CONFIG = "--psm 11"  # sparse text: drawings have no paragraphs
+
+MIN_WORD_CONFIDENCE = 30.0   # below this a word is noise (e.g. text read sideways)
+MIN_MEAN_CONFIDENCE = 70.0   # below this the page goes to the vision model
+MIN_CALLOUTS = 3
+MAX_LOW_CONFIDENCE_SHARE = 0.2
+LOW_CONFIDENCE = 60.0
+
+Box = Tuple[int, int, int, int]
+
+# Common OCR confusions in callouts
+NORMALIZE = str.maketrans({'©': '@', '®': '@', '¥': 'Y', '”': '"', '“': '"', '″': '"',
+                           '’': "'", '‘': "'", '′': "'", '|': '/'})
+BAR_COUNT = re.compile(r"\b(\d{1,2})\s*[YT](\d{1,2})\b")
+MILLIMETRES = re.compile(r"(?<![\w@.'])(\d{3,5})(?:\s*mm)?(?![\w'\"@.])")
+
+
+@dataclass(slots=True)
+class Word:
+    text: str
+    confidence: float
+    box: Box                  # page pixels
+    line: Tuple               # (rotation, strip, block, paragraph, line) of the OCR engine
+
+
+@dataclass(slots=True)
+class Token:
+    kind: str                 # bar_callout, bar_count, dimension, concrete_grade, steel_grade, scale, mark
+    text: str
+    value: Dict
+    confidence: float         # lowest confidence of its words
+    box: Box
+
+
+@dataclass(slots=True)
+class OcrResult:
+    image_path: str
+    words: List[Word] = field(default_factory=list)
+    tokens: List[Token] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def mean_confidence(self) -> float:
+        return sum(w.confidence for w in self.words) / len(self.words) if self.words else 0.0
+
+    def lines(self) -> List[List[Word]]:
+        """Words grouped by OCR line, in reading order of each rotation"""
+        grouped: Dict[Tuple, List[Word]] = {}
+        for word in self.words:
+            grouped.setdefault(word.line, []).append(word)
+        return list(grouped.values())
+
+    def of_kind(self, kind: str) -> List[Token]:
+        return [t for t in self.tokens if t.kind == kind]
+
+
+def available() -> bool:
+    """True when pytesseract and the tesseract binary are installed"""
+    try:
+        import pytesseract
+    except ImportError:
+        return False
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+# =============================================================================
+# OCR
+# =============================================================================
+
+def _page_box(box: Box, rotation: int, size: Tuple[int, int]) -> Box:
+    """Map a box on the rotated page back to the unrotated page (both at OCR scale)"""
+    if rotation == 0:
+        return box
+    # rotation 90: the page was turned clockwise, (x, y) -> (height - 1 - y, x)
+    left, top, right, bottom = box
+    height = size[1]
+    return top, height - right, bottom, height - left
+
+
+def _load(image_path: str, scale: Optional[float] = None) -> Tuple[Image.Image, float]:
+    """Greyscale page at scale, by default the one that brings it to OCR_DPI (never enlarged)"""
+    image = Image.open(image_path)
+    if scale is None:
+        scale = OCR_DPI / page_dpi(image)
+        scale = 1.0 if scale > MIN_REDUCTION else scale
+    target = (round(image.size[0] * scale), round(image.size[1] * scale))
+    image.draft('L', target)
+    image = image.convert('L')
+    return (image.resize(target, Image.BILINEAR) if image.size != target else image), scale
+
+
+def _strips(height: int) -> List[Tuple[int, int]]:
+    step = STRIP_HEIGHT - STRIP_OVERLAP
+    return [(top, min(top + STRIP_HEIGHT, height))
+            for top in range(0, max(height - STRIP_OVERLAP, 1), step)]
+
+
+def _ocr_strip(crop: Image.Image, top: int, rotation: int, strip: int,
+               size: Tuple[int, int]) -> List[Tuple]:
+    """OCR one strip (runs in a worker process); words as plain tuples at OCR scale"""
+    import pytesseract
+
+    data = pytesseract.image_to_data(crop, config=TESSERACT_CONFIG,
+                                     output_type=pytesseract.Output.DICT)
+    words = []
+    for i, text in enumerate(data['text']):
+        confidence = float(data['conf'][i])
+        if not text.strip() or confidence < MIN_WORD_CONFIDENCE:
+            continue
+        box = (data['left'][i], data['top'][i] + top,
+               data['left'][i] + data['width'][i], data['top'][i] + top + data['height'][i])
+        words.append((text, confidence, _page_box(box, rotation, size),
+                      (rotation, strip, data['block_num'][i], data['par_num'][i],
+                       data['line_num'][i])))
+    return words
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return False
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return width * height > 0.5 * smaller
+
+
+def ocr_page(image_path: str, workers: Optional[int] = None,
+             rotations: Tuple[int, ...] = ROTATIONS, scale: Optional[float] = None) -> OcrResult:
+    """
+    OCR a page image in a process pool and recognize its drawing values.
+    scale defaults to the one that brings the page to OCR_DPI.
+    """
+    if not available():
+        raise RuntimeError("Local OCR needs pytesseract and the tesseract binary")
+    started = time.perf_counter()
+    page, scale = _load(image_path, scale)
+    jobs = []
+    for rotation in rotations:
+        turned = page.transpose(Image.ROTATE_270) if rotation == 90 else page
+        jobs.extend((turned.crop((0, top, turned.size[0], bottom)), top, rotation, n, page.size)
+                    for n, (top, bottom) in enumerate(_strips(turned.size[1])))
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        strips = list(pool.map(_ocr_strip, *zip(*jobs)))
+
+    # Words read twice (strip overlaps) keep the more confident reading
+    words: List[Word] = []
+    same_text: Dict[str, List[int]] = {}
+    factor = 1 / scale
+    for text, confidence, box, line in (word for strip in strips for word in strip):
+        word = Word(text, confidence, tuple(round(v * factor) for v in box), line)
+        candidates = same_text.setdefault(text, [])
+        duplicate = next((i for i in candidates if _overlaps(words[i].box, word.box)), None)
+        if duplicate is None:
+            candidates.append(len(words))
+            words.append(word)
+        elif word.confidence > words[duplicate].confidence:
+            words[duplicate] = word
+    result = OcrResult(image_path, words)
+    result.tokens = recognize(result.lines())
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def ocr_image(image: Image.Image, offset: Tuple[int, int] = (0, 0)) -> List[Word]:
+    """
+    Words of an image already cropped to the area of interest (a table, a
+    title block), in one call; offset is the crop's position on the page
+    """
+    if not available():
+        raise RuntimeError("Local OCR needs pytesseract and the tesseract binary")
+    left, top = offset
+    return [Word(text, confidence, (box[0] + left, box[1] + top, box[2] + left, box[3] + top), line)
+            for text, confidence, box, line in _ocr_strip(image.convert('L'), 0, 0, 0, image.size)]
+
+
+# =============================================================================
+# GRAMMAR
+# =============================================================================
+
+def normalize(text: str) -> str:
+    """Undo common OCR confusions in callout text"""
+    text = text.translate(NORMALIZE)
+    # O/o read for 0 and l/I for 1 inside numbers
+    text = re.sub(r"(?<=\d)[Oo]|[Oo](?=\d)", "0", text)
+    text = re.sub(r"(?<=\d)[lI]|[lI](?=\d)", "1", text)
+    # V8@ / y8@ for Y8@, 8V12 for 8Y12
+    text = re.sub(r"\b[VvyY](\d{1,2})\s*@", r"Y\1@", text)
+    return re.sub(r"\b(\d{1,2})[Vvy](\d{1,2})\b", r"\1Y\2", text)
+
+
+def _line_text(words: List[Word]) -> Tuple[str, List[Tuple[int, int, Word]]]:
+    spans, parts, position = [], [], 0
+    for word in words:
+        text = normalize(word.text)
+        spans.append((position, position + len(text), word))
+        parts.append(text)
+        position += len(text) + 1
+    return " ".join(parts), spans
+
+
+def _token(kind, match, value, spans) -> Token:
+    words = [w for start, end, w in spans if start < match.end() and end > match.start()]
+    box = (min(w.box[0] for w in words), min(w.box[1] for w in words),
+           max(w.box[2] for w in words), max(w.box[3] for w in words))
+    return Token(kind, match.group(0).strip(), value, min(w.confidence for w in words), box)
+
+
+def recognize_line(text: str) -> List[Tuple[str, re.Match, Dict]]:
+    """(kind, match, value) of the drawing values in one line of text"""
+    found = []
+    for match in BAR_CALLOUT.finditer(text):
+        diameter, spacing = bar_callout(match.group(0))
+        if not math.isnan(diameter):                 # NaN for unknown US bar numbers
+            found.append(('bar_callout', match, {'diameter': diameter, 'spacing': round(spacing)}))
+    for match in BAR_COUNT.finditer(text):
+        found.append(('bar_count', match, {'count': int(match.group(1)),
+                                           'diameter': float(match.group(2))}))
+    for match in CONCRETE_GRADE.finditer(text):
+        found.append(('concrete_grade', match, {'fck': int(match.group(1))}))
+    for match in STEEL_GRADE.finditer(text):
+        found.append(('steel_grade', match, {'fy': int(match.group(1))}))
+    for match in SCALE.finditer(text):
+        found.append(('scale', match, {'ratio': int(match.group(1))}))
+    for match in MEMBER_MARK.finditer(text):
+        found.append(('mark', match, {'mark': match.group(0)}))
+
+    # Dimensions: numbers that are not part of a value recognized above
+    taken = [m.span() for _, m, _ in found]
+    free = lambda match: not any(start < match.end() and match.start() < end for start, end in taken)
+    for match in FEET_INCHES.finditer(text):
+        if free(match):
+            found.append(('dimension', match, {'mm': round(length_mm(match.group(0)))}))
+            taken.append(match.span())
+    for match in MILLIMETRES.finditer(text):
+        if free(match):
+            found.append(('dimension', match, {'mm': int(match.group(1))}))
+    return found
+
+
+def recognize(lines: List[List[Word]]) -> List[Token]:
+    """Tokens of every OCR line, with boxes and confidences from their words"""
+    tokens = []
+    for words in lines:
+        text, spans = _line_text(words)
+        tokens.extend(_token(kind, match, value, spans)
+                      for kind, match, value in recognize_line(text))
+    return tokens
+
+
+def needs_vision_model(result: OcrResult, min_confidence: float = MIN_MEAN_CONFIDENCE,
+                       min_callouts: int = MIN_CALLOUTS) -> Tuple[bool, List[str]]:
+    """Whether the OCR pass is too weak to stand in for the vision model, and why"""
+    reasons = []
+    if not result.words:
+        return True, ["no text recognized"]
+    if result.mean_confidence < min_confidence:
+        reasons.append(f"mean word confidence {result.mean_confidence:.0f} < {min_confidence:.0f}")
+    callouts = result.of_kind('bar_callout')
+    if len(callouts) < min_callouts:
+        reasons.append(f"{len(callouts)} bar callout(s) recognized, need {min_callouts}")
+    elif sum(t.confidence < LOW_CONFIDENCE for t in callouts) > MAX_LOW_CONFIDENCE_SHARE * len(callouts):
+        reasons.append("too many low-confidence bar callouts")
+    if not result.of_kind('concrete_grade') and not result.of_kind('steel_grade'):
+        reasons.append("no material grades recognized")
+    return bool(reasons), reasons
+
+
+def ocr_report(result: OcrResult) -> str:
+    """Extraction-style markdown of an OCR pass, readable by compliance.parse_extraction"""
+    sections = [f"**Extraction method:** local OCR ({len(result.words)} words, "
+                f"mean confidence {result.mean_confidence:.0f})\n"]
+    titles = {
+        'bar_callout': "Reinforcement Details", 'bar_count': "Bar Counts",
+        'concrete_grade': "Concrete Grades", 'steel_grade': "Steel Grades",
+        'scale': "Drawing Scale", 'mark': "Member Marks", 'dimension': "Dimensions",
+    }
+    for kind, title in titles.items():
+        tokens = result.of_kind(kind)
+        if not tokens:
+            continue
+        sections.append(f"\n**{title}:**\n")
+        for token in tokens:
+            shown = token.text
+            if kind == 'bar_callout':
+                shown = f"Y{token.value['diameter']:g}@{token.value['spacing']} mm c/c ({token.text})"
+            elif kind == 'dimension':
+                shown = f"{token.text} = {token.value['mm']} mm"
+            sections.append(f"*   {shown} - at pixels {token.box}, confidence {token.confidence:.0f}\n")
+    sections.append("\n**All Text:**\n")
+    sections.extend(f"*   {' '.join(normalize(w.text) for w in line)}\n" for line in result.lines())
+    return "".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OCR of a drawing page")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", action="store_true", help="Print the extraction-style report")
+    args = parser.parse_args()
+
+    for path in args.images:
+        result = ocr_page(path, workers=args.workers)
+        needed, reasons = needs_vision_model(result)
+        print(f"🔤 {path}: {len(result.words)} words, {len(result.tokens)} values "
+              f"in {result.seconds:.1f}s (confidence {result.mean_confidence:.0f})")
+        print(f"{'🤖 vision model needed: ' + '; '.join(reasons) if needed else '✅ OCR is enough'}")
+        if args.report:
+            print(ocr_report(result))
+
+
+if __name__ == "__main__":
+    main()
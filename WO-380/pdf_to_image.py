@@ -1,5 +1,7 @@
 import convertapi
 import os
+import shutil
+import tempfile
 
 def pdf_to_image(pdf_path, output_image="output.jpg", page_number=1, zoom=2):
     """
@@ -33,22 +35,17 @@ def pdf_to_image(pdf_path, output_image="output.jpg", page_number=1, zoom=2):
         'ImageQuality': '100'           # Maximum quality
     }, from_format='pdf')
     
-    # Save the converted image
-    result.save_files(output_dir)
-    
-    # Find the generated file (ConvertAPI might add suffixes)
-    generated_files = [f for f in os.listdir(output_dir) if f.endswith('.jpg') and f.startswith(os.path.splitext(output_filename)[0])]
-    
-    if generated_files:
-        # Use the first generated file
-        final_path = os.path.join(output_dir, generated_files[0])
-        # Create the full output path in convertedimages folder
-        full_output_path = os.path.join(output_dir, output_filename)
-        # Rename to desired output name if different
-        if final_path != full_output_path:
-            os.rename(final_path, full_output_path)
-        return full_output_path
-    else:
-        raise RuntimeError("No image file was generated by ConvertAPI")
+    # Save into a directory of this call only: ConvertAPI names the file after
+    # the PDF (5.jpg), so pages of one PDF converted at once would collide
+    full_output_path = os.path.join(output_dir, output_filename)
+    scratch_dir = tempfile.mkdtemp(prefix=".convert-", dir=output_dir)
+    try:
+        saved = [path for path in result.save_files(scratch_dir) if path.lower().endswith('.jpg')]
+        if not saved:
+            raise RuntimeError("No image file was generated by ConvertAPI")
+        os.replace(saved[0], full_output_path)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return full_output_path
 
 
@@ -0,0 +1,385 @@
+"""
+Perceptual hashing of rasterized drawing pages.
+
+Reissued sheets are often the same drawing with a new title-block stamp or
+revision cloud. Each page gets a 64-bit perceptual hash (DCT pHash) plus a
+difference hash (dHash) per tile of an 8x8 grid. Pages are kept in an
+SQLite table with their extraction and looked up through an in-memory
+BK-tree on Hamming distance, so a near-duplicate page is found without
+comparing it to every page seen before. The index points at a copy of each
+raster named by its SHA-256, so a later revision rasterized to the same path
+does not overwrite the image it is compared against:
+
+    index = PageIndex()
+    page = signature("convertedimages/5.jpg")
+    match = index.nearest(page)            # (PageMatch, distance) or None
+    if match:
+        regions = page.changed_regions(match[0].signature)   # pixel boxes that differ
+    index.add(keep_raster("convertedimages/5.jpg", page.digest), extraction_text, page)
+
+    python phash.py compare a.jpg b.jpg
+    python phash.py lookup convertedimages/*.jpg
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_INDEX_PATH = "page_hashes.db"
+RASTER_DIR = "convertedimages/revisions"   # analysed rasters by content hash
+
+HASH_SIZE = 8                # 8x8 bits = 64-bit hashes
+PHASH_FACTOR = 4             # pHash DCT input is 32x32
+TILE_GRID = 8                # tiles per side for region hashes
+WORKING_SIZE = 1024          # longest side the page is reduced to before hashing
+
+MAX_PAGE_DISTANCE = 10       # pHash bits; above this pages are different drawings
+TILE_THRESHOLD = 5           # dHash bits; above this a tile has changed
+MAX_CHANGED_FRACTION = 0.5   # more changed area than this and the page is analysed in full
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    image_path TEXT NOT NULL,
+    phash TEXT NOT NULL,
+    tiles TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    extraction TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    sha256 TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+# =============================================================================
+# HASHES
+# =============================================================================
+
+def load_gray(path: str, max_side: int = WORKING_SIZE) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Greyscale page reduced to max_side, and the original pixel size"""
+    image = Image.open(path)
+    size = image.size
+    # JPEG pages decode at 1/2, 1/4 or 1/8 scale for a fraction of the cost
+    image.draft('L', (max_side, max_side))
+    image = image.convert('L')
+    image.thumbnail((max_side, max_side), Image.BILINEAR)
+    return image, size
+
+
+def _bits(mask: np.ndarray) -> int:
+    value = 0
+    for bit in mask.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def dhash(image: Image.Image, size: int = HASH_SIZE) -> int:
+    """Difference hash: brighter/darker between horizontally adjacent pixels"""
+    pixels = np.asarray(image.convert('L').resize((size + 1, size), Image.BILINEAR), dtype=float)
+    return _bits(pixels[:, 1:] > pixels[:, :-1])
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+def phash(image: Image.Image, size: int = HASH_SIZE, factor: int = PHASH_FACTOR) -> int:
+    """DCT hash: low-frequency coefficients above/below their median"""
+    n = size * factor
+    pixels = np.asarray(image.convert('L').resize((n, n), Image.BILINEAR), dtype=float)
+    dct = _dct_matrix(n)
+    low = (dct @ pixels @ dct.T)[:size, :size]
+    return _bits(low > np.median(low.ravel()[1:]))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def tile_hashes(image: Image.Image, grid: int = TILE_GRID) -> List[int]:
+    """dHash of every tile of a grid x grid split, row by row"""
+    width, height = image.size
+    hashes = []
+    for row in range(grid):
+        for col in range(grid):
+            box = (col * width // grid, row * height // grid,
+                   (col + 1) * width // grid, (row + 1) * height // grid)
+            hashes.append(dhash(image.crop(box)))
+    return hashes
+
+
+@dataclass(slots=True)
+class PageSignature:
+    """Hashes of one page"""
+    phash: int
+    tiles: List[int]
+    size: Tuple[int, int]       # original pixel size
+    digest: str = ''            # SHA-256 of the image file ('' when unknown)
+
+    def distance(self, other: 'PageSignature') -> int:
+        return hamming(self.phash, other.phash)
+
+    def identical(self, other: 'PageSignature') -> bool:
+        """Same raster bytes; equal hashes alone do not prove the pages are the same"""
+        return bool(self.digest) and self.digest == other.digest
+
+    def changed_tiles(self, other: 'PageSignature', threshold: int = TILE_THRESHOLD) -> List[int]:
+        """Indices of tiles whose dHash differs by more than threshold bits"""
+        return [i for i, (a, b) in enumerate(zip(self.tiles, other.tiles))
+                if hamming(a, b) > threshold]
+
+    def changed_regions(self, other: 'PageSignature',
+                        threshold: int = TILE_THRESHOLD) -> List[Tuple[int, int, int, int]]:
+        """
+        Pixel boxes (left, top, right, bottom) of this page that differ from
+        `other`; touching changed tiles are merged into one box
+        """
+        grid = int(round(len(self.tiles) ** 0.5))
+        changed = set(self.changed_tiles(other, threshold))
+        width, height = self.size
+        regions = []
+        while changed:
+            stack = [changed.pop()]
+            rows, cols = [], []
+            while stack:
+                tile = stack.pop()
+                row, col = divmod(tile, grid)
+                rows.append(row)
+                cols.append(col)
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        r, c = row + dr, col + dc
+                        if 0 <= r < grid and 0 <= c < grid and r * grid + c in changed:
+                            changed.remove(r * grid + c)
+                            stack.append(r * grid + c)
+            regions.append((min(cols) * width // grid, min(rows) * height // grid,
+                            (max(cols) + 1) * width // grid, (max(rows) + 1) * height // grid))
+        return sorted(regions, key=lambda box: (box[1], box[0]))
+
+    def changed_fraction(self, other: 'PageSignature', threshold: int = TILE_THRESHOLD) -> float:
+        return len(self.changed_tiles(other, threshold)) / len(self.tiles)
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def signature(path: str, grid: int = TILE_GRID) -> PageSignature:
+    """Hash a page image"""
+    image, size = load_gray(path)
+    return PageSignature(phash(image), tile_hashes(image, grid), size, file_digest(path))
+
+
+def keep_raster(path: str, digest: str, directory: str = RASTER_DIR) -> str:
+    """Copy of a page image named by its SHA-256, which later rasters never overwrite"""
+    os.makedirs(directory, exist_ok=True)
+    kept = os.path.join(directory, digest + os.path.splitext(path)[1])
+    if not os.path.exists(kept):
+        scratch = f"{kept}.{os.getpid()}.tmp"
+        shutil.copyfile(path, scratch)
+        os.replace(scratch, kept)
+    return kept
+
+
+# =============================================================================
+# BK-TREE
+# =============================================================================
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes with Hamming distance"""
+
+    def __init__(self):
+        self.root = None       # [hash, values, {distance: child}]
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, key: int, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [key, [value], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, [value], {}]
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, object]]:
+        """(distance, value) of every entry within radius bits, nearest first"""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(key, node[0])
+            if d <= radius:
+                found.extend((d, value) for value in node[1])
+            # Triangle inequality: only children at distance d±radius can match
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return sorted(found, key=lambda item: item[0])
+
+
+# =============================================================================
+# PAGE INDEX
+# =============================================================================
+
+@dataclass(slots=True)
+class PageMatch:
+    """A previously analysed page"""
+    id: int
+    image_path: str
+    signature: PageSignature
+    extraction: str
+
+
+class PageIndex:
+    """Analysed pages by perceptual hash, shared by all workers through SQLite"""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if 'sha256' not in columns:
+            # Indexes written before raster digests were kept
+            self.conn.execute("ALTER TABLE pages ADD COLUMN sha256 TEXT NOT NULL DEFAULT ''")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_sha256 ON pages (sha256)")
+        self.tree = BKTree()
+        self._signatures: Dict[int, Tuple[str, PageSignature]] = {}
+        self._last_id = 0
+
+    def close(self):
+        self.conn.close()
+
+    def _refresh(self):
+        """Load pages added (by any process) since the last lookup"""
+        rows = self.conn.execute(
+            "SELECT id, image_path, phash, tiles, width, height, sha256 FROM pages"
+            " WHERE id > ? ORDER BY id", (self._last_id,)).fetchall()
+        for page_id, image_path, page_hash, tiles, width, height, digest in rows:
+            page = PageSignature(int(page_hash, 16), [int(t, 16) for t in tiles.split()],
+                                 (width, height), digest)
+            self._signatures[page_id] = (image_path, page)
+            self.tree.add(page.phash, page_id)
+            self._last_id = page_id
+
+    def add(self, image_path: str, extraction: str, page: Optional[PageSignature] = None) -> int:
+        """
+        Record an analysed page; returns its id. A page with the raster
+        digest of one already recorded replaces that row's extraction
+        instead of adding a duplicate.
+        """
+        page = page or signature(image_path)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id FROM pages WHERE sha256 = ? AND sha256 != '' ORDER BY id DESC LIMIT 1",
+                (page.digest,)).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE pages SET image_path = ?, extraction = ?, created_at = ? WHERE id = ?",
+                    (image_path, extraction, time.time(), row[0]))
+                page_id = row[0]
+            else:
+                page_id = self.conn.execute(
+                    "INSERT INTO pages (image_path, phash, tiles, width, height, extraction,"
+                    " created_at, sha256) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (image_path, f"{page.phash:016x}", " ".join(f"{t:016x}" for t in page.tiles),
+                     page.size[0], page.size[1], extraction, time.time(), page.digest)).lastrowid
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if page_id in self._signatures:
+            self._signatures[page_id] = (image_path, self._signatures[page_id][1])
+        return page_id
+
+    def nearest(self, page: PageSignature,
+                max_distance: int = MAX_PAGE_DISTANCE) -> Optional[Tuple[PageMatch, int]]:
+        """
+        Closest analysed page of the same pixel size within max_distance bits,
+        preferring the fewest changed tiles, then the most recent
+        """
+        self._refresh()
+        candidates = []
+        for distance, page_id in self.tree.search(page.phash, max_distance):
+            image_path, other = self._signatures[page_id]
+            if other.size != page.size or len(other.tiles) != len(page.tiles):
+                continue
+            candidates.append((len(page.changed_tiles(other)), distance, -page_id))
+        if not candidates:
+            return None
+        _, distance, page_id = min(candidates)
+        image_path, other = self._signatures[-page_id]
+        (extraction,) = self.conn.execute("SELECT extraction FROM pages WHERE id = ?",
+                                          (-page_id,)).fetchone()
+        return PageMatch(-page_id, image_path, other, extraction), distance
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptual hashes of drawing pages")
+    parser.add_argument("--db", default=DEFAULT_INDEX_PATH, help="Page index database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compare = commands.add_parser("compare", help="Distance and changed regions of two pages")
+    compare.add_argument("first")
+    compare.add_argument("second")
+
+    lookup = commands.add_parser("lookup", help="Nearest analysed page of each image")
+    lookup.add_argument("images", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        first, second = signature(args.first), signature(args.second)
+        print(f"🔍 pHash distance: {first.distance(second)} bits"
+              f"{' (identical files)' if first.identical(second) else ''}")
+        print(f"🧩 Changed tiles: {len(first.changed_tiles(second))}/{len(first.tiles)}")
+        for box in first.changed_regions(second):
+            print(f"   region {box}")
+        return
+
+    index = PageIndex(args.db)
+    for pattern in args.images:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            match = index.nearest(signature(path))
+            if match is None:
+                print(f"🆕 {path}: no near-duplicate")
+            else:
+                page, distance = match
+                print(f"♻️ {path}: {os.path.basename(page.image_path)} ({distance} bits)")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
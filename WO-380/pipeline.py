@@ -0,0 +1,263 @@
+"""
+Stages of the drawing analysis pipeline: rasterize -> analyse -> check.
+
+Each stage takes the job context (the job row plus the outputs of earlier
+stages) and returns a JSON-serializable output that the job queue stores as
+a checkpoint.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from compliance import check_extraction, current_text, is456
+from units import dimension_table
+
+RESULTS_DIR = "results"
+RESULT_STORE_DIR = "results_store"
+SEARCH_INDEX_PATH = "search_index.db"
+PAGE_INDEX_PATH = "page_hashes.db"
+OCR_FIRST_PASS = True  # try local OCR before paying for the vision model
+LAYOUT_SEGMENTATION = True  # one short prompt per sheet region instead of prompt1
+MAX_CONCURRENT_CALLS = 4  # vision model calls in flight per page
+LOCAL_TABLES = True  # read ruled schedules into records instead of asking the model
+COMPACT_PROMPTS = False  # compact_prompt1 (terse structured lines) for whole-sheet calls
+
+
+def rasterize(context):
+    """Convert the job's PDF page to a JPG and return the image path."""
+    from pdf_to_image import pdf_to_image
+
+    stem = os.path.splitext(os.path.basename(context["pdf_path"]))[0]
+    image_path = f"convertedimages/{stem}_p{context['page_number']}.jpg"
+    return pdf_to_image(context["pdf_path"], image_path,
+                        page_number=context["page_number"], zoom=2)
+
+
+def analyse(context):
+    """
+    Extract the drawing data from the page image with Gemini Vision.
+
+    A page that is a near-duplicate of one analysed before (a reissue or
+    revision of the same drawing) reuses that extraction, and only the
+    regions that changed are sent to the model.
+    """
+    from phash import PageIndex, keep_raster, signature
+    from prompt_manager import UsageLog
+    from vision_client import default_client
+
+    image_path = context["rasterize"]
+    index = PageIndex(PAGE_INDEX_PATH)
+    try:
+        page = signature(image_path)
+        match = index.nearest(page)
+        extraction = analyse_changes(image_path, page, match[0]) if match else None
+        if extraction is None:
+            extraction = extract_page(image_path)
+        # An identical raster reused its extraction as-is: nothing new to record.
+        # Otherwise the index keeps its own copy: the next revision of this
+        # sheet is rasterized to the same path and would overwrite the
+        # comparison image
+        if not (match and page.identical(match[0].signature)):
+            index.add(keep_raster(image_path, page.digest), extraction, page)
+    finally:
+        index.close()
+    usage = UsageLog.summarize(default_client().usage.for_sheet(image_path))
+    if usage["calls"]:
+        print(f"🪙 {image_path}: {usage['calls']} call(s), {usage['input_tokens']} input / "
+              f"{usage['output_tokens']} output tokens, {usage['truncated']} truncated")
+    return extraction
+
+
+def extract_page(image_path):
+    """
+    Full extraction of one page.
+
+    When local OCR is installed it runs first; if it recognizes enough on
+    its own the vision model is not called, and if the model is unreachable
+    (no network, exhausted quota) the OCR result is used instead.
+    """
+    import ocr
+
+    result = ocr.ocr_page(image_path) if OCR_FIRST_PASS and ocr.available() else None
+    if result is not None:
+        needed, reasons = ocr.needs_vision_model(result)
+        if not needed:
+            print(f"🔤 {image_path}: local OCR was enough ({len(result.tokens)} values)")
+            return ocr.ocr_report(result)
+        print(f"🤖 {image_path}: vision model needed ({'; '.join(reasons)})")
+    try:
+        return analyse_layout(image_path)
+    except (RuntimeError, ValueError) as e:
+        if result is None:
+            raise
+        print(f"⚠️ {image_path}: vision model unavailable ({e}), using local OCR")
+        return ocr.ocr_report(result)
+
+
+def analyse_layout(image_path):
+    """
+    Extract a page region by region: the title block, schedules, notes and
+    each drawing view get their own short prompt, all sent at once, and the
+    answers are reassembled in prompt1's section layout. Sheets that do not
+    split into regions get prompt1 in a single call.
+
+    Schedules whose grid and text can be read locally (table_extractor.py)
+    skip the model.
+    """
+    from layout import assemble, save_crops, segment_page
+    from prompt import compact_prompt1, layout_prompts, prompt1
+    from table_extractor import region_report
+    from vision_client import default_client
+
+    layout = segment_page(image_path) if LAYOUT_SEGMENTATION else None
+    if layout is None or len(layout.regions) < 2:
+        return default_client().analyse_image(image_path,
+                                              compact_prompt1 if COMPACT_PROMPTS else prompt1)
+    print(f"📐 {image_path}: " + ", ".join(r.kind for r in layout.regions))
+    texts = [region_report(image_path, r.box) if LOCAL_TABLES and r.kind == 'table' else None
+             for r in layout.regions]
+    remote = [r for r, text in zip(layout.regions, texts) if text is None]
+    if len(remote) < len(texts):
+        print(f"📋 {image_path}: {len(texts) - len(remote)} schedule(s) read locally")
+    answers = iter(analyse_regions([(crop, layout_prompts[r.kind])
+                                    for crop, r in zip(save_crops(image_path, remote), remote)]))
+    return assemble(layout.regions, [text if text is not None else next(answers) for text in texts])
+
+
+def analyse_regions(calls):
+    """Run (image_path, prompt) model calls concurrently; answers in the same order."""
+    from vision_client import default_client
+
+    client = default_client()
+    with ThreadPoolExecutor(max_workers=max(min(MAX_CONCURRENT_CALLS, len(calls)), 1)) as pool:
+        return list(pool.map(lambda call: client.analyse_image(*call), calls))
+
+
+def analyse_changes(image_path, page, previous):
+    """
+    Previous extraction merged with a model extraction of each changed region,
+    or None when too much of the page changed to be worth it.
+
+    Only byte-identical rasters reuse the extraction as it is. Otherwise the
+    regions come from a pixel diff against the previous raster (kept under
+    its content hash), or from the page's tile hashes when that copy is
+    gone; tiles are too coarse to prove that nothing changed, so a page
+    they find no change in is analysed in full. With the previous raster the
+    same regions of it are read as well, so the facts a revision removed are
+    struck out of the merged extraction instead of standing beside the new
+    ones.
+    """
+    from phash import MAX_CHANGED_FRACTION
+    from prompt import region_prompt1
+    from raster_diff import diff_pages, merge_extraction, save_crops
+
+    if page.identical(previous.signature):
+        print(f"♻️ {image_path}: same raster as {previous.image_path}, extraction reused")
+        return previous.extraction
+    diff = None
+    if os.path.exists(previous.image_path):
+        diff = diff_pages(previous.image_path, image_path)
+        regions, fraction = diff.regions, diff.changed_fraction
+    else:
+        regions = page.changed_regions(previous.signature)
+        fraction = page.changed_fraction(previous.signature)
+        if not regions:
+            return None
+    if fraction > MAX_CHANGED_FRACTION:
+        return None
+    if not regions:
+        print(f"♻️ {image_path}: no ink changed since {previous.image_path}, extraction reused")
+        return previous.extraction
+
+    print(f"♻️ {image_path}: {len(regions)} region(s), {fraction:.0%} of the page changed "
+          f"since {previous.image_path}")
+    crops = save_crops(image_path, regions)
+    if diff is not None:
+        # The same regions of the previous raster tell which facts were superseded
+        crops += save_crops(previous.image_path, [diff.previous_box(box) for box in regions])
+    texts = analyse_regions([(crop, region_prompt1) for crop in crops])
+    return merge_extraction(previous.extraction, previous.image_path, regions,
+                            texts[:len(regions)], texts[len(regions):] or None)
+
+
+def check(context):
+    """Run the IS code rule checks on the extracted text."""
+    return check_extraction(context["analyse"])
+
+
+STAGES = [
+    ("rasterize", rasterize),
+    ("analyse", analyse),
+    ("check", check),
+]
+
+
+def checkpoint_is_valid(stage, output):
+    """A rasterize checkpoint is only reusable while its image still exists."""
+    if stage == "rasterize":
+        return os.path.exists(output)
+    return True
+
+
+def run_job(queue, job):
+    """
+    Run the remaining stages of a job, checkpointing after each one.
+
+    Stages that already have a valid checkpoint are skipped, so a job that was
+    interrupted resumes where it stopped. Returns the final context.
+    """
+    context = dict(job)
+    done = queue.checkpoints(job["id"])
+    for name, stage in STAGES:
+        if name in done and checkpoint_is_valid(name, done[name]):
+            context[name] = done[name]
+            continue
+        context[name] = stage(context)
+        queue.save_checkpoint(job["id"], name, context[name])
+    return context
+
+
+def write_report(context, results_dir=RESULTS_DIR):
+    """Write the extraction and compliance results of a finished job to markdown."""
+    os.makedirs(results_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(context["pdf_path"]))[0]
+    md_filename = os.path.join(results_dir, f"{stem}_p{context['page_number']}.md")
+    report = is456().DesignChecker().generate_compliance_report(context["check"])
+
+    with open(md_filename, 'w', encoding='utf-8') as md_file:
+        md_file.write(f"# Data Extraction Report\n\n")
+        md_file.write(f"**Source PDF:** {context['pdf_path']} (page {context['page_number']})\n")
+        md_file.write(f"**Extraction Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        md_file.write(f"**Generated Image:** {context['rasterize']}\n\n")
+        md_file.write("---\n\n")
+        md_file.write(context["analyse"])
+        dimensions = dimension_table(current_text(context["analyse"]))
+        if dimensions:
+            md_file.write("\n\n---\n\n" + dimensions)
+        md_file.write("\n\n---\n\n## Compliance Checks\n\n```\n")
+        md_file.write(report)
+        md_file.write("\n```\n")
+    return md_filename
+
+
+def record_results(context, store_dir=RESULT_STORE_DIR):
+    """Append the job's check results to the columnar result history."""
+    from results_store import ResultStore
+
+    stem = os.path.splitext(os.path.basename(context["pdf_path"]))[0]
+    sheet = f"{stem}_p{context['page_number']}"
+    # check_extraction checks bar callouts as slab reinforcement
+    return ResultStore(store_dir).record(f"job-{context['id']}", sheet, context["check"],
+                                         sheet=sheet, member_type="slab")
+
+
+def index_report(md_filename, index_path=SEARCH_INDEX_PATH):
+    """Add a finished report to the full-text and value search index."""
+    from search_index import SearchIndex
+
+    index = SearchIndex(index_path)
+    try:
+        return index.update([md_filename], prune=False)
+    finally:
+        index.close()
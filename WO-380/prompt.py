@@ -1,6 +1,28 @@
 # for data extraction
-prompt1=f""" Extract every dimension, number, notation, symbol, text, and structural element from this RCC structural design drawing image. Be exhaustive—scan every pixel, including all grid panels, beam labels, notes, tables, and annotations, without missing any detail, no matter how small or repetitive. Prioritize reinforcement details: identify every bar type (e.g., Y8, Y10, with diameter in mm), spacing (e.g., @7\"c/c, in inches/mm), location (e.g., top/bottom, panel A-1 to B-2, beam FB1), direction (e.g., horizontal/vertical), and exact position. Note variations per panel or section individually. Organize into: Drawing Information, Personnel & Consultants, Revision History, Grid System & Dimensions, Slab Specifications, Reinforcement Details by Panel/Section, Beam Details & Schedule, Material Specifications, Cover & Development Requirements, Building Classification, General Notes, Miscellaneous Codes/Symbols, Hatched/Shaded Areas. For each item, list: - What it is (e.g., \"Y8@7\"c/c top\"). - Where it appears (e.g., panel B-2 to C-3, note 5, beam schedule row 2). - What it represents (e.g., tensile reinforcement, shear stirrups). Detect the scale from the drawing (e.g., 1:60 in the title block) and apply it to all dimensions and measurements, providing the actual building size (not drawn size), approximate drawn length on paper, and metric conversions (feet-inches to meters, inches to mm, bar diameters in mm). Use bullet points. End with a \"Summary of All Numeric Data\" table with columns: Value, Units, Metric, Location, Purpose. Cross-reference notes and symbols. Current date: 09:36 AM IST, August 29, 2025."""
+prompt1=f""" Extract every dimension, number, notation, symbol, text, and structural element from this RCC structural design drawing image. Be exhaustive—scan every pixel, including all grid panels, beam labels, notes, tables, and annotations, without missing any detail, no matter how small or repetitive. Prioritize reinforcement details: identify every bar type (e.g., Y8, Y10, #4), spacing (e.g., @7\"c/c), location (e.g., top/bottom, panel A-1 to B-2, beam FB1), direction (e.g., horizontal/vertical), and exact position. Note variations per panel or section individually. Organize into: Drawing Information, Personnel & Consultants, Revision History, Grid System & Dimensions, Slab Specifications, Reinforcement Details by Panel/Section, Beam Details & Schedule, Material Specifications, Cover & Development Requirements, Building Classification, General Notes, Miscellaneous Codes/Symbols, Hatched/Shaded Areas. For each item, list: - What it is (e.g., \"Y8@7\"c/c top\"). - Where it appears (e.g., panel B-2 to C-3, note 5, beam schedule row 2). - What it represents (e.g., tensile reinforcement, shear stirrups). Report the scale exactly as written (e.g., 1:60 in the title block). Give every value exactly as written on the drawing with its units (e.g., 12'-6\", 7\"c/c, 450); do not convert units or apply the scale, that is done afterwards. Use bullet points. End with a \"Summary of All Numeric Data\" table with columns: Value, Units, Location, Purpose. Cross-reference notes and symbols. Current date: 09:36 AM IST, August 29, 2025."""
 
 
 # for comparition
-prompt2=f""
\ No newline at end of file
+prompt2=f""
+
+# compact variant of prompt1: the same sections as terse structured lines instead of prose
+compact_prompt1 = """ Extract the data of this RCC structural design drawing as terse structured lines, no prose. Use these headings in this order, leaving out headings with nothing under them: **Drawing Information**, **Personnel & Consultants**, **Revision History**, **Grid System & Dimensions**, **Slab Specifications**, **Reinforcement Details by Panel/Section**, **Beam Details & Schedule**, **Material Specifications**, **Cover & Development Requirements**, **Building Classification**, **General Notes**, **Miscellaneous Codes/Symbols**, **Hatched/Shaded Areas**. Under each heading write one line per item as "- value | where | meaning", e.g. "- Y8@7"c/c top | panel B-2 to C-3 | slab main bars". Give every value exactly as written with its units; do not convert units or apply the scale. Reproduce schedules as markdown tables and transcribe notes with their numbers. End with a **Summary of All Numeric Data** table with columns: Value, Units, Location, Purpose."""
+
+# for re-analysing the changed part of a reissued sheet
+region_prompt1 = """ This image is a cropped region of an RCC structural design drawing that was revised since the sheet was last analysed. Extract every dimension, number, notation, symbol, text, and structural element visible in this region only. Prioritize reinforcement details: bar type (e.g., Y8, Y10, #4), spacing (e.g., @7"c/c), location (e.g., top/bottom, panel A-1 to B-2, beam FB1) and direction. Include revision clouds, revision numbers, dates and title block entries if present. Use bullet points with - What it is. - Where it appears. - What it represents. Do not describe anything outside the region."""
+
+# for layout segmentation: one short prompt per region of the sheet (see layout.py)
+title_prompt1 = """ This image is the title block of an RCC structural design drawing. Extract every entry exactly as written: drawing title and number, project and client, date, scale, sheet size, issue status, revision table (number, date, description), and every person, designation and consultant named. Include any general notes printed in the title block. Organize under the headings **Drawing Information**, **Personnel & Consultants**, **Revision History**, **Building Classification** and **General Notes**. For each item list: - What it is. - Where it appears. - What it represents. End with a **Summary of All Numeric Data** table with columns: Value, Units, Location, Purpose."""
+
+notes_prompt1 = """ This image is a notes or legend block of an RCC structural design drawing. Transcribe every note in full with its number, then extract every grade (e.g., M20, Fe 500), cover, lap and development length, bar notation, thickness and code reference, and explain every legend symbol and hatch pattern. Organize under the headings **General Notes**, **Material Specifications**, **Cover & Development Requirements**, **Slab Specifications**, **Miscellaneous Codes/Symbols** and **Hatched/Shaded Areas**, leaving out headings with nothing under them. Give values exactly as written with their units; do not convert them. End with a **Summary of All Numeric Data** table with columns: Value, Units, Location, Purpose."""
+
+table_prompt1 = """ This image is a schedule table of an RCC structural design drawing (beam, column, footing or bar bending schedule). Reproduce the table as a markdown table row by row with its original column headings, then list for each member mark its size, bars (count and type, e.g., 4Y16), stirrups or ties with spacing, and any remarks. Organize under the headings **Beam Details & Schedule** and **Reinforcement Details by Panel/Section**. Give values exactly as written with their units; do not convert them. End with a **Summary of All Numeric Data** table with columns: Value, Units, Location, Purpose."""
+
+plan_prompt1 = """ This image is one view (plan, section or detail) of an RCC structural design drawing. Extract every dimension, grid label, member mark, bar callout, notation and symbol in it, without missing any detail, no matter how small or repetitive. Prioritize reinforcement details: bar type (e.g., Y8, Y10, #4), spacing (e.g., @7"c/c), location (e.g., top/bottom, panel A-1 to B-2, beam FB1), direction and exact position; note variations per panel or section individually. Report the scale if it is shown (e.g., 1:60); give values exactly as written with their units, without converting them or applying the scale. Organize under the headings **Grid System & Dimensions**, **Slab Specifications**, **Reinforcement Details by Panel/Section**, **Beam Details & Schedule**, **Miscellaneous Codes/Symbols** and **Hatched/Shaded Areas**, leaving out headings with nothing under them. For each item list: - What it is. - Where it appears. - What it represents. End with a **Summary of All Numeric Data** table with columns: Value, Units, Location, Purpose."""
+
+layout_prompts = {
+    "title_block": title_prompt1,
+    "notes": notes_prompt1,
+    "table": table_prompt1,
+    "plan": plan_prompt1,
+}
@@ -0,0 +1,267 @@
+"""
+Token budgeting, prompt versions and truncated-response handling for the
+vision calls.
+
+Every call goes through complete(): the provider's response comes back with
+its finish reason and token usage, a response cut off at the output limit
+(Gemini's MAX_TOKENS, OpenAI-style "length") is continued in the same
+conversation and stitched back together, and the call is recorded in a
+UsageLog under the prompt's version. A prompt's version is the hash of its
+text, so a reworded prompt shows up as a new version in the usage figures
+without any bookkeeping. estimate() predicts the input tokens of a call
+(prompt text plus the provider's image tokenization) before it is made.
+
+    completion = complete("gemini", "convertedimages/5.jpg", prompt1)
+    completion.text, completion.truncated, completion.output_tokens
+
+    estimate("convertedimages/5.jpg", prompt1, "gemini").input_tokens
+
+    python prompt_manager.py convertedimages/5.jpg --provider grok
+"""
+
+import argparse
+import hashlib
+import importlib
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+CHARS_PER_TOKEN = 4          # English prose and markdown, all three providers
+MAX_CONTINUATIONS = 2        # follow-up calls for a response cut off at the output limit
+MAX_OVERLAP = 400            # chars a continuation may repeat from the end of the previous part
+TRUNCATED = ("MAX_TOKENS", "length")
+CONTINUE_PROMPT = ("Your answer was cut off. Continue exactly where it stopped, without "
+                   "repeating anything already written and without an introduction.")
+
+# Image tokenization of each provider
+GEMINI_TILE, GEMINI_TILE_TOKENS, GEMINI_SMALL = 768, 258, 384
+OPENAI_FIT, OPENAI_SHORT_SIDE, OPENAI_TILE = 2048, 768, 512
+OPENAI_BASE_TOKENS, OPENAI_TILE_TOKENS = 85, 170
+QWEN_PATCH, QWEN_MAX_PIXELS = 28, 12845056
+
+
+# =============================================================================
+# ESTIMATES
+# =============================================================================
+
+def text_tokens(text: str) -> int:
+    """Token estimate of a prompt or response text"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _gemini_image(width: int, height: int) -> int:
+    if width <= GEMINI_SMALL and height <= GEMINI_SMALL:
+        return GEMINI_TILE_TOKENS
+    return math.ceil(width / GEMINI_TILE) * math.ceil(height / GEMINI_TILE) * GEMINI_TILE_TOKENS
+
+
+def _openai_image(width: int, height: int) -> int:
+    scale = min(1.0, OPENAI_FIT / max(width, height))
+    scale *= min(1.0, OPENAI_SHORT_SIDE / (min(width, height) * scale))
+    tiles = math.ceil(width * scale / OPENAI_TILE) * math.ceil(height * scale / OPENAI_TILE)
+    return OPENAI_BASE_TOKENS + OPENAI_TILE_TOKENS * tiles
+
+
+def _qwen_image(width: int, height: int) -> int:
+    scale = min(1.0, math.sqrt(QWEN_MAX_PIXELS / (width * height)))
+    return (max(1, round(width * scale / QWEN_PATCH)) * max(1, round(height * scale / QWEN_PATCH))
+            + 2)
+
+
+IMAGE_TOKENS = {"gemini": _gemini_image, "grok": _openai_image, "qwen": _qwen_image}
+
+
+def image_tokens(size: Tuple[int, int], provider: str) -> int:
+    """Input tokens the provider bills for an image of size (width, height)"""
+    return IMAGE_TOKENS[provider](*size)
+
+
+@dataclass(slots=True)
+class Estimate:
+    prompt_tokens: int
+    image_tokens: int
+    max_output_tokens: Optional[int]     # per call; None when the provider default applies
+
+    @property
+    def input_tokens(self) -> int:
+        return self.prompt_tokens + self.image_tokens
+
+    @property
+    def max_total_tokens(self) -> Optional[int]:
+        """Worst case over the first call and every continuation"""
+        if self.max_output_tokens is None:
+            return None
+        calls = 1 + MAX_CONTINUATIONS
+        return calls * self.input_tokens + calls * self.max_output_tokens
+
+
+def estimate(image_path: str, prompt: str, provider: str = "gemini") -> Estimate:
+    """Token estimate of one call before it is made"""
+    from vision_client import PROVIDERS
+
+    with Image.open(image_path) as image:
+        size = image.size
+    module = importlib.import_module(PROVIDERS[provider])
+    return Estimate(text_tokens(prompt), image_tokens(size, provider),
+                    getattr(module, "MAX_OUTPUT_TOKENS", None))
+
+
+# =============================================================================
+# VERSIONS
+# =============================================================================
+
+def prompt_version(prompt: str) -> str:
+    """name@hash of a prompt from prompt.py, or custom@hash for any other text"""
+    import prompt as prompts
+
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    for name, value in vars(prompts).items():
+        if isinstance(value, str) and value == prompt and not name.startswith("_"):
+            return f"{name}@{digest}"
+    return f"custom@{digest}"
+
+
+def prompt_versions() -> Dict[str, str]:
+    """Current version of every prompt in prompt.py"""
+    import prompt as prompts
+
+    return {name: prompt_version(value) for name, value in vars(prompts).items()
+            if name.endswith("prompt1") and isinstance(value, str)}
+
+
+# =============================================================================
+# COMPLETION
+# =============================================================================
+
+@dataclass(slots=True)
+class Completion:
+    text: str
+    provider: str
+    image_path: str
+    prompt_version: str
+    finish_reason: str
+    calls: int = 1
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+    estimated_input_tokens: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        """Still cut off after the last continuation"""
+        return self.finish_reason in TRUNCATED
+
+
+def join_continuation(text: str, more: str) -> str:
+    """text followed by more, without the part of more that repeats the end of text"""
+    more = more.lstrip("\n")
+    for size in range(min(len(text), len(more), MAX_OVERLAP), 0, -1):
+        if text.endswith(more[:size]):
+            return text + more[size:]
+    return text + more
+
+
+def complete(provider: str, image_path: str, prompt: str, session=None,
+             max_continuations: int = MAX_CONTINUATIONS) -> Completion:
+    """
+    Response of one provider to prompt and image, continued while it is cut
+    off at the output limit. Token counts are the provider's where it
+    reports them and estimates otherwise.
+    """
+    from vision_client import PROVIDERS
+
+    module = importlib.import_module(PROVIDERS[provider])
+    started = time.perf_counter()
+    expected = estimate(image_path, prompt, provider).input_tokens
+    history: List[Tuple[str, str]] = []    # the answer so far, then the request to go on
+    text = ""
+    completion = Completion("", provider, image_path, prompt_version(prompt), "", calls=0,
+                            estimated_input_tokens=expected)
+    while True:
+        response = module.generate(image_path, prompt, session=session, history=history)
+        completion.calls += 1
+        completion.input_tokens += response["input_tokens"] or expected + sum(
+            text_tokens(a) + text_tokens(u) for a, u in history)
+        completion.output_tokens += response["output_tokens"] or text_tokens(response["text"])
+        completion.finish_reason = response["finish_reason"]
+        text = join_continuation(text, response["text"]) if history else response["text"]
+        if response["finish_reason"] not in TRUNCATED or completion.calls > max_continuations:
+            break
+        print(f"✂️ {image_path}: response cut off at the output limit, continuing")
+        history = [(text, CONTINUE_PROMPT)]
+    completion.text = text
+    completion.seconds = time.perf_counter() - started
+    if completion.truncated:
+        print(f"⚠️ {image_path}: still cut off after {max_continuations} continuation(s)")
+    return completion
+
+
+class UsageLog:
+    """Token spend and latency of completions, shared by every thread of a client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[Completion] = []
+
+    def add(self, completion: Completion):
+        with self._lock:
+            self.records.append(completion)
+
+    def for_sheet(self, image_path: str) -> List[Completion]:
+        """Completions of a page image and of the crops cut from it (<stem>_*)"""
+        stem = os.path.splitext(image_path)[0]
+        with self._lock:
+            return [c for c in self.records
+                    if c.image_path == image_path or c.image_path.startswith(stem + "_")]
+
+    @staticmethod
+    def summarize(records: List[Completion]) -> Dict:
+        return {
+            "calls": sum(c.calls for c in records),
+            "input_tokens": sum(c.input_tokens for c in records),
+            "output_tokens": sum(c.output_tokens for c in records),
+            "continued": sum(1 for c in records if c.calls > 1),
+            "truncated": sum(1 for c in records if c.truncated),
+            "slowest_seconds": round(max((c.seconds for c in records), default=0.0), 2),
+        }
+
+    def totals(self) -> Dict:
+        with self._lock:
+            records = list(self.records)
+        by_version: Dict[str, List[Completion]] = {}
+        for c in records:
+            by_version.setdefault(c.prompt_version, []).append(c)
+        return dict(self.summarize(records),
+                    by_prompt={v: self.summarize(rs) for v, rs in sorted(by_version.items())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token estimate of a vision call")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--provider", default="gemini", choices=sorted(IMAGE_TOKENS))
+    parser.add_argument("--prompt", default="prompt1", help="Prompt name in prompt.py")
+    parser.add_argument("--call", action="store_true", help="Make the call and report actual usage")
+    args = parser.parse_args()
+
+    import prompt as prompts
+
+    text = getattr(prompts, args.prompt)
+    print(f"📝 {prompt_version(text)}: {len(text)} chars, ~{text_tokens(text)} tokens")
+    for path in args.images:
+        guess = estimate(path, text, args.provider)
+        print(f"🖼️ {path}: ~{guess.input_tokens} input tokens "
+              f"({guess.image_tokens} image), output limit {guess.max_output_tokens or 'default'}")
+        if args.call:
+            completion = complete(args.provider, path, text)
+            print(f"   {completion.calls} call(s), {completion.input_tokens} in / "
+                  f"{completion.output_tokens} out, {completion.finish_reason}, "
+                  f"{completion.seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@ import os
 import requests
 import json
 
+MODEL = "qwen/qwen2.5-vl-72b-instruct:free"
+TIMEOUT = (10, 300)  # seconds to connect, seconds between bytes of the response
+MAX_OUTPUT_TOKENS = None  # provider default
+
 def encode_image(image_path):
     """Encode the image to base64."""
     try:
@@ -15,11 +19,17 @@ def encode_image(image_path):
         print(f"Error: {e}")
         return None
 
-def analyse_image(image_path, prompt):
+def analyse_image(image_path, prompt, session=None):
     """Analyze the image using Qwen Vision API via OpenRouter."""
-    base64_image = encode_image(image_path)
-    if base64_image is None:
-        raise ValueError("Failed to encode the image.")
+    return generate(image_path, prompt, session=session)["text"]
+
+def generate(image_path, prompt, session=None, history=(), max_output_tokens=MAX_OUTPUT_TOKENS):
+    """
+    analyse_image with the response metadata: a dict with text, finish_reason
+    (length when cut off) and input_tokens / output_tokens. history holds
+    (assistant_text, user_text) turns that continue the conversation.
+    """
+    data = request_body(image_path, prompt, history, max_output_tokens)
 
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
@@ -33,9 +43,29 @@ def analyse_image(image_path, prompt):
         "HTTP-Referer": "https://github.com/your-username/your-repo",  # Optional
         "X-Title": "PDF Data Extraction Tool",  # Optional
     }
-    
+
+    try:
+        response = (session or requests).post(url, headers=headers, data=json.dumps(data),
+                                              timeout=TIMEOUT)
+        response.raise_for_status()  # Raise an exception for bad status codes
+        
+        result = response.json()
+        return response_fields(result)
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Error calling OpenRouter API: {e}")
+    except KeyError as e:
+        raise RuntimeError(f"Unexpected response format from API: {e}")
+    except Exception as e:
+        raise RuntimeError(f"Error processing API response: {e}")
+
+def request_body(image_path, prompt, history=(), max_output_tokens=MAX_OUTPUT_TOKENS):
+    """Chat completions request for the image and prompt; also one line of a batch job."""
+    base64_image = encode_image(image_path)
+    if base64_image is None:
+        raise ValueError("Failed to encode the image.")
+
     data = {
-        "model": "qwen/qwen2.5-vl-72b-instruct:free",
+        "model": MODEL,
         "messages": [
             {
                 "role": "user",
@@ -52,18 +82,24 @@ def analyse_image(image_path, prompt):
                     }
                 ]
             }
+        ] + [
+            turn
+            for assistant_text, user_text in history
+            for turn in ({"role": "assistant", "content": assistant_text},
+                         {"role": "user", "content": user_text})
         ]
     }
+    if max_output_tokens:
+        data["max_tokens"] = max_output_tokens
+    return data
 
-    try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        response.raise_for_status()  # Raise an exception for bad status codes
-        
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
-    except requests.exceptions.RequestException as e:
-        raise RuntimeError(f"Error calling OpenRouter API: {e}")
-    except KeyError as e:
-        raise RuntimeError(f"Unexpected response format from API: {e}")
-    except Exception as e:
-        raise RuntimeError(f"Error processing API response: {e}")
+def response_fields(result):
+    """text, finish_reason and token counts of a chat completions response."""
+    choice = result["choices"][0]
+    usage = result.get("usage") or {}
+    return {
+        "text": choice["message"]["content"],
+        "finish_reason": choice.get("finish_reason") or "stop",
+        "input_tokens": usage.get("prompt_tokens"),
+        "output_tokens": usage.get("completion_tokens"),
+    }
@@ -0,0 +1,315 @@
+"""
+Visual diff of two revisions of a drawing page.
+
+The new page is aligned to the previous revision (FFT phase correlation, so
+a reissue that was scanned or plotted with an offset still lines up), the
+ink of the two pages is compared at a fixed resolution in dots per inch, so
+a pen stroke covers the same number of pixels whatever the sheet was
+rasterized at, and the changed pixels are grouped into bounding boxes. Only
+those boxes, with some surrounding context, need to go back to the vision
+model, so the cost of re-analysis follows the size of the change rather than
+the size of the sheet.
+
+    diff = diff_pages("convertedimages/S-101_r1.jpg", "convertedimages/S-101_r2.jpg")
+    diff.shift                  # (dx, dy) of the new page against the old one, pixels
+    diff.regions                # [(left, top, right, bottom), ...] in new-page pixels
+    diff.changed_fraction       # share of the page covered by the regions
+
+    python raster_diff.py old.jpg new.jpg --save-crops
+"""
+
+import argparse
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+from compliance import parse_extraction
+
+DIFF_DPI = 150            # resolution the ink of the pages is compared at
+DEFAULT_DPI = 300         # assumed when the image does not record a plausible one
+MAX_SHEET_INCHES = 47     # longest side of an A0 sheet; larger at the recorded dpi is bogus
+ALIGN_SIZE = 2048         # longest side the pages are aligned at
+INK = 192                 # grey level below which a pixel is ink (pale pen weights included)
+FAINT = 240               # any mark at all; an anti-aliased stroke after alignment stays below
+CELL_SIZE = 8             # diff pixels per cell when grouping changes (1.4 mm at 150 dpi)
+MIN_CHANGED_PIXELS = 4    # changed ink pixels for a cell to count (JPEG speckle below)
+CONTEXT_MARGIN = 150      # page pixels of context around each region
+MAX_REGIONS = 12          # more regions than this are merged into one box
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(slots=True)
+class PageDiff:
+    """Changed regions of a new page against the previous revision"""
+    size: Tuple[int, int]                      # new page pixel size
+    shift: Tuple[float, float]                 # alignment of new page vs old, page pixels
+    regions: List[Box] = field(default_factory=list)
+    changed_pixels: int = 0                    # at DIFF_DPI
+    previous_size: Tuple[int, int] = (0, 0)    # previous page pixel size
+
+    def previous_box(self, box: Box) -> Box:
+        """The box of the new page in the previous page's pixels"""
+        sx = self.previous_size[0] / self.size[0]
+        sy = self.previous_size[1] / self.size[1]
+        dx, dy = self.shift
+        return (max(round((box[0] + dx) * sx), 0), max(round((box[1] + dy) * sy), 0),
+                min(round((box[2] + dx) * sx), self.previous_size[0]),
+                min(round((box[3] + dy) * sy), self.previous_size[1]))
+
+    @property
+    def changed_fraction(self) -> float:
+        area = sum((r - l) * (b - t) for l, t, r, b in self.regions)
+        return area / (self.size[0] * self.size[1])
+
+
+def page_dpi(image: Image.Image, default: float = DEFAULT_DPI) -> float:
+    """
+    Resolution recorded in the image file. Files without one, or with one
+    that would make the sheet larger than A0 (a 72 dpi placeholder), get
+    the default.
+    """
+    try:
+        dpi = float(image.info['dpi'][0])
+    except (KeyError, TypeError, ValueError, IndexError):
+        return default
+    if dpi <= 0 or max(image.size) / dpi > MAX_SHEET_INCHES:
+        return default
+    return dpi
+
+
+def load_page(path: str, dpi: float = DIFF_DPI) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Greyscale page at dpi (never enlarged), its scale against the file and the file size"""
+    image = Image.open(path)
+    size = image.size
+    scale = min(dpi / page_dpi(image), 1.0)
+    target = (max(round(size[0] * scale), 1), max(round(size[1] * scale), 1))
+    image.draft('L', target)
+    image = image.convert('L')
+    if image.size != target:
+        image = image.resize(target, Image.BILINEAR)
+    return np.asarray(image, dtype=np.uint8), scale, size
+
+
+def _resize(image: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    return np.asarray(Image.fromarray(image).resize(shape[::-1], Image.BILINEAR))
+
+
+def phase_correlation(reference: np.ndarray, moved: np.ndarray) -> Tuple[float, float]:
+    """Sub-pixel (dx, dy) such that moved(x + dx, y + dy) matches reference(x, y)"""
+    height = min(reference.shape[0], moved.shape[0])
+    width = min(reference.shape[1], moved.shape[1])
+    a = reference[:height, :width].astype(np.float32)
+    b = moved[:height, :width].astype(np.float32)
+    window = np.outer(np.hanning(height), np.hanning(width))
+    cross = np.fft.rfft2((a - a.mean()) * window).conj() * np.fft.rfft2((b - b.mean()) * window)
+    cross /= np.maximum(np.abs(cross), 1e-9)
+    correlation = np.fft.irfft2(cross, s=(height, width))
+    peak_y, peak_x = np.unravel_index(np.argmax(correlation), correlation.shape)
+
+    def refine(before, at, after):
+        # Vertex of the parabola through the peak and its neighbours
+        curvature = before - 2 * at + after
+        return 0.0 if curvature == 0 else 0.5 * (before - after) / curvature
+
+    dx = peak_x + refine(correlation[peak_y, peak_x - 1], correlation[peak_y, peak_x],
+                         correlation[peak_y, (peak_x + 1) % width])
+    dy = peak_y + refine(correlation[peak_y - 1, peak_x], correlation[peak_y, peak_x],
+                         correlation[(peak_y + 1) % height, peak_x])
+    if dy > height / 2:
+        dy -= height
+    if dx > width / 2:
+        dx -= width
+    return float(dx), float(dy)
+
+
+def _shift(image: np.ndarray, dx: float, dy: float, shape: Tuple[int, int]) -> np.ndarray:
+    """image sampled at (x + dx, y + dy) with bilinear interpolation, padded white, in shape"""
+    shifted = Image.fromarray(image).transform(
+        (shape[1], shape[0]), Image.AFFINE, (1, 0, dx, 0, 1, dy), Image.BILINEAR, fillcolor=255)
+    return np.asarray(shifted)
+
+
+def _min_filter(image: np.ndarray) -> np.ndarray:
+    """Darkest pixel of every 3x3 neighbourhood (separable, far faster than a rank filter)"""
+    padded = np.pad(image, 1, mode='edge')
+    rows = np.minimum(np.minimum(padded[:-2], padded[1:-1]), padded[2:])
+    return np.minimum(np.minimum(rows[:, :-2], rows[:, 1:-1]), rows[:, 2:])
+
+
+def connected_boxes(cells: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Bounding boxes (col0, row0, col1, row1, exclusive) of 8-connected True cells"""
+    remaining = set(zip(*np.nonzero(cells)))
+    boxes = []
+    while remaining:
+        stack = [remaining.pop()]
+        rows, cols = [], []
+        while stack:
+            row, col = stack.pop()
+            rows.append(row)
+            cols.append(col)
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    neighbour = (row + dr, col + dc)
+                    if neighbour in remaining:
+                        remaining.remove(neighbour)
+                        stack.append(neighbour)
+        boxes.append((min(cols), min(rows), max(cols) + 1, max(rows) + 1))
+    return boxes
+
+
+def merge_boxes(boxes: List[Box], gap: int) -> List[Box]:
+    """Merge boxes closer than gap until none overlap"""
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        for box in boxes:
+            for i, other in enumerate(result):
+                if (box[0] - gap <= other[2] and other[0] - gap <= box[2]
+                        and box[1] - gap <= other[3] and other[1] - gap <= box[3]):
+                    result[i] = (min(box[0], other[0]), min(box[1], other[1]),
+                                 max(box[2], other[2]), max(box[3], other[3]))
+                    merged = True
+                    break
+            else:
+                result.append(box)
+        boxes = result
+    return boxes
+
+
+def diff_pages(previous_path: str, new_path: str, margin: int = CONTEXT_MARGIN) -> PageDiff:
+    """Align new_path to previous_path and return the changed regions of the new page"""
+    old, _, previous_size = load_page(previous_path)
+    new, scale, size = load_page(new_path)
+    if old.shape != new.shape:
+        # Different pixel sizes: compare at the new page's diff size
+        old = _resize(old, new.shape)
+    # Align on reduced copies; the shift scales back up to the diff resolution
+    reduce = min(ALIGN_SIZE / max(new.shape), 1.0)
+    reduced = (max(round(new.shape[0] * reduce), 1), max(round(new.shape[1] * reduce), 1))
+    dx, dy = phase_correlation(_resize(new, reduced), _resize(old, reduced))
+    dx, dy = dx / reduce, dy / reduce
+    aligned = _shift(old, dx, dy, new.shape)
+
+    # A pixel changed if it is ink on one page and there is no mark within one
+    # pixel of it on the other: added ink on the new page, removed ink on the
+    # old one. The slack of a pixel and of a faint mark absorbs alignment and
+    # resampling jitter, which spreads a stroke into paler neighbours.
+    changed = ((new < INK) & (_min_filter(aligned) >= FAINT)) \
+        | ((aligned < INK) & (_min_filter(new) >= FAINT))
+
+    rows, cols = changed.shape[0] // CELL_SIZE, changed.shape[1] // CELL_SIZE
+    counts = changed[:rows * CELL_SIZE, :cols * CELL_SIZE] \
+        .reshape(rows, CELL_SIZE, cols, CELL_SIZE).sum(axis=(1, 3))
+    cells = counts >= MIN_CHANGED_PIXELS
+
+    factor = CELL_SIZE / scale
+    width, height = size
+    regions = [(max(int(c0 * factor) - margin, 0), max(int(r0 * factor) - margin, 0),
+                min(int(c1 * factor) + margin, width), min(int(r1 * factor) + margin, height))
+               for c0, r0, c1, r1 in connected_boxes(cells)]
+    regions = merge_boxes(regions, margin)
+    if len(regions) > MAX_REGIONS:
+        regions = [(min(r[0] for r in regions), min(r[1] for r in regions),
+                    max(r[2] for r in regions), max(r[3] for r in regions))]
+    return PageDiff(size=size, shift=(round(dx / scale, 1), round(dy / scale, 1)),
+                    regions=sorted(regions, key=lambda box: (box[1], box[0])),
+                    changed_pixels=int(changed.sum()), previous_size=previous_size)
+
+
+def save_crops(image_path: str, regions: List[Box]) -> List[str]:
+    """Crop each region out of the page image; returns the crop paths"""
+    stem, ext = os.path.splitext(image_path)
+    paths = []
+    with Image.open(image_path) as image:
+        for n, box in enumerate(regions, 1):
+            path = f"{stem}_region{n}{ext}"
+            image.crop(box).save(path)
+            paths.append(path)
+    return paths
+
+
+def _facts(text: str) -> Set[str]:
+    """Bar callouts and grades of a piece of extraction text, e.g. {'Y10@150', 'M25', 'Fe500'}"""
+    data = parse_extraction(text)
+    return ({f"Y{dia:g}@{spacing}" for dia, spacing in data["bar_callouts"]}
+            | {f"M{grade}" for grade in data["concrete_grades"]}
+            | {f"Fe{grade}" for grade in data["steel_grades"]})
+
+
+def _strike(line: str) -> str:
+    """Line struck out in markdown, keeping its list marker or table cells"""
+    if line.lstrip().startswith("|"):
+        cells = line.split("|")
+        return "|".join(cells[:1] + [f" ~~{c.strip()}~~ " if c.strip() else c for c in cells[1:-1]]
+                        + cells[-1:])
+    prefix, body = re.match(r"(\s*(?:[-*+]\s+|\d+\.\s+)?)(.*)", line).groups()
+    return f"{prefix}~~{body}~~" if body.strip() else line
+
+
+def merge_extraction(previous: str, previous_path: str, regions: List[Box],
+                     region_texts: List[str], previous_texts: Optional[List[str]] = None) -> str:
+    """
+    Previous extraction with the re-analysed regions added as a revision
+    section. With the answers for the same regions of the previous page,
+    facts that were there and are gone (a bar callout or grade the region
+    no longer shows) are superseded: the lines of the previous extraction
+    that state them are struck out, which parse_extraction skips. A fact the
+    previous extraction states more often than the region did is also shown
+    elsewhere on the sheet; its lines stay and it is listed as possibly
+    superseded.
+    """
+    lines = previous.rstrip("\n").splitlines()
+    superseded: Set[str] = set()
+    for before, after in zip(previous_texts or [], region_texts):
+        superseded |= _facts(before) - _facts(after)
+    line_facts = [_facts(line) if superseded else set() for line in lines]
+    shown = Counter(fact for text in previous_texts or [] for line in text.splitlines()
+                    for fact in _facts(line) & superseded)
+    struck, elsewhere = set(), []
+    for fact in sorted(superseded):
+        stated = [i for i, facts in enumerate(line_facts) if fact in facts]
+        if len(stated) <= shown[fact]:
+            struck.update(stated)
+        else:
+            elsewhere.append(fact)
+
+    sections = ["\n".join(_strike(line) if i in struck else line for i, line in enumerate(lines)),
+                f"\n\n## Revised Regions (changed since {os.path.basename(previous_path)})\n"]
+    gone = sorted(superseded - set(elsewhere))
+    if gone:
+        sections.append(f"\nSuperseded: {', '.join(f'~~{fact}~~' for fact in gone)}\n")
+    if elsewhere:
+        sections.append(f"\nPossibly superseded (also shown elsewhere on the sheet): "
+                        f"{', '.join(elsewhere)}\n")
+    for n, (box, text) in enumerate(zip(regions, region_texts), 1):
+        sections.append(f"\n### Region {n} (pixels {box})\n\n{text.strip()}\n")
+    return "".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Changed regions between two page revisions")
+    parser.add_argument("previous")
+    parser.add_argument("new")
+    parser.add_argument("--save-crops", action="store_true", help="Write each region as an image")
+    args = parser.parse_args()
+
+    diff = diff_pages(args.previous, args.new)
+    print(f"📐 Shift: {diff.shift} px")
+    print(f"🧩 {len(diff.regions)} changed region(s), {diff.changed_fraction:.1%} of the page")
+    for box in diff.regions:
+        print(f"   region {box}")
+    if args.save_crops:
+        for path in save_crops(args.new, diff.regions):
+            print(f"💾 {path}")
+
+
+if __name__ == "__main__":
+    main()
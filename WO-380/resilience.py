@@ -0,0 +1,204 @@
+"""
+Hedged requests and circuit breakers for the vision providers.
+
+A few stuck calls dominate the tail latency of a batch run. Each provider's
+recent call latencies are tracked; when a call runs past that provider's
+p95 a backup request goes to the next provider and whichever answers first
+wins (the other keeps running in the background and its answer is dropped).
+A provider that fails repeatedly has its circuit opened: it gets no traffic
+for a cool-down period, after which a single probe call decides whether it
+is back.
+
+    resilience = Resilience()
+    text = resilience.call(["gemini", "grok"], lambda provider: ask(provider))
+    resilience.stats()      # hedges and failovers, circuit states, p95 per provider
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+FAILURE_THRESHOLD = 5        # consecutive failures that open a circuit
+COOL_DOWN = 120.0            # seconds an open circuit rejects calls
+LATENCY_WINDOW = 200         # recent successful calls kept per provider
+MIN_SAMPLES = 20             # below this the hedge waits DEFAULT_HEDGE_DELAY
+DEFAULT_HEDGE_DELAY = 90.0   # seconds; whole-sheet vision calls take 20-60 s
+MIN_HEDGE_DELAY = 5.0
+MAX_IN_FLIGHT = 16
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Closed -> open after FAILURE_THRESHOLD failures in a row -> half open after COOL_DOWN."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, cool_down=COOL_DOWN):
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now; in half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cool_down:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._probing = CLOSED, 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """A call that neither proved nor disproved the endpoint (e.g. bad input)"""
+        with self._lock:
+            self._probing = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q / 100 * len(samples)) - 1)]
+
+
+class Resilience:
+    """Circuit breakers, latency trackers and the hedging executor for a set of providers."""
+
+    def __init__(self, hedge_percentile=95, max_in_flight=MAX_IN_FLIGHT):
+        self.hedge_percentile = hedge_percentile
+        self._breakers = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight,
+                                        thread_name_prefix="vision-call")
+        self.hedges = 0
+        self.backup_wins = 0
+        self.failovers = 0
+
+    def breaker(self, provider):
+        with self._lock:
+            return self._breakers.setdefault(provider, CircuitBreaker())
+
+    def latency(self, provider):
+        with self._lock:
+            return self._latencies.setdefault(provider, LatencyTracker())
+
+    def hedge_delay(self, provider):
+        """Seconds to wait for a provider before sending a backup request"""
+        tracker = self.latency(provider)
+        if len(tracker) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return max(MIN_HEDGE_DELAY, tracker.percentile(self.hedge_percentile))
+
+    def _timed(self, provider, fn):
+        breaker = self.breaker(provider)
+        started = time.perf_counter()
+        try:
+            result = fn(provider)
+        except RuntimeError:
+            breaker.record_failure()
+            raise
+        except Exception:
+            breaker.release()
+            raise
+        breaker.record_success()
+        self.latency(provider).add(time.perf_counter() - started)
+        return result
+
+    def call(self, providers, fn):
+        """
+        fn(provider) for the first provider whose circuit is closed, hedged
+        with the others in order: a backup starts when the running calls pass
+        the hedge delay, or at once when one of them fails. Returns the first
+        result; raises the last error when every call failed.
+        """
+        providers = list(providers)
+
+        def next_provider():
+            while providers:
+                provider = providers.pop(0)
+                if self.breaker(provider).allow():
+                    return provider
+            return None
+
+        primary = next_provider()
+        if primary is None:
+            raise RuntimeError(f"Circuit open for every provider; "
+                               f"retry after the {COOL_DOWN:.0f}s cool-down")
+        running = {self._pool.submit(self._timed, primary, fn): primary}
+        delay = self.hedge_delay(primary)
+        error = None
+        while running:
+            done, _ = wait(running, timeout=delay if providers else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if provider != primary:
+                    self.backup_wins += 1
+                return result
+            if done and running:
+                continue                      # one call failed, another is still going
+            backup = next_provider()
+            if backup is None:
+                continue
+            if done:
+                self.failovers += 1
+                print(f"🔀 {primary} failed ({error}), trying {backup}")
+            else:
+                self.hedges += 1
+                print(f"🔀 {primary} slower than {delay:.0f}s, hedging with {backup}")
+            running[self._pool.submit(self._timed, backup, fn)] = backup
+            delay = self.hedge_delay(backup)
+        raise error
+
+    def stats(self):
+        with self._lock:
+            providers = sorted(set(self._breakers) | set(self._latencies))
+        return {
+            "hedges": self.hedges, "backup_wins": self.backup_wins, "failovers": self.failovers,
+            "providers": {p: {"circuit": self.breaker(p).state,
+                              "p95": self.latency(p).percentile(95),
+                              "calls": len(self.latency(p))} for p in providers},
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,251 @@
+"""
+Columnar history of compliance check results (Parquet via pyarrow).
+
+Every check of every member is one row: run, sheet, member, code, clause,
+actual/required values, utilization and the pass flag. Rows are appended as
+new Parquet files under a directory partitioned by UTC date and never rewritten
+(apart from compact()), so several workers can record at the same time.
+Queries read only the partitions and columns they need.
+
+    results_store/
+        run_date=2026-10-18/
+            <run_id>-<n>.parquet
+
+Usage:
+    store = ResultStore()
+    with store.run(run_id="job-42") as run:
+        run.add("B1", check_member(member), sheet="5_p2", member_type="beam")
+
+    store.query(clause="26.3.3", member_type="slab", passed=False, since="2026-10-01")
+    store.failure_counts(by=("member_type", "clause"))
+
+    python results_store.py failures --clause 26.3.3 --member-type slab --since 2026-10-01
+"""
+
+import argparse
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from IS.reporting import rows_for
+
+DEFAULT_STORE_PATH = "results_store"
+
+SCHEMA = pa.schema([
+    ("run_id", pa.string()),
+    ("checked_at", pa.timestamp("ms", tz="UTC")),
+    ("sheet", pa.string()),
+    ("member_id", pa.string()),
+    ("member_type", pa.string()),
+    ("code", pa.string()),
+    ("check", pa.string()),
+    ("clause", pa.string()),
+    ("description", pa.string()),
+    ("passed", pa.bool_()),
+    ("actual", pa.float64()),
+    ("required", pa.float64()),
+    ("utilization", pa.float64()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("run_date", pa.string())]), flavor="hive")
+
+
+def utc_today():
+    """Partition date: the UTC date, so workers in any time zone agree with checked_at"""
+    return datetime.now(timezone.utc).date()
+
+
+class ResultRun:
+    """Buffers the rows of one run and appends them in Parquet files."""
+
+    def __init__(self, store, run_id, batch_size):
+        self.store = store
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.rows = 0
+        self._files = 0
+        self._buffer = {name: [] for name in SCHEMA.names}
+
+    def add(self, member_id, results, sheet="", member_type=""):
+        """Record the results of one member (any shape IS.reporting accepts)."""
+        now = datetime.now(timezone.utc)
+        buffer = self._buffer
+        for row in rows_for(str(member_id), results):
+            buffer["run_id"].append(self.run_id)
+            buffer["checked_at"].append(now)
+            buffer["sheet"].append(sheet)
+            buffer["member_id"].append(row.member_id)
+            buffer["member_type"].append(member_type)
+            buffer["code"].append(row.code)
+            buffer["check"].append(row.check)
+            buffer["clause"].append(row.clause)
+            buffer["description"].append(row.description)
+            buffer["passed"].append(row.passed)
+            buffer["actual"].append(row.actual)
+            buffer["required"].append(row.required)
+            buffer["utilization"].append(row.utilization)
+        if len(buffer["run_id"]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as a new file in today's (UTC) partition."""
+        n = len(self._buffer["run_id"])
+        if n == 0:
+            return
+        table = pa.table(self._buffer, schema=SCHEMA)
+        directory = self.store.partition_dir(utc_today())
+        os.makedirs(directory, exist_ok=True)
+        # Write under a temporary name so readers never see a partial file
+        path = os.path.join(directory, f"{self.run_id}-{self._files}-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        self._files += 1
+        self.rows += n
+        self._buffer = {name: [] for name in SCHEMA.names}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+class ResultStore:
+    """Append-only, date-partitioned Parquet dataset of check results."""
+
+    def __init__(self, root=DEFAULT_STORE_PATH):
+        self.root = root
+
+    def partition_dir(self, day):
+        return os.path.join(self.root, f"run_date={day.isoformat()}")
+
+    def run(self, run_id=None, batch_size=100_000):
+        """Start recording a run; use as a context manager so the tail is flushed."""
+        run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        return ResultRun(self, run_id, batch_size)
+
+    def record(self, run_id, member_id, results, sheet="", member_type=""):
+        """Record a single member's results as its own run file."""
+        with self.run(run_id) as run:
+            run.add(member_id, results, sheet=sheet, member_type=member_type)
+        return run.rows
+
+    def dataset(self):
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING,
+                          schema=SCHEMA.append(pa.field("run_date", pa.string())),
+                          exclude_invalid_files=True)
+
+    def query(self, clause=None, code=None, member_type=None, passed=None, run_id=None,
+              sheet=None, member_id=None, since=None, until=None, columns=None):
+        """
+        Rows matching every given filter, as a pyarrow Table.
+
+        since/until are inclusive dates ("2026-10-01" or datetime.date) and
+        prune whole partitions; columns limits what is read from disk.
+        """
+        if not os.path.isdir(self.root):
+            names = columns or SCHEMA.names + ["run_date"]
+            return pa.table({name: [] for name in names})
+        expression = None
+        for name, value in (("clause", clause), ("code", code), ("member_type", member_type),
+                            ("passed", passed), ("run_id", run_id), ("sheet", sheet),
+                            ("member_id", member_id)):
+            if value is not None:
+                term = ds.field(name) == value
+                expression = term if expression is None else expression & term
+        for op, value in ((">=", since), ("<=", until)):
+            if value is not None:
+                value = value.isoformat() if isinstance(value, date) else str(value)
+                term = ds.field("run_date") >= value if op == ">=" else ds.field("run_date") <= value
+                expression = term if expression is None else expression & term
+        return self.dataset().to_table(columns=columns, filter=expression)
+
+    def failure_counts(self, by=("code", "clause"), **filters):
+        """Number of failed checks grouped by the given columns, most frequent first."""
+        table = self.query(passed=False, columns=list(by), **filters)
+        if table.num_rows == 0:
+            return pa.table({**{name: pa.array([], pa.string()) for name in by},
+                             "failures": pa.array([], pa.int64())})
+        counts = table.group_by(list(by)).aggregate([([], "count_all")])
+        counts = counts.rename_columns(list(by) + ["failures"])
+        return counts.sort_by([("failures", "descending")])
+
+    def runs(self):
+        """Row and failure counts per run."""
+        table = self.query(columns=["run_id", "run_date", "passed"])
+        table = table.append_column("failed", pc.invert(table["passed"]).cast(pa.int64()))
+        return table.group_by(["run_id", "run_date"]).aggregate(
+            [([], "count_all"), ("failed", "sum")]).rename_columns(
+                ["run_id", "run_date", "checks", "failures"])
+
+    def compact(self, day=None):
+        """
+        Merge the small files of one partition (default today, UTC) into one.
+
+        Only needed when many single-job runs have been recorded; run it when
+        no worker is writing to that partition.
+        """
+        directory = self.partition_dir(day or utc_today())
+        if not os.path.isdir(directory):
+            return 0
+        files = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                       if f.endswith(".parquet"))
+        if len(files) < 2:
+            return len(files)
+        table = pa.concat_tables(pq.read_table(f, schema=SCHEMA) for f in files)
+        path = os.path.join(directory, f"compacted-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        for f in files:
+            os.remove(f)
+        return len(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the compliance result history")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Result store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("failures", "List failed checks"),
+                            ("counts", "Count failures by code and clause")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--clause")
+        command.add_argument("--member-type")
+        command.add_argument("--sheet")
+        command.add_argument("--run-id")
+        command.add_argument("--since", help="YYYY-MM-DD")
+        command.add_argument("--until", help="YYYY-MM-DD")
+    commands.add_parser("runs", help="Checks and failures per run")
+    compact = commands.add_parser("compact", help="Merge the small files of a partition")
+    compact.add_argument("--day", type=date.fromisoformat, help="YYYY-MM-DD (default today, UTC)")
+
+    args = parser.parse_args()
+    store = ResultStore(args.store)
+
+    if args.command in ("failures", "counts"):
+        filters = dict(clause=args.clause, member_type=args.member_type, sheet=args.sheet,
+                       run_id=args.run_id, since=args.since, until=args.until)
+        if args.command == "failures":
+            table = store.query(passed=False, columns=[
+                "run_date", "run_id", "sheet", "member_id", "member_type", "code", "clause",
+                "description"], **filters)
+        else:
+            table = store.failure_counts(**filters)
+        for row in table.to_pylist():
+            print(" | ".join("" if v is None else str(v) for v in row.values()))
+        print(f"📊 {table.num_rows} row(s)")
+    elif args.command == "runs":
+        for row in store.runs().to_pylist():
+            print(f"{row['run_date']}  {row['run_id']}: {row['checks']} checks, "
+                  f"{row['failures']} failed")
+    elif args.command == "compact":
+        print(f"🗜️ merged {store.compact(args.day)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
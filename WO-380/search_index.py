@@ -0,0 +1,359 @@
+"""
+Local search index over extracted drawing reports.
+
+Report text goes into an SQLite FTS5 inverted index; the values the checkers
+care about (bar callouts, cover, concrete and steel grades, drawing number)
+go into indexed numeric tables, so "every drawing with Y10@150 and 20 mm
+cover" is a few B-tree lookups instead of a grep over every report.
+
+Indexing is incremental: a report is re-read only when its size or mtime
+changed, and re-indexed only when its content hash changed.
+
+Usage:
+    python search_index.py update                     # results/*.md, extracted_data_*.md
+    python search_index.py search --bar Y10@150 --cover 20
+    python search_index.py search "foundation layout" --concrete M25
+    python search_index.py stats
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+from compliance import parse_extraction
+
+DEFAULT_INDEX_PATH = "search_index.db"
+DEFAULT_PATTERNS = ("results/*.md", "extracted_data_*.md")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    drawing_number TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_drawing ON reports (drawing_number);
+CREATE VIRTUAL TABLE IF NOT EXISTS report_text USING fts5 (body, tokenize = 'unicode61');
+CREATE TABLE IF NOT EXISTS callouts (
+    report_id INTEGER NOT NULL REFERENCES reports (id),
+    diameter REAL NOT NULL,
+    spacing REAL NOT NULL,
+    PRIMARY KEY (diameter, spacing, report_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS report_values (
+    report_id INTEGER NOT NULL REFERENCES reports (id),
+    kind TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (kind, value, report_id)
+) WITHOUT ROWID;
+"""
+
+# Numeric value kinds stored in report_values
+BAR_DIAMETER = "bar_diameter"
+SPACING = "spacing"
+COVER = "cover"
+CONCRETE_GRADE = "concrete_grade"
+STEEL_GRADE = "steel_grade"
+
+DRAWING_NUMBER = re.compile(
+    r"(?:Drawing|Dwg\.?)\s*(?:No\.?|Number)\**\s*[:\-]?\**\s*([A-Z0-9][A-Z0-9/_.\-]*)",
+    re.IGNORECASE)
+# Item form of the reports: "**What:** Drawing Number" and, further down the
+# same item, "**Represents:** TEMPLE/28-1/24/50-005" (or "**Value:** ...")
+DRAWING_NUMBER_ITEM = re.compile(
+    r"\*\*What:\**\s*(?:Drawing|Dwg\.?)\s*(?:No\.?|Number)\b"
+    r"(?:(?!\*\*What:).)*?\*\*(?:Represents|Value):\**\s*"
+    r"([A-Z0-9][A-Z0-9/_.\-]*\d[A-Z0-9/_.\-]*)",
+    re.IGNORECASE | re.DOTALL)
+MILLIMETRES = re.compile(r"\b(\d{2,3})\s*\|?\s*mm\b", re.IGNORECASE)
+
+
+def cover_values(text):
+    """Cover depths in mm mentioned on lines that talk about cover."""
+    values = set()
+    for line in text.splitlines():
+        if "cover" in line.lower():
+            values.update(int(v) for v in MILLIMETRES.findall(line) if 10 <= int(v) <= 100)
+    return sorted(values)
+
+
+def drawing_number(text):
+    """Drawing number of a report, from a "Drawing Number: ..." line or a What/Represents item."""
+    for pattern in (DRAWING_NUMBER, DRAWING_NUMBER_ITEM):
+        for match in pattern.finditer(text):
+            number = match.group(1).rstrip(".")
+            if any(c.isdigit() for c in number):
+                return number
+    return None
+
+
+def extract_values(text):
+    """The searchable values of one report."""
+    data = parse_extraction(text)
+    return {
+        "drawing_number": drawing_number(text),
+        "callouts": data["bar_callouts"],
+        "values": (
+            [(BAR_DIAMETER, d) for d in sorted({d for d, _ in data["bar_callouts"]})]
+            + [(SPACING, s) for s in sorted({s for _, s in data["bar_callouts"]})]
+            + [(COVER, c) for c in cover_values(text)]
+            + [(CONCRETE_GRADE, g) for g in data["concrete_grades"]]
+            + [(STEEL_GRADE, g) for g in data["steel_grades"]]
+        ),
+    }
+
+
+def parse_bar(bar):
+    """'Y10@150' -> (10.0, 150) using the same rules as the report parser."""
+    data = parse_extraction(bar)
+    if not data["bar_callouts"]:
+        raise ValueError(f"Not a bar callout: {bar!r} (expected e.g. Y10@150)")
+    return data["bar_callouts"][0]
+
+
+def parse_grade(grade):
+    """'M25' / 'Fe500' / '25' -> 25 / 500 / 25"""
+    digits = re.sub(r"\D", "", str(grade))
+    if not digits:
+        raise ValueError(f"Not a grade: {grade!r}")
+    return int(digits)
+
+
+class SearchIndex:
+    """FTS5 text index plus numeric value index over report files."""
+
+    def __init__(self, db_path=DEFAULT_INDEX_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # -------------------------------------------------------------------------
+    # Indexing
+    # -------------------------------------------------------------------------
+
+    def update(self, paths=None, prune=True):
+        """
+        Bring the index up to date with the given report files.
+
+        paths defaults to every file matching DEFAULT_PATTERNS. With prune,
+        reports whose file no longer exists are dropped. Returns counts of
+        added, updated, unchanged and removed reports.
+        """
+        if paths is None:
+            paths = sorted({p for pattern in DEFAULT_PATTERNS for p in glob.glob(pattern)})
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        known = {row["path"]: row for row in self.conn.execute(
+            "SELECT id, path, size, mtime, sha256 FROM reports")}
+
+        for path in paths:
+            key = os.path.normpath(path)
+            stat = os.stat(path)
+            row = known.get(key)
+            if row is not None and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                counts["unchanged"] += 1
+                continue
+            with open(path, "rb") as f:
+                raw = f.read()
+            sha = hashlib.sha256(raw).hexdigest()
+            if row is not None and row["sha256"] == sha:
+                self.conn.execute("UPDATE reports SET size = ?, mtime = ? WHERE id = ?",
+                                  (stat.st_size, stat.st_mtime, row["id"]))
+                counts["unchanged"] += 1
+                continue
+            self._index(key, stat, sha, raw.decode("utf-8", errors="replace"),
+                        row["id"] if row is not None else None)
+            counts["updated" if row is not None else "added"] += 1
+
+        if prune:
+            for path, row in known.items():
+                if not os.path.exists(path):
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    self._delete(row["id"])
+                    self.conn.execute("DELETE FROM reports WHERE id = ?", (row["id"],))
+                    self.conn.execute("COMMIT")
+                    counts["removed"] += 1
+        return counts
+
+    def _index(self, path, stat, sha, text, report_id):
+        values = extract_values(text)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if report_id is None:
+                report_id = self.conn.execute(
+                    "INSERT INTO reports (path, size, mtime, sha256, drawing_number, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime, sha, values["drawing_number"],
+                     time.time())).lastrowid
+            else:
+                self._delete(report_id)
+                self.conn.execute(
+                    "UPDATE reports SET size = ?, mtime = ?, sha256 = ?, drawing_number = ?, "
+                    "indexed_at = ? WHERE id = ?",
+                    (stat.st_size, stat.st_mtime, sha, values["drawing_number"], time.time(),
+                     report_id))
+            self.conn.execute("INSERT INTO report_text (rowid, body) VALUES (?, ?)",
+                              (report_id, text))
+            self.conn.executemany(
+                "INSERT INTO callouts (report_id, diameter, spacing) VALUES (?, ?, ?)",
+                [(report_id, d, s) for d, s in values["callouts"]])
+            self.conn.executemany(
+                "INSERT INTO report_values (report_id, kind, value) VALUES (?, ?, ?)",
+                [(report_id, kind, value) for kind, value in values["values"]])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _delete(self, report_id):
+        self.conn.execute("DELETE FROM report_text WHERE rowid = ?", (report_id,))
+        self.conn.execute("DELETE FROM callouts WHERE report_id = ?", (report_id,))
+        self.conn.execute("DELETE FROM report_values WHERE report_id = ?", (report_id,))
+
+    # -------------------------------------------------------------------------
+    # Searching
+    # -------------------------------------------------------------------------
+
+    def search(self, text=None, bar=None, diameter=None, spacing=None, cover=None,
+               concrete_grade=None, steel_grade=None, drawing_number=None, limit=100):
+        """
+        Reports matching every given condition, best text match first.
+
+        :param text: FTS5 query over the report text, e.g. 'foundation AND "clear cover"'
+        :param bar: Bar callout such as "Y10@150" (diameter and spacing on the same callout)
+        :param diameter: Any bar of this diameter (mm)
+        :param spacing: Any bar at this spacing (mm)
+        :param cover: Cover depth (mm) mentioned on the sheet
+        :param concrete_grade: e.g. "M25" or 25
+        :param steel_grade: e.g. "Fe500" or 500
+        :param drawing_number: Exact drawing number, or a prefix ending in '*'
+        :return: List of dicts with path, drawing_number and (for text queries) a snippet
+        :raises ValueError: text is not a valid FTS5 query (e.g. an unmatched '"')
+        """
+        joins, where, params = [], [], []
+        if text:
+            joins.append("JOIN report_text ON report_text.rowid = reports.id")
+            where.append("report_text MATCH ?")
+            params.append(text)
+        if bar is not None:
+            bar_diameter, bar_spacing = parse_bar(bar) if isinstance(bar, str) else bar
+            where.append("reports.id IN (SELECT report_id FROM callouts "
+                         "WHERE diameter = ? AND spacing = ?)")
+            params += [bar_diameter, bar_spacing]
+        for kind, value in ((BAR_DIAMETER, diameter), (SPACING, spacing), (COVER, cover),
+                            (CONCRETE_GRADE, concrete_grade and parse_grade(concrete_grade)),
+                            (STEEL_GRADE, steel_grade and parse_grade(steel_grade))):
+            if value is not None:
+                where.append("reports.id IN (SELECT report_id FROM report_values "
+                             "WHERE kind = ? AND value = ?)")
+                params += [kind, float(value)]
+        if drawing_number:
+            if drawing_number.endswith("*"):
+                where.append("reports.drawing_number LIKE ? ESCAPE '\\'")
+                prefix = re.sub(r"([%_\\])", r"\\\1", drawing_number[:-1])
+                params.append(prefix + "%")
+            else:
+                where.append("reports.drawing_number = ?")
+                params.append(drawing_number)
+
+        columns = "reports.path, reports.drawing_number"
+        order = "reports.path"
+        if text:
+            columns += ", snippet(report_text, 0, '[', ']', '…', 12) AS snippet"
+            order = "bm25(report_text)"
+        sql = (f"SELECT {columns} FROM reports {' '.join(joins)}"
+               + (f" WHERE {' AND '.join(where)}" if where else "")
+               + f" ORDER BY {order} LIMIT ?")
+        try:
+            return [dict(row) for row in self.conn.execute(sql, params + [limit])]
+        except sqlite3.OperationalError as e:
+            if not text:
+                raise
+            raise ValueError(f"Invalid full-text query {text!r}: {e}. Quote phrases and "
+                             'special characters, e.g. \'"Y10@150" AND cover\'') from None
+
+    def values(self, path):
+        """The indexed callouts and values of one report."""
+        row = self.conn.execute("SELECT id, drawing_number FROM reports WHERE path = ?",
+                                (os.path.normpath(path),)).fetchone()
+        if row is None:
+            raise KeyError(path)
+        result = {"drawing_number": row["drawing_number"], "callouts": [
+            (r["diameter"], r["spacing"]) for r in self.conn.execute(
+                "SELECT diameter, spacing FROM callouts WHERE report_id = ? "
+                "ORDER BY diameter, spacing", (row["id"],))]}
+        for r in self.conn.execute("SELECT kind, value FROM report_values WHERE report_id = ? "
+                                   "ORDER BY kind, value", (row["id"],)):
+            result.setdefault(r["kind"], []).append(r["value"])
+        return result
+
+    def stats(self):
+        return {
+            "reports": self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0],
+            "callouts": self.conn.execute("SELECT COUNT(*) FROM callouts").fetchone()[0],
+            "values": self.conn.execute("SELECT COUNT(*) FROM report_values").fetchone()[0],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search extracted drawing reports")
+    parser.add_argument("--db", default=DEFAULT_INDEX_PATH, help="Index database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index new and changed reports")
+    update.add_argument("paths", nargs="*", help=f"Report files (default {' '.join(DEFAULT_PATTERNS)})")
+
+    search = commands.add_parser("search", help="Find reports")
+    search.add_argument("text", nargs="?", help="Full-text query (FTS5 syntax)")
+    search.add_argument("--bar", help="Bar callout, e.g. Y10@150")
+    search.add_argument("--diameter", type=float)
+    search.add_argument("--spacing", type=float)
+    search.add_argument("--cover", type=float)
+    search.add_argument("--concrete", help="Concrete grade, e.g. M25")
+    search.add_argument("--steel", help="Steel grade, e.g. Fe500")
+    search.add_argument("--drawing", help="Drawing number (prefix with trailing *)")
+    search.add_argument("--limit", type=int, default=100)
+
+    commands.add_parser("stats", help="Show index size")
+    args = parser.parse_args()
+    index = SearchIndex(args.db)
+
+    if args.command == "update":
+        counts = index.update(args.paths or None)
+        print("🗂️ " + ", ".join(f"{n} {state}" for state, n in counts.items()))
+    elif args.command == "search":
+        start = time.perf_counter()
+        try:
+            hits = index.search(args.text, bar=args.bar, diameter=args.diameter,
+                                spacing=args.spacing, cover=args.cover,
+                                concrete_grade=args.concrete, steel_grade=args.steel,
+                                drawing_number=args.drawing, limit=args.limit)
+        except ValueError as e:
+            index.close()
+            parser.error(str(e))
+        elapsed = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"📄 {hit['path']}  {hit['drawing_number'] or ''}")
+            if hit.get("snippet"):
+                print(f"    {hit['snippet']}")
+        print(f"🔎 {len(hits)} report(s) in {elapsed:.1f} ms")
+    elif args.command == "stats":
+        for name, n in index.stats().items():
+            print(f"{name:>9}: {n}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+HTTP service for drawing analysis and compliance checking.
+
+Endpoints:
+    POST /jobs                 Upload a PDF (multipart field "file"); returns 202 and
+                               a job id at once. Pages are analysed by a background
+                               worker pool through the job queue.
+    GET  /jobs/<id>            Progress of every page of the upload
+    GET  /jobs/<id>/events     Server-sent events with progress and results; ?interval=
+                               seconds between polls, clamped to 0.1-30
+    GET  /jobs/<id>/result     Extraction and check results of finished pages
+    POST /check                Synchronous IS 456 / SP 34 checks on JSON member data
+
+Usage:
+    python service.py --port 8000 --workers 2
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+import uuid
+
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+
+from compliance import check_member, is456, sp34
+from job_queue import DEFAULT_DB_PATH, DONE, FAILED, PENDING, JobQueue
+
+UPLOAD_DIR = "uploads"
+MIN_POLL_INTERVAL = 0.1     # seconds between event stream polls of the job queue
+MAX_POLL_INTERVAL = 30.0
+
+app = Flask(__name__)
+app.config["JOB_DB"] = DEFAULT_DB_PATH
+
+
+def get_queue():
+    """One queue connection per request (SQLite connections are per thread)."""
+    if "queue" not in g:
+        g.queue = JobQueue(app.config["JOB_DB"])
+    return g.queue
+
+
+@app.teardown_appcontext
+def close_queue(exception):
+    queue = g.pop("queue", None)
+    if queue is not None:
+        queue.close()
+
+
+def upload_path(job_id):
+    return os.path.join(UPLOAD_DIR, f"{job_id}.pdf")
+
+
+def job_status(queue, job_id):
+    """Summarize the page jobs belonging to one upload, or None if unknown."""
+    pages = queue.jobs_for_pdf(upload_path(job_id))
+    if not pages:
+        return None
+    states = [page["state"] for page in pages]
+    if all(state == DONE for state in states):
+        state = DONE
+    elif all(state in (DONE, FAILED) for state in states):
+        state = FAILED
+    else:
+        state = "running" if any(s != PENDING for s in states) else PENDING
+    return {
+        "id": job_id,
+        "state": state,
+        "pages": [
+            {
+                "page": page["page_number"],
+                "state": page["state"],
+                "last_stage": page["stage"],
+                "attempts": page["attempts"],
+                "error": page["error"],
+            }
+            for page in pages
+        ],
+    }
+
+
+def page_results(queue, page):
+    outputs = queue.checkpoints(page["id"])
+    return {
+        "page": page["page_number"],
+        "extraction": outputs.get("analyse"),
+        "checks": outputs.get("check"),
+    }
+
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Upload a PDF in the 'file' form field"}), 400
+
+    job_id = uuid.uuid4().hex
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    upload.save(upload_path(job_id))
+    try:
+        page_jobs = get_queue().enqueue_pdf(upload_path(job_id))
+    except Exception as e:
+        os.remove(upload_path(job_id))
+        return jsonify({"error": f"Could not read PDF: {e}"}), 400
+
+    return jsonify({
+        "id": job_id,
+        "filename": upload.filename,
+        "pages": len(page_jobs),
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+    }), 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    status = job_status(get_queue(), job_id)
+    if status is None:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+    return jsonify(status)
+
+
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def get_job_result(job_id):
+    queue = get_queue()
+    pages = queue.jobs_for_pdf(upload_path(job_id))
+    if not pages:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+    return jsonify({
+        "id": job_id,
+        "pages": [page_results(queue, page) for page in pages if page["state"] == DONE],
+    })
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def stream_job(job_id):
+    try:
+        poll_interval = float(request.args.get("interval", 1.0))
+    except ValueError:
+        return jsonify({"error": "interval must be a number of seconds"}), 400
+    if not math.isfinite(poll_interval):
+        return jsonify({"error": "interval must be a number of seconds"}), 400
+    poll_interval = min(max(poll_interval, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+
+    def events():
+        queue = JobQueue(app.config["JOB_DB"])
+        try:
+            last = None
+            sent_results = set()
+            while True:
+                status = job_status(queue, job_id)
+                if status is None:
+                    yield f"event: error\ndata: {json.dumps({'error': f'Unknown job {job_id}'})}\n\n"
+                    return
+                if status != last:
+                    yield f"event: progress\ndata: {json.dumps(status)}\n\n"
+                    last = status
+                for page in queue.jobs_for_pdf(upload_path(job_id)):
+                    if page["state"] == DONE and page["id"] not in sent_results:
+                        sent_results.add(page["id"])
+                        yield f"event: result\ndata: {json.dumps(page_results(queue, page))}\n\n"
+                if status["state"] in (DONE, FAILED):
+                    yield f"event: end\ndata: {json.dumps({'state': status['state']})}\n\n"
+                    return
+                time.sleep(poll_interval)
+        finally:
+            queue.close()
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/check", methods=["POST"])
+def check():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Expected a JSON body"}), 400
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object: one member, or {\"members\": [...]}"}), 400
+    try:
+        if "members" in payload:
+            members = payload["members"]
+            if not isinstance(members, list):
+                return jsonify({"error": "members must be a list of member objects"}), 400
+            return jsonify({"results": [check_member(member) for member in members]})
+        return jsonify(check_member(payload))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def start_workers(db_path, workers):
+    """Start the background worker pool that processes uploaded pages."""
+    from worker import work
+
+    processes = []
+    for n in range(workers):
+        process = multiprocessing.Process(
+            target=work, args=(db_path, f"service-{os.getpid()}-{n}", True), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drawing analysis HTTP service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2, help="Background analysis workers")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Job queue database file")
+    args = parser.parse_args()
+
+    app.config["JOB_DB"] = args.db
+    JobQueue(args.db).close()  # create the schema before workers race for it
+    # Load the rule tables up front so the first /check request is not slow
+    is456(), sp34()
+    start_workers(args.db, args.workers)
+    print(f"🚀 Service listening on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
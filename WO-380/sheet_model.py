@@ -0,0 +1,442 @@
+"""
+Geometric model of a drawing sheet: grid system, panels and member footprints.
+
+The extraction reports describe locations as text ("panel B-2 to C-3",
+"beam FB1 on grid 2 from A to C"). SheetModel turns them into rectangles in
+sheet coordinates (mm, origin at grid A-1) and keeps them in an R-tree, so
+neighbourhood queries take O(log n) instead of a scan of every member:
+
+    grid = GridSystem.from_extraction(open("results/5.md").read())
+    sheet = SheetModel(grid)
+    sheet.add_panel("S1", "slab", "B-2 to C-3")
+    sheet.add_beam("FB1", "2", "A", "C", width=230)
+    sheet.adjacent("S1")                   # members touching slab S1
+    sheet.supported_by("FB1")              # slabs resting on FB1
+    sheet.support_condition("S1")          # 'continuous' / 'simply_supported' / 'cantilever'
+    sheet.support_distance("FB1", 1500)    # mm from the nearest support, for lap locations
+
+Grid lines with letters run along x and numbered grid lines along y.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]  # x0, y0, x1, y1 (mm)
+
+# Distance under which two footprints count as touching (drawing inaccuracy)
+TOUCH_TOLERANCE = 50.0
+
+SUPPORT_KINDS = ('beam', 'wall', 'column')
+
+
+def _intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _union(boxes: Iterable[BBox]) -> BBox:
+    x0, y0, x1, y1 = zip(*boxes)
+    return min(x0), min(y0), max(x1), max(y1)
+
+
+def _expand(box: BBox, margin: float) -> BBox:
+    return box[0] - margin, box[1] - margin, box[2] + margin, box[3] + margin
+
+
+# =============================================================================
+# R-TREE
+# =============================================================================
+
+class RTree:
+    """
+    Static R-tree bulk loaded with Sort-Tile-Recursive packing.
+
+    Built once from (bbox, item) pairs; query() returns the items whose box
+    intersects the query box.
+    """
+
+    def __init__(self, entries: Sequence[Tuple[BBox, object]], capacity: int = 16):
+        self.capacity = capacity
+        self.size = len(entries)
+        level = [(tuple(box), item) for box, item in entries]
+        self.root = None
+        if not level:
+            return
+        leaf = True
+        while True:
+            nodes = self._pack(level, leaf)
+            if len(nodes) == 1:
+                self.root = nodes[0]
+                return
+            level = [(node[0], node) for node in nodes]
+            leaf = False
+
+    def _pack(self, entries, leaf):
+        """Group one level of entries into nodes (box, children, is_leaf)"""
+        capacity = self.capacity
+        count = math.ceil(len(entries) / capacity)
+        slices = math.ceil(math.sqrt(count))
+        per_slice = slices * capacity
+        entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        nodes = []
+        for start in range(0, len(entries), per_slice):
+            column = sorted(entries[start:start + per_slice], key=lambda e: e[0][1] + e[0][3])
+            for i in range(0, len(column), capacity):
+                children = column[i:i + capacity]
+                nodes.append((_union(box for box, _ in children), children, leaf))
+        return nodes
+
+    def __len__(self) -> int:
+        return self.size
+
+    def query(self, box: BBox) -> List[object]:
+        """Items whose box intersects `box`"""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node_box, children, leaf = stack.pop()
+            if not _intersects(node_box, box):
+                continue
+            if leaf:
+                found.extend(item for child_box, item in children if _intersects(child_box, box))
+            else:
+                stack.extend(node for _, node in children)
+        return found
+
+
+# =============================================================================
+# GRID SYSTEM
+# =============================================================================
+
+GRID_PAIR = re.compile(r"\bgrid\s+([A-Z]{1,2}|\d{1,2})\s*(?:to|and|-)\s*([A-Z]{1,2}|\d{1,2})\b",
+                       re.IGNORECASE)
+TABLE_VALUE = re.compile(r"^\s*\|\s*(\d+(?:\.\d+)?)\s*\|\s*mm\b", re.IGNORECASE)
+DIMENSION_VALUE = re.compile(r"\bDimension\s*[-:]\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+PANEL = re.compile(r"^\s*([A-Z]{1,2})\s*-?\s*(\d{1,2})\s*$", re.IGNORECASE)
+
+
+def _label_key(label: str):
+    return (0, int(label)) if label.isdigit() else (1, len(label), label)
+
+
+@dataclass(slots=True)
+class GridSystem:
+    """Grid line positions (mm) along x (lettered lines) and y (numbered lines)"""
+    x: Dict[str, float]
+    y: Dict[str, float]
+    missing: List[Tuple[str, str]] = field(default_factory=list)  # gaps with no spacing
+
+    @classmethod
+    def from_spacings(cls, spacings: Dict[Tuple[str, str], float],
+                      strict: bool = True) -> 'GridSystem':
+        """
+        Build from {(from_label, to_label): spacing mm} between consecutive grid lines.
+
+        With strict=False a missing spacing does not raise; grid lines beyond
+        the gap cannot be placed and are left out, and the gap is listed in
+        `missing`.
+        """
+        axes = {'missing': []}
+        for axis, numeric in (('x', False), ('y', True)):
+            pairs = {tuple(sorted((a.upper(), b.upper()), key=_label_key)): value
+                     for (a, b), value in spacings.items() if a.isdigit() == numeric}
+            labels = sorted({label for pair in pairs for label in pair}, key=_label_key)
+            positions = {}
+            if labels:
+                positions[labels[0]] = 0.0
+                for previous, label in zip(labels, labels[1:]):
+                    if (previous, label) not in pairs:
+                        if strict:
+                            raise ValueError(f"No spacing between grid {previous} and {label}")
+                        axes['missing'].append((previous, label))
+                        break
+                    positions[label] = positions[previous] + pairs[(previous, label)]
+            axes[axis] = positions
+        return cls(**axes)
+
+    @classmethod
+    def from_extraction(cls, text: str) -> 'GridSystem':
+        """
+        Read grid spacings from an extraction report.
+
+        Understands summary table rows ("| 1995 | mm | ... | Grid A to B |")
+        and bullet items ("Dimension - 1995" followed by "Between Grid A and B").
+        Spacings the report does not give end the grid (see `missing`).
+        """
+        spacings = {}
+        pending = None
+        for line in text.splitlines():
+            dimension = DIMENSION_VALUE.search(line)
+            if dimension:
+                pending = float(dimension.group(1))
+            pair = GRID_PAIR.search(line)
+            if not pair:
+                continue
+            a, b = pair.group(1).upper(), pair.group(2).upper()
+            if a.isdigit() != b.isdigit() or a == b:
+                continue
+            row = TABLE_VALUE.match(line)
+            value = float(row.group(1)) if row else pending
+            if value:
+                spacings.setdefault((a, b), value)
+            pending = None
+        # Keep only spacings between consecutive grid lines
+        consecutive = {}
+        for numeric in (False, True):
+            labels = sorted({l for pair in spacings for l in pair if l.isdigit() == numeric},
+                            key=_label_key)
+            following = dict(zip(labels, labels[1:]))
+            for (a, b), value in spacings.items():
+                a, b = sorted((a, b), key=_label_key)
+                if a.isdigit() == numeric and following.get(a) == b:
+                    consecutive[(a, b)] = value
+        return cls.from_spacings(consecutive, strict=False)
+
+    def line(self, label: str) -> Tuple[str, float]:
+        """Axis ('x' or 'y') and position of a grid line"""
+        label = label.strip().upper()
+        if label in self.x:
+            return 'x', self.x[label]
+        if label in self.y:
+            return 'y', self.y[label]
+        raise KeyError(f"Unknown grid line {label!r}")
+
+    def point(self, panel: str) -> Tuple[float, float]:
+        """Intersection of grid lines, e.g. 'B-2'"""
+        match = PANEL.match(panel)
+        if not match:
+            raise ValueError(f"Invalid grid reference {panel!r}")
+        return self.x[match.group(1).upper()], self.y[match.group(2)]
+
+    def panel(self, reference: str) -> BBox:
+        """Rectangle of a panel reference such as 'B-2 to C-3' (or two corners 'B-2', 'C-3')"""
+        corners = re.split(r"\s+to\s+|\s*[,/]\s*|\s+", reference.strip(), flags=re.IGNORECASE)
+        points = [self.point(corner) for corner in corners if corner]
+        if len(points) != 2:
+            raise ValueError(f"Panel reference needs two grid intersections: {reference!r}")
+        (x0, y0), (x1, y1) = points
+        return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+    @property
+    def extent(self) -> BBox:
+        return (min(self.x.values(), default=0.0), min(self.y.values(), default=0.0),
+                max(self.x.values(), default=0.0), max(self.y.values(), default=0.0))
+
+
+# =============================================================================
+# SHEET MODEL
+# =============================================================================
+
+@dataclass(slots=True)
+class Footprint:
+    """One member on the sheet"""
+    mark: str
+    kind: str               # 'slab', 'beam', 'column', 'wall', 'footing', ...
+    bbox: BBox
+    data: Dict = field(default_factory=dict)
+
+    @property
+    def span_axis(self) -> str:
+        """Axis along which the member spans: a beam's long side, a slab's short side"""
+        dx = self.bbox[2] - self.bbox[0]
+        dy = self.bbox[3] - self.bbox[1]
+        if self.kind == 'slab':
+            return 'x' if dx <= dy else 'y'
+        return 'x' if dx >= dy else 'y'
+
+    @property
+    def span(self) -> float:
+        axis = 0 if self.span_axis == 'x' else 1
+        return self.bbox[axis + 2] - self.bbox[axis]
+
+
+class SheetModel:
+    """Members of one sheet, spatially indexed"""
+
+    def __init__(self, grid: Optional[GridSystem] = None, tolerance: float = TOUCH_TOLERANCE):
+        self.grid = grid
+        self.tolerance = tolerance
+        self.members: List[Footprint] = []
+        self._by_mark: Dict[str, List[int]] = {}
+        self._tree: Optional[RTree] = None
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    # -- building -------------------------------------------------------------
+
+    def add(self, mark: str, kind: str, bbox: BBox, **data) -> Footprint:
+        """Add a member by its footprint rectangle (mm)"""
+        x0, y0, x1, y1 = bbox
+        member = Footprint(mark, kind.lower(), (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)),
+                           data)
+        self._by_mark.setdefault(mark.upper(), []).append(len(self.members))
+        self.members.append(member)
+        self._tree = None
+        return member
+
+    def add_panel(self, mark: str, kind: str, reference: str, **data) -> Footprint:
+        """Add a member covering a grid panel, e.g. add_panel('S1', 'slab', 'B-2 to C-3')"""
+        return self.add(mark, kind, self._require_grid().panel(reference), **data)
+
+    def add_beam(self, mark: str, line: str, start: str, end: str, width: float = 230,
+                 kind: str = 'beam', **data) -> Footprint:
+        """Add a beam (or wall) along grid `line` between grid lines `start` and `end`"""
+        grid = self._require_grid()
+        axis, position = grid.line(line)
+        _, a = grid.line(start)
+        _, b = grid.line(end)
+        half = width / 2
+        if axis == 'x':   # lettered line runs along y
+            bbox = (position - half, min(a, b), position + half, max(a, b))
+        else:
+            bbox = (min(a, b), position - half, max(a, b), position + half)
+        return self.add(mark, kind, bbox, **data)
+
+    def add_column(self, mark: str, point: str, width: float = 300, depth: float = 300,
+                   **data) -> Footprint:
+        """Add a column centred on a grid intersection, e.g. 'C-3'"""
+        x, y = self._require_grid().point(point)
+        return self.add(mark, 'column', (x - width / 2, y - depth / 2, x + width / 2, y + depth / 2),
+                        **data)
+
+    def _require_grid(self) -> GridSystem:
+        if self.grid is None:
+            raise ValueError("This sheet has no grid system")
+        return self.grid
+
+    @property
+    def tree(self) -> RTree:
+        if self._tree is None:
+            self._tree = RTree([(m.bbox, i) for i, m in enumerate(self.members)])
+        return self._tree
+
+    # -- queries --------------------------------------------------------------
+
+    def find(self, mark: str) -> List[Footprint]:
+        """Members with this mark (a mark can repeat on a sheet)"""
+        return [self.members[i] for i in self._by_mark.get(mark.upper(), [])]
+
+    def _footprint(self, target) -> BBox:
+        if isinstance(target, Footprint):
+            return target.bbox
+        if isinstance(target, tuple):
+            return target
+        members = self.find(target)
+        if members:
+            return _union(m.bbox for m in members)
+        return self._require_grid().panel(target)
+
+    def within(self, box: BBox, kinds: Optional[Iterable[str]] = None) -> List[Footprint]:
+        """Members intersecting a rectangle"""
+        kinds = set(kinds) if kinds else None
+        return [self.members[i] for i in sorted(self.tree.query(box))
+                if kinds is None or self.members[i].kind in kinds]
+
+    def adjacent(self, target, kinds: Optional[Iterable[str]] = None) -> List[Footprint]:
+        """Members touching a member mark, panel reference, Footprint or bbox (itself excluded)"""
+        box = self._footprint(target)
+        own = set(id(m) for m in self.find(target)) if isinstance(target, str) else set()
+        if isinstance(target, Footprint):
+            own.add(id(target))
+        return [m for m in self.within(_expand(box, self.tolerance), kinds) if id(m) not in own]
+
+    def supported_by(self, mark: str, kinds: Iterable[str] = ('slab',)) -> List[Footprint]:
+        """Members resting on a beam or wall: those that touch it along its length"""
+        supported = []
+        for support in self.find(mark):
+            axis = 1 if support.span_axis == 'x' else 0  # across the support
+            for member in self.adjacent(support, kinds):
+                across = (member.bbox[axis] <= support.bbox[axis + 2] + self.tolerance
+                          and member.bbox[axis + 2] >= support.bbox[axis] - self.tolerance)
+                along = 1 - axis
+                overlap = (min(member.bbox[along + 2], support.bbox[along + 2])
+                           - max(member.bbox[along], support.bbox[along]))
+                if across and overlap > self.tolerance and member not in supported:
+                    supported.append(member)
+        return supported
+
+    def _at_ends(self, member: Footprint, inward: float, outward: float,
+                 kinds: Optional[Iterable[str]] = None) -> Tuple[List[Footprint], List[Footprint]]:
+        """
+        Members crossing a strip at the start and end edges of a member's span.
+
+        A member counts only if it covers at least half the edge, so members
+        along the sides that merely touch a corner are left out.
+        """
+        axis = 0 if member.span_axis == 'x' else 1
+        across = 1 - axis
+        edge_length = member.bbox[across + 2] - member.bbox[across]
+        ends = []
+        for edge, direction in ((member.bbox[axis], -1), (member.bbox[axis + 2], 1)):
+            box = list(member.bbox)
+            box[axis] = min(edge - direction * inward, edge + direction * outward)
+            box[axis + 2] = max(edge - direction * inward, edge + direction * outward)
+            found = []
+            for other in self.within(tuple(box), kinds):
+                if other is member:
+                    continue
+                overlap = (min(other.bbox[across + 2], member.bbox[across + 2])
+                           - max(other.bbox[across], member.bbox[across]))
+                if overlap >= 0.5 * edge_length:
+                    found.append(other)
+            ends.append(found)
+        return ends[0], ends[1]
+
+    def supports(self, target) -> Tuple[List[Footprint], List[Footprint]]:
+        """Supporting members at the start and end of a member's span"""
+        member = target if isinstance(target, Footprint) else self._single(target)
+        # A collinear member of the same kind continues the span rather than supporting it
+        return tuple([other for other in found
+                      if not (other.kind == member.kind and other.span_axis == member.span_axis)]
+                     for found in self._at_ends(member, self.tolerance, self.tolerance,
+                                                SUPPORT_KINDS))
+
+    def continues(self, target) -> Tuple[bool, bool]:
+        """Whether a member of the same kind continues past its start and end supports"""
+        member = target if isinstance(target, Footprint) else self._single(target)
+        start, end = (any(other.span_axis == member.span_axis for other in found)
+                      for found in self._at_ends(member, -self.tolerance, 2 * self.tolerance,
+                                                 (member.kind,)))
+        return start, end
+
+    def support_condition(self, target) -> str:
+        """
+        Support condition for Clause 23.2.1: 'cantilever' when one end of the
+        span has no support, 'continuous' when the member continues past a
+        support, otherwise 'simply_supported'
+        """
+        member = target if isinstance(target, Footprint) else self._single(target)
+        start, end = self.supports(member)
+        if not start or not end:
+            return 'cantilever' if start or end else 'simply_supported'
+        return 'continuous' if any(self.continues(member)) else 'simply_supported'
+
+    def support_distance(self, target, position: float) -> float:
+        """
+        Distance (mm) of a point along a member's span (measured from its
+        start edge) to the nearest support face, e.g. for lap locations
+        """
+        member = target if isinstance(target, Footprint) else self._single(target)
+        axis = 0 if member.span_axis == 'x' else 1
+        point = member.bbox[axis] + position
+        faces = []
+        for support in self.within(member.bbox, SUPPORT_KINDS):
+            if support is member:
+                continue
+            faces.extend((support.bbox[axis], support.bbox[axis + 2]))
+        start, end = self.supports(member)
+        if start:
+            faces.append(member.bbox[axis])
+        if end:
+            faces.append(member.bbox[axis + 2])
+        return min((abs(point - face) for face in faces), default=math.inf)
+
+    def _single(self, mark: str) -> Footprint:
+        members = self.find(mark)
+        if not members:
+            raise KeyError(f"No member {mark!r} on this sheet")
+        return members[0]
@@ -0,0 +1,535 @@
+"""
+Structured extraction of schedule tables (beam, column, footing and bar
+bending schedules).
+
+A schedule is a grid of ruled lines. The grid is rebuilt from the lines
+themselves - the vector paths of the PDF page when there is one, long ink
+runs on the raster otherwise - and a missing separator between two grid
+cells marks a merged cell. Cell text comes from the PDF's text layer, or
+from local OCR of the raster (ocr.py) when the schedule text is drawn as
+strokes. Rows below the header become ScheduleRow records carrying
+ReinforcementBar objects and a Reinforcement summary for the IS checkers,
+without a round-trip to the vision model.
+
+    for table in tables_from_pdf("sample_pdfs/1.pdf"):
+        for row in schedule_rows(table):
+            print(row.mark, row.dimensions, row.bars)
+
+    table = table_from_image("convertedimages/1.jpg", box)    # box from layout.py
+
+    python table_extractor.py sample_pdfs/1.pdf
+    python table_extractor.py convertedimages/1.jpg --json
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from IS import Reinforcement, ReinforcementBar
+from consistency import MARK_KINDS, MEMBER_MARK
+from layout import INK, WORKING_SIZE, line_runs, segment_ink, segment_page
+from units import length_mm, lengths_mm
+
+PDF_SNAP = 2.0            # points; line positions closer than this are one grid line
+PDF_MIN_RULE = 10.0       # points; shorter lines are strokes of vector (SHX) text
+RASTER_SNAP = 6           # page pixels
+RASTER_RUN = 60           # page pixels; longer ink runs are ruled lines, shorter are text strokes
+SEPARATOR_COVERAGE = 0.8  # share of a cell edge a ruled line must cover to separate two cells
+TABLE_MIN_LINES = 3
+
+Box = Tuple[float, float, float, float]
+Segment = Tuple[float, float, float]      # (position, start, end): y, x0, x1 of a horizontal line
+
+LEGS = re.compile(r"\b(\d)\s*L\b", re.IGNORECASE)                 # 2L-Y8@150: two-legged stirrups
+SIZE_PAIR = re.compile(r"(\d+(?:\.\d+)?)\s*(\"|''|mm)?\s*[xX×*]\s*(\d+(?:\.\d+)?)\s*(\"|''|mm)?")
+
+# Header words that say what a column holds
+DIMENSION_WORDS = {
+    'length': ('LENGTH', '(L)', 'SPAN'),
+    'width': ('WIDTH', 'BREADTH', '(W)', '(B)'),
+    'depth': ('DEPTH', 'THICKNESS', 'THK', '(D)'),
+}
+POSITION_WORDS = (
+    ('stirrup', ('STIRRUP', 'TIES', 'TIE', 'LINKS', 'SHEAR')),
+    ('top', ('TOP',)),
+    ('bottom', ('BOTTOM', 'BOT', 'BTM')),
+    ('side', ('SIDE', 'FACE')),
+    ('longitudinal', ('VERTICAL', 'LONGITUDINAL', 'MAIN')),
+)
+
+
+@dataclass(slots=True)
+class Table:
+    """A ruled grid with the text of every cell; merged cells repeat their text"""
+    box: Box                                   # sheet units: PDF points or page pixels
+    xs: List[float]                            # column lines, left to right
+    ys: List[float]                            # row lines, top to bottom
+    cells: List[List[str]]                     # [row][column]
+    spans: List[List[int]]                     # merged-cell id of every grid cell
+    source: str = "pdf"                        # 'pdf' or 'raster'
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.cells), len(self.cells[0]) if self.cells else 0
+
+    def header_rows(self) -> int:
+        """Rows above the first one whose first cell is a member mark"""
+        for i, row in enumerate(self.cells):
+            if row and MEMBER_MARK.fullmatch(row[0].strip().upper()):
+                return i
+        return len(self.cells)
+
+    def columns(self) -> List[str]:
+        """Column names: the distinct header texts above each column, top down"""
+        names = []
+        for j in range(self.shape[1]):
+            parts = []
+            for i in range(self.header_rows()):
+                text = self.cells[i][j].strip()
+                if text and text not in parts:
+                    parts.append(text)
+            names.append(" ".join(parts).replace("\n", " "))
+        return names
+
+    def markdown(self) -> str:
+        rows = [self.columns()] + self.cells[self.header_rows():]
+        lines = ["| " + " | ".join(c.replace("\n", " ").strip() or " " for c in row) + " |"
+                 for row in rows]
+        lines.insert(1, "|" + "---|" * self.shape[1])
+        return "\n".join(lines)
+
+    def has_body_text(self) -> bool:
+        """True when the rows below the header hold more than the member marks"""
+        return any(c.strip() for row in self.cells[self.header_rows():] for c in row[1:])
+
+
+@dataclass(slots=True)
+class ScheduleRow:
+    """One member of a schedule"""
+    mark: str
+    kind: str                                            # beam, column, footing, slab, wall
+    dimensions: Dict[str, float] = field(default_factory=dict)   # length / width / depth, mm
+    bars: List[ReinforcementBar] = field(default_factory=list)
+    bar_columns: List[str] = field(default_factory=list)   # column each bar was read from
+    reinforcement: Reinforcement = field(default_factory=Reinforcement)
+    cells: Dict[str, str] = field(default_factory=dict)  # column name -> text
+
+
+# =============================================================================
+# GRID
+# =============================================================================
+
+def _cluster(values: Sequence[float], snap: float) -> List[float]:
+    """Mean of each group of values no further than snap from the previous one"""
+    groups: List[List[float]] = []
+    for value in sorted(values):
+        if groups and value - groups[-1][-1] <= snap:
+            groups[-1].append(value)
+        else:
+            groups.append([value])
+    return [sum(g) / len(g) for g in groups]
+
+
+def _covered(segments: List[Segment], position: float, start: float, end: float,
+             snap: float) -> bool:
+    """True when the segments at position cover most of [start, end]"""
+    spans = sorted((max(s, start), min(e, end)) for p, s, e in segments
+                   if abs(p - position) <= snap and e > start and s < end)
+    covered, reach = 0.0, start
+    for s, e in spans:
+        if e > reach:
+            covered += e - max(s, reach)
+            reach = e
+    return covered >= SEPARATOR_COVERAGE * (end - start)
+
+
+def _anchored(segment: Segment, across: List[Segment], snap: float) -> bool:
+    """True when both ends of segment lie on segments running the other way"""
+    position, start, end = segment
+    return all(any(abs(p - point) <= snap and s - snap <= position <= e + snap
+                   for p, s, e in across) for point in (start, end))
+
+
+def build_table(horizontal: List[Segment], vertical: List[Segment], snap: float,
+                text_of: Callable[[Box], str], source: str = "pdf") -> Optional[Table]:
+    """
+    Grid of the ruled lines and the text of its cells; text_of returns the
+    text inside a box. None when the lines do not make a table.
+    """
+    # Ruled lines end on other ruled lines; strokes of lettering do not
+    horizontal, vertical = (
+        [seg for seg in horizontal if _anchored(seg, vertical, snap)],
+        [seg for seg in vertical if _anchored(seg, horizontal, snap)])
+    ys = _cluster([p for p, _, _ in horizontal], snap)
+    xs = _cluster([p for p, _, _ in vertical], snap)
+    if len(ys) < TABLE_MIN_LINES or len(xs) < TABLE_MIN_LINES:
+        return None
+    rows, cols = len(ys) - 1, len(xs) - 1
+
+    parent = list(range(rows * cols))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(rows):
+        for j in range(cols):
+            if j + 1 < cols and not _covered(vertical, xs[j + 1], ys[i], ys[i + 1], snap):
+                parent[find(i * cols + j)] = find(i * cols + j + 1)
+            if i + 1 < rows and not _covered(horizontal, ys[i + 1], xs[j], xs[j + 1], snap):
+                parent[find(i * cols + j)] = find((i + 1) * cols + j)
+
+    spans = [[find(i * cols + j) for j in range(cols)] for i in range(rows)]
+    sizes = np.bincount([span for row in spans for span in row])
+    if sizes.max() > rows * cols / 2:
+        return None                 # mostly one merged cell: lines of a drawing, not a table
+    boxes: Dict[int, List[float]] = {}
+    extents: Dict[int, List[int]] = {}
+    for i in range(rows):
+        for j in range(cols):
+            box = boxes.setdefault(spans[i][j], [xs[j], ys[i], xs[j + 1], ys[i + 1]])
+            box[:] = [min(box[0], xs[j]), min(box[1], ys[i]),
+                      max(box[2], xs[j + 1]), max(box[3], ys[i + 1])]
+            extent = extents.setdefault(spans[i][j], [i, j, i, j])
+            extent[:] = [min(extent[0], i), min(extent[1], j), max(extent[2], i), max(extent[3], j)]
+    # Merged cells of a table are rectangles; L-shaped ones are the lines of a drawing
+    if any((bottom - top + 1) * (right - left + 1) != sizes[span]
+           for span, (top, left, bottom, right) in extents.items()):
+        return None
+    texts = {span: text_of(tuple(box)) for span, box in boxes.items()}
+    cells = [[texts[spans[i][j]] for j in range(cols)] for i in range(rows)]
+    return Table((xs[0], ys[0], xs[-1], ys[-1]), xs, ys, cells, spans, source)
+
+
+# =============================================================================
+# PDF
+# =============================================================================
+
+def _pdf_segments(page, box: Optional[Box] = None,
+                  snap: float = PDF_SNAP) -> Tuple[List[Segment], List[Segment]]:
+    """Horizontal and vertical ruled lines of a pdfplumber page (lines and rectangle edges)"""
+    horizontal, vertical = [], []
+
+    def add(x0, top, x1, bottom):
+        if box and (x1 < box[0] - snap or x0 > box[2] + snap
+                    or bottom < box[1] - snap or top > box[3] + snap):
+            return
+        if bottom - top <= snap and x1 - x0 >= PDF_MIN_RULE:
+            horizontal.append(((top + bottom) / 2, x0, x1))
+        elif x1 - x0 <= snap and bottom - top >= PDF_MIN_RULE:
+            vertical.append(((x0 + x1) / 2, top, bottom))
+
+    for line in page.lines:
+        add(line['x0'], line['top'], line['x1'], line['bottom'])
+    for rect in page.rects:
+        x0, top, x1, bottom = rect['x0'], rect['top'], rect['x1'], rect['bottom']
+        if bottom - top <= snap or x1 - x0 <= snap:
+            add(x0, top, x1, bottom)
+        else:
+            for edge in ((x0, top, x1, top), (x0, bottom, x1, bottom),
+                         (x0, top, x0, bottom), (x1, top, x1, bottom)):
+                add(*edge)
+    if box:
+        horizontal = [(p, max(s, box[0]), min(e, box[2])) for p, s, e in horizontal]
+        vertical = [(p, max(s, box[1]), min(e, box[3])) for p, s, e in vertical]
+    return horizontal, vertical
+
+
+def pdf_table_boxes(page) -> List[Box]:
+    """Table regions of a PDF page, found by layout.py on a rendering of its ruled lines"""
+    scale = WORKING_SIZE / max(page.width, page.height)
+    image = Image.new('1', (round(page.width * scale), round(page.height * scale)), 0)
+    draw = ImageDraw.Draw(image)
+    horizontal, vertical = _pdf_segments(page)
+    for position, start, end in horizontal:
+        draw.line((start * scale, position * scale, end * scale, position * scale), fill=1)
+    for position, start, end in vertical:
+        draw.line((position * scale, start * scale, position * scale, end * scale), fill=1)
+    layout = segment_ink(np.asarray(image, dtype=bool), scale,
+                         (int(page.width), int(page.height)), margin=0)
+    return [region.box for region in layout.of_kind('table')]
+
+
+def tables_from_pdf(pdf_path: str, page_number: int = 1,
+                    boxes: Optional[List[Box]] = None) -> List[Table]:
+    """Schedules of a vector PDF page; boxes (points) skip the table search"""
+    import pdfplumber
+    from pdfplumber.utils import extract_text
+
+    with pdfplumber.open(pdf_path) as pdf:
+        page = pdf.pages[page_number - 1]
+        boxes = pdf_table_boxes(page) if boxes is None else boxes
+        chars = page.chars
+        tables = []
+        for box in boxes:
+            padded = (box[0] - PDF_SNAP, box[1] - PDF_SNAP, box[2] + PDF_SNAP, box[3] + PDF_SNAP)
+            inside = [c for c in chars if padded[0] <= (c['x0'] + c['x1']) / 2 <= padded[2]
+                      and padded[1] <= (c['top'] + c['bottom']) / 2 <= padded[3]]
+
+            def text_of(cell: Box) -> str:
+                return extract_text([c for c in inside
+                                     if cell[0] <= (c['x0'] + c['x1']) / 2 <= cell[2]
+                                     and cell[1] <= (c['top'] + c['bottom']) / 2 <= cell[3]]).strip()
+
+            table = build_table(*_pdf_segments(page, padded), PDF_SNAP, text_of, "pdf")
+            if table is not None:
+                tables.append(table)
+    return tables
+
+
+# =============================================================================
+# RASTER
+# =============================================================================
+
+def _mask_segments(mask: np.ndarray, offset: Tuple[int, int]) -> List[Segment]:
+    """Horizontal runs of a line mask as segments, offset to page pixels"""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    rows, starts = np.nonzero(np.diff(padded, axis=1) == 1)
+    _, ends = np.nonzero(np.diff(padded, axis=1) == -1)
+    left, top = offset
+    return [(float(r + top), float(s + left), float(e + left)) for r, s, e in zip(rows, starts, ends)]
+
+
+def table_from_image(image_path: str, box: Box) -> Optional[Table]:
+    """
+    Schedule inside box (page pixels) of a raster page. Cell text needs
+    local OCR; without it the grid comes back with empty cells.
+    """
+    import ocr
+
+    left, top = int(box[0]), int(box[1])
+    with Image.open(image_path) as image:
+        crop = image.crop(tuple(int(v) for v in box)).convert('L')
+    ink = np.asarray(crop) < INK
+    horizontal = _mask_segments(line_runs(ink, RASTER_RUN), (left, top))
+    vertical = [(p, s, e)
+                for p, s, e in _mask_segments(line_runs(ink.T, RASTER_RUN), (top, left))]
+
+    words = ocr.ocr_image(crop, (left, top)) if ocr.available() else []
+
+    def text_of(cell: Box) -> str:
+        inside = [w for w in words if cell[0] <= (w.box[0] + w.box[2]) / 2 <= cell[2]
+                  and cell[1] <= (w.box[1] + w.box[3]) / 2 <= cell[3]]
+        inside.sort(key=lambda w: (w.line, w.box[0]))
+        return ocr.normalize(" ".join(w.text for w in inside))
+
+    return build_table(horizontal, vertical, RASTER_SNAP, text_of, "raster")
+
+
+def tables_from_image(image_path: str) -> List[Table]:
+    """Schedules of a raster page, located by layout.py"""
+    tables = []
+    for region in segment_page(image_path, margin=RASTER_SNAP).of_kind('table'):
+        table = table_from_image(image_path, region.box)
+        if table is not None:
+            tables.append(table)
+    return tables
+
+
+# =============================================================================
+# RECORDS
+# =============================================================================
+
+def parse_bars(text: str, position: str) -> List[Tuple[int, float, float]]:
+    """(number, diameter, spacing) of the callouts in a cell; 0 where not given"""
+    import ocr
+
+    bars = []
+    legs = LEGS.search(text)
+    for kind, _, value in ocr.recognize_line(ocr.normalize(text)):
+        if kind == 'bar_callout':
+            number = int(legs.group(1)) if legs and position == 'stirrup' else 0
+            bars.append((number, value['diameter'], float(value['spacing'])))
+        elif kind == 'bar_count':
+            bars.append((value['count'], value['diameter'], 0.0))
+    return bars
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\(\w\)|[A-Z]+", text.upper())
+
+
+def _column_role(name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(dimension, bar position, direction) a column holds, from its header"""
+    words = _words(name)
+    for dimension, keys in DIMENSION_WORDS.items():
+        if any(k in words for k in keys):
+            return dimension, None, None
+    position = next((p for p, keys in POSITION_WORDS if any(k in words for k in keys)), None)
+    direction = None
+    if words and words[-1] in ('A', 'LONG', 'L'):
+        direction = 'length'
+    elif words and words[-1] in ('B', 'SHORT', 'W'):
+        direction = 'width'
+    return None, position, direction
+
+
+def _bar_area(diameter: float) -> float:
+    return math.pi * diameter ** 2 / 4
+
+
+def _summary(bars: List[ReinforcementBar], directions: List[Optional[str]]) -> Reinforcement:
+    """Reinforcement of a row: main and distribution steel per member (or per metre for mesh)"""
+    def area(bar: ReinforcementBar) -> float:
+        if bar.spacing:
+            return _bar_area(bar.diameter) * 1000 / bar.spacing
+        return _bar_area(bar.diameter) * bar.number
+
+    stirrups = [b for b in bars if b.position == 'stirrup']
+    main = [(b, d) for b, d in zip(bars, directions) if b.position in ('bottom', 'longitudinal')]
+    if not main:
+        main = [(b, d) for b, d in zip(bars, directions) if b.position != 'stirrup']
+    # Mesh in two directions: the first direction is main steel, the other distribution
+    first = next((d for _, d in main if d), None)
+    distribution = [b for b, d in main if d and d != first]
+    main = [b for b, d in main if not d or d == first]
+    return Reinforcement(
+        main_steel_area=round(sum(area(b) for b in main), 1),
+        distribution_steel_area=round(sum(area(b) for b in distribution), 1),
+        main_bar_dia=max((b.diameter for b in main), default=0),
+        distribution_bar_dia=max((b.diameter for b in distribution), default=0),
+        stirrup_dia=max((b.diameter for b in stirrups), default=0),
+        stirrup_spacing=min((b.spacing for b in stirrups if b.spacing), default=0),
+    )
+
+
+def schedule_rows(table: Table) -> List[ScheduleRow]:
+    """
+    Member records of a schedule. Rows that share a merged mark cell (a
+    footing with TOP and BOTTOM rows) are one member; a TOP/BOTTOM cell in
+    a row sets the position of that row's bars.
+    """
+    header = table.header_rows()
+    if header >= len(table.cells):
+        return []
+    names = table.columns()
+    roles = [_column_role(name) for name in names]
+
+    members: Dict[int, ScheduleRow] = {}
+    pending: Dict[int, List[Tuple]] = {}
+    for i in range(header, len(table.cells)):
+        row = table.cells[i]
+        match = MEMBER_MARK.search(row[0].upper())
+        if not match:
+            continue
+        span = table.spans[i][0]
+        member = members.get(span)
+        if member is None:
+            member = members[span] = ScheduleRow(match.group(0), MARK_KINDS[match.group(1)])
+            pending[span] = []
+        row_position = next((p for p, keys in POSITION_WORDS if p in ('top', 'bottom')
+                             for c in row if c.strip().upper() in keys), None)
+        seen_spans = set()
+        for j in range(1, len(row)):
+            text = row[j].strip()
+            if not text or table.spans[i][j] in seen_spans and table.spans[i][j] != span:
+                continue
+            seen_spans.add(table.spans[i][j])
+            member.cells.setdefault(names[j] or f"column {j + 1}", text)
+            dimension, position, direction = roles[j]
+            if dimension:
+                size = SIZE_PAIR.search(text)
+                if size and dimension != 'length':
+                    width, depth = lengths_mm([size.group(1) + (size.group(2) or ''),
+                                               size.group(3) + (size.group(4) or '')])
+                    member.dimensions.setdefault('width', float(width))
+                    member.dimensions.setdefault('depth', float(depth))
+                elif not math.isnan(value := length_mm(text.replace("\n", " "))):
+                    member.dimensions.setdefault(dimension, value)
+                continue
+            position = position or row_position or ('longitudinal' if member.kind == 'column'
+                                                    else 'bottom')
+            pending[span].extend((n, d, s, position, direction, names[j])
+                                 for n, d, s in parse_bars(text, position))
+
+    rows = []
+    for span, member in members.items():
+        directions = []
+        for number, diameter, spacing, position, direction, column in pending[span]:
+            along = member.dimensions.get(direction or 'length', 0.0)
+            across = member.dimensions.get('width' if direction == 'length' else 'length', 0.0)
+            if spacing and not number and across and position != 'stirrup':
+                number = int(across // spacing) + 1
+            member.bars.append(ReinforcementBar(diameter=diameter, number=number, spacing=spacing,
+                                                length=along, position=position))
+            member.bar_columns.append(column)
+            directions.append(direction)
+        member.reinforcement = _summary(member.bars, directions)
+        rows.append(member)
+    return rows
+
+
+def describe_bar(bar: ReinforcementBar) -> str:
+    if bar.spacing:
+        legs = f"{bar.number}L-" if bar.position == 'stirrup' and bar.number else ""
+        return f"{legs}Y{bar.diameter:g}@{bar.spacing:g} c/c"
+    return f"{bar.number}Y{bar.diameter:g}"
+
+
+def schedule_report(tables: List[Table]) -> str:
+    """Extraction-style markdown of schedules, readable by compliance.parse_extraction"""
+    parts = []
+    for table in tables:
+        parts.append(table.markdown())
+        for row in schedule_rows(table):
+            size = " x ".join(f"{row.dimensions[k]:g}" for k in ('length', 'width', 'depth')
+                              if k in row.dimensions)
+            bars = "; ".join(f"{b.position} {describe_bar(b)} ({column})"
+                             for b, column in zip(row.bars, row.bar_columns))
+            parts.append(f"- {row.kind.capitalize()} {row.mark}: "
+                         + ", ".join(p for p in (f"{size} mm" if size else "", bars) if p))
+    return "**Beam Details & Schedule**\n\n" + "\n\n".join(parts) + "\n"
+
+
+def region_report(image_path: str, box: Box) -> Optional[str]:
+    """
+    schedule_report of the schedule inside box (page pixels), or None when
+    no row of it could be read into bars (no grid, or no OCR for its text)
+    """
+    table = table_from_image(image_path, box)
+    if table is None or not any(row.bars for row in schedule_rows(table)):
+        return None
+    return schedule_report([table])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule tables of a drawing as records")
+    parser.add_argument("path", help="Vector PDF or rasterized page image")
+    parser.add_argument("--page", type=int, default=1, help="PDF page number")
+    parser.add_argument("--json", action="store_true", help="Print the records as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.path.lower().endswith(".pdf"):
+        tables = tables_from_pdf(args.path, args.page)
+    else:
+        tables = tables_from_image(args.path)
+    seconds = time.perf_counter() - started
+
+    if args.json:
+        json.dump([[asdict(row) for row in schedule_rows(t)] for t in tables], sys.stdout, indent=2)
+        print()
+        return
+    print(f"📋 {len(tables)} table(s) in {seconds:.2f}s")
+    for table in tables:
+        rows, cols = table.shape
+        print(f"\n{rows} x {cols} grid at {tuple(round(v) for v in table.box)}")
+        print(table.markdown())
+        for row in schedule_rows(table):
+            print(f"   {row.kind} {row.mark}: {row.dimensions} "
+                  + ", ".join(f"{b.position} {describe_bar(b)}" for b in row.bars))
+
+
+if __name__ == "__main__":
+    main()
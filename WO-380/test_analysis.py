@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Continuous beam and slab demands against closed-form results and the IS 456
+tables they come from.
+"""
+
+import numpy as np
+import pytest
+
+from IS import analysis
+from IS.analysis import coefficient_beams, continuous_beams, slab_moments
+
+L = 5.0     # m
+W = 10.0    # kN/m
+
+
+def unfactored(beam, span, dead, live, **kwargs):
+    return continuous_beams(beam, span, dead, live, dead_factor=1.0, live_factor=1.0, **kwargs)
+
+
+def test_two_span_support_moment():
+    forces = unfactored([0, 0], [5000, 5000], W, 0.0)
+    assert forces.right_moment[0] == pytest.approx(-W * L ** 2 / 8)
+    assert forces.left_moment[1] == pytest.approx(-W * L ** 2 / 8)
+    assert forces.left_moment[0] == 0.0
+    assert forces.right_shear[0] == pytest.approx(5 / 8 * W * L)
+
+
+def test_three_span_pattern_loading():
+    forces = unfactored([0, 0, 0], [5000, 5000, 5000], 0.0, W)
+    assert forces.span_moment[0] == pytest.approx(0.101 * W * L ** 2, abs=0.001 * W * L ** 2)
+    assert forces.right_moment[0] == pytest.approx(-0.117 * W * L ** 2, abs=0.001 * W * L ** 2)
+    assert forces.right_shear[0] == pytest.approx(0.617 * W * L, abs=0.001 * W * L)
+
+
+def test_fixed_ended_span():
+    forces = unfactored([0], [5000], W, 0.0, left_fixed=True, right_fixed=True)
+    assert forces.left_moment[0] == pytest.approx(-W * L ** 2 / 12)
+    assert forces.right_moment[0] == pytest.approx(-W * L ** 2 / 12)
+    assert forces.span_moment[0] == pytest.approx(W * L ** 2 / 24)
+
+
+def test_scipy_and_numpy_solves_agree(monkeypatch):
+    pytest.importorskip("scipy")
+    beam = [0, 0, 0, 1, 1, 2, 3, 3, 3, 3]
+    span = [5000, 6000, 5000, 4000, 4500, 3000, 4000, 4200, 3900, 4100]
+    args = (beam, span, np.linspace(10, 20, 10), np.linspace(5, 12, 10))
+    kwargs = dict(stiffness=np.linspace(1, 2, 10), left_fixed=[True, False, False, True])
+    with_scipy = continuous_beams(*args, **kwargs)
+    monkeypatch.setattr(analysis, "sparse", None)
+    with_numpy = continuous_beams(*args, **kwargs)
+    for name in ('span_moment', 'left_moment', 'right_moment', 'left_shear', 'right_shear'):
+        np.testing.assert_allclose(getattr(with_numpy, name), getattr(with_scipy, name),
+                                   rtol=1e-12, atol=1e-9)
+
+
+def test_table_12_and_13_coefficients():
+    wd, wl = 20.0, 12.0
+    forces = coefficient_beams([0, 0, 0, 0], [5000] * 4, wd, wl, dead_factor=1.0, live_factor=1.0)
+    assert forces.span_moment[0] == pytest.approx((wd / 12 + wl / 10) * L ** 2)
+    assert forces.span_moment[1] == pytest.approx((wd / 16 + wl / 12) * L ** 2)
+    assert forces.right_moment[0] == pytest.approx(-(wd / 10 + wl / 9) * L ** 2)
+    assert forces.right_moment[1] == pytest.approx(-(wd / 12 + wl / 9) * L ** 2)
+    assert forces.left_moment[3] == pytest.approx(forces.right_moment[0])   # symmetric ends
+    assert forces.left_moment[2] == pytest.approx(forces.right_moment[1])
+    assert forces.left_shear[3] == pytest.approx(forces.right_shear[0])
+    assert forces.left_shear[0] == pytest.approx((0.40 * wd + 0.45 * wl) * L)
+    assert forces.right_shear[0] == pytest.approx((0.60 * wd + 0.60 * wl) * L)
+    assert forces.left_shear[1] == pytest.approx((0.55 * wd + 0.60 * wl) * L)
+    assert forces.right_shear[1] == pytest.approx((0.50 * wd + 0.60 * wl) * L)
+
+    with pytest.raises(ValueError):
+        coefficient_beams([0, 0], [5000, 5000], wd, wl)
+
+
+def test_table_26_and_27_coefficients():
+    w, lx = 10.0, 4000
+    wlx2 = w * (lx / 1000) ** 2
+    moments = slab_moments(lx, lx, w)
+    assert moments == pytest.approx((-0.032 * wlx2, 0.024 * wlx2, -0.032 * wlx2, 0.024 * wlx2))
+    moments = slab_moments(lx, 1.5 * lx, w, case='two_adjacent_edges')
+    assert moments == pytest.approx((-0.075 * wlx2, 0.056 * wlx2, -0.047 * wlx2, 0.035 * wlx2))
+    assert slab_moments(lx, 1.05 * lx, w)[1] == pytest.approx(0.026 * wlx2)
+    _, short, _, long = slab_moments(lx, 2 * lx, w, case='simply_supported')
+    assert (short, long) == pytest.approx((0.118 * wlx2, 0.029 * wlx2))
+
+
+def test_one_way_panels_are_rejected():
+    with pytest.raises(ValueError, match="one-way"):
+        slab_moments(3000, 6500, 10.0)
+    assert slab_moments(3000, 7500, 10.0, case='simply_supported')[1] > 0
+    with pytest.raises(ValueError, match="one-way"):
+        slab_moments([3000, 3000], [4000, 9500], 10.0, case='simply_supported')
+    with pytest.raises(ValueError):
+        slab_moments(5000, 4000, 10.0)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Batch submit and poll end to end against the local stand-in server, and
+jobs are released when a submission fails.
+"""
+
+import threading
+
+import pytest
+import requests
+from PIL import Image
+
+import batch
+from job_queue import DONE, PENDING, RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GEMINI_API_KEY", "stand-in")
+    queue = JobQueue(str(tmp_path / "jobs.db"), retry_backoff=0)
+    for page in (1, 2):
+        job_id = queue.enqueue("sheets.pdf", page)
+        image_path = str(tmp_path / f"sheets_p{page}.jpg")
+        Image.new("RGB", (64, 48), "white").save(image_path)
+        queue.save_checkpoint(job_id, "rasterize", image_path)
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def backend():
+    server = batch.stand_in_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with requests.Session() as session:
+        yield batch.GeminiBatch(session, root=f"http://127.0.0.1:{server.server_port}")
+    server.shutdown()
+    server.server_close()
+
+
+def test_submit_and_poll(queue, backend):
+    manifests = batch.submit(queue, backend, "Extract everything")
+    assert len(manifests) == 1
+    assert len(manifests[0]["requests"]) == 2
+    assert {job["state"] for job in queue.jobs()} == {RUNNING}
+
+    assert batch.poll(queue, manifests[0], backend) == batch.SUCCEEDED
+    assert {job["state"] for job in queue.jobs()} == {DONE}
+    assert "Stand-in batch answer" in queue.checkpoints(1)["analyse"]
+    assert batch.manifests(batch.SUCCEEDED)[0]["answered"] == 2
+
+
+def test_failed_submission_releases_every_claimed_job(queue, backend, monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_REQUESTS", 1)
+
+    def refuse(path, display_name):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(backend, "submit", refuse)
+    with pytest.raises(RuntimeError, match="provider down"):
+        batch.submit(queue, backend, "Extract everything")
+    jobs = queue.jobs()
+    assert [job["state"] for job in jobs] == [PENDING, PENDING]
+    assert all("batch submission failed" in job["error"] for job in jobs)
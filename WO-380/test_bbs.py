@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Bar rows given only as a spacing are counted across the member width, never
+taken off as 0 kg.
+"""
+
+import pytest
+
+from IS.bbs import takeoff
+from IS.IS_456_2000 import (Dimensions, ExposureCondition, Loads, Material, MemberType,
+                            Reinforcement)
+from IS.member_store import BarStore, MemberStore
+from IS.SP_34 import ReinforcementBar
+
+
+def spacing_only_bars():
+    bars = BarStore()
+    bars.append(0, ReinforcementBar(diameter=8, number=0, spacing=150, length=4000))
+    bars.append(0, ReinforcementBar(diameter=10, number=4, spacing=0, length=4000))
+    return bars
+
+
+def test_spacing_rows_counted_from_members():
+    members = MemberStore()
+    members.append(MemberType.SLAB, Dimensions(4000, 1000, 150, 125, 20), Material(25, 415),
+                   Loads(dead_load=5, live_load=3), ExposureCondition.MILD,
+                   Reinforcement(main_steel_area=335, main_bar_dia=8))
+    schedule = takeoff(spacing_only_bars(), members=members)
+    assert schedule.number.tolist() == [7, 4]          # floor(960 / 150) + 1
+
+
+def test_spacing_rows_counted_from_width():
+    schedule = takeoff(spacing_only_bars(), width=1000, cover=20)
+    assert schedule.number.tolist() == [7, 4]
+    assert schedule.weight[0] == pytest.approx(7 * 4.0 * 8 ** 2 / 162)
+
+
+def test_spacing_rows_without_width_are_rejected():
+    with pytest.raises(ValueError, match="spacing but no number"):
+        takeoff(spacing_only_bars())
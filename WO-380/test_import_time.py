@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the IS compliance package.
+
+Short-lived checks import the package on every start, so importing a checker
+must stay cheap and must not drag in the other code's module or numpy.
+"""
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import time in milliseconds, best of several fresh interpreters
+IMPORT_BUDGET_MS = {
+    "IS": 5,
+    "IS.IS_456_2000": 30,
+    "IS.SP_34": 30,
+}
+
+
+def run_python(code):
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with cached bytecode
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=HERE, env=env, capture_output=True, text=True, check=True)
+
+
+def import_time_ms(module, runs=5):
+    run_python(f"import {module}")  # write the .pyc files first
+    best = float("inf")
+    for _ in range(runs):
+        for line in run_python(f"import {module}").stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                best = min(best, int(fields[1]) / 1000)
+    return best
+
+
+def test_import_time_budget():
+    for module, budget in IMPORT_BUDGET_MS.items():
+        elapsed = import_time_ms(module)
+        assert elapsed <= budget, f"import {module} took {elapsed:.1f} ms (budget {budget} ms)"
+
+
+def test_submodules_load_lazily():
+    code = (
+        "import sys\n"
+        "import IS\n"
+        "assert 'IS.IS_456_2000' not in sys.modules and 'IS.SP_34' not in sys.modules\n"
+        "from IS import ShearCompliance, DurabilityCompliance\n"
+        "assert 'IS.SP_34' not in sys.modules\n"
+        "assert 'numpy' not in sys.modules\n"
+        "from IS import DetailingChecker\n"
+        "assert 'IS.SP_34' in sys.modules\n"
+    )
+    run_python(code)
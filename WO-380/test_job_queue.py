@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Lease handling of the job queue: results and failures are only accepted from
+the worker that holds the job, and expired leases use up attempts.
+"""
+
+from job_queue import DONE, FAILED, PENDING, RUNNING, JobQueue
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = JobQueue(str(tmp_path / "jobs.db"), retry_backoff=0, **kwargs)
+    queue.enqueue("sheets.pdf", 1)
+    return queue
+
+
+def expire(queue, job_id):
+    queue.conn.execute("UPDATE jobs SET lease_expires = 0 WHERE id = ?", (job_id,))
+
+
+def test_complete_and_fail_need_the_lease(tmp_path):
+    queue = make_queue(tmp_path)
+    job = queue.claim("a")
+    assert not queue.complete(job["id"], "b")
+    assert queue.fail(job["id"], "b", "boom") is None
+    assert queue.get(job["id"])["state"] == RUNNING
+    assert queue.complete(job["id"], "a")
+    assert queue.get(job["id"])["state"] == DONE
+
+
+def test_expired_worker_cannot_overwrite_new_owner(tmp_path):
+    queue = make_queue(tmp_path)
+    job = queue.claim("a", lease_seconds=60)
+    expire(queue, job["id"])
+    assert queue.claim("b")["id"] == job["id"]
+    assert not queue.complete(job["id"], "a")
+    assert queue.fail(job["id"], "a", "late failure") is None
+    assert queue.get(job["id"])["worker"] == "b"
+    assert queue.complete(job["id"], "b")
+
+
+def test_expired_leases_count_as_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job = queue.claim("a")
+    expire(queue, job["id"])
+    job = queue.claim("b")
+    assert job["attempts"] == 2
+    expire(queue, job["id"])
+    assert queue.claim("c") is None
+    row = queue.get(job["id"])
+    assert row["state"] == FAILED
+    assert "lease expired" in row["error"]
+
+
+def test_fail_retries_until_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job = queue.claim("a")
+    assert queue.fail(job["id"], "a", "boom") == PENDING
+    job = queue.claim("a")
+    assert queue.fail(job["id"], "a", "boom") == FAILED
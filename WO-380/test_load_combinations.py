@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Table 18 combinations over whole models agree with the one-member Loads and
+the checker's single-span demands.
+"""
+
+import numpy as np
+import pytest
+
+from IS.IS_456_2000 import (DesignChecker, Dimensions, ExposureCondition, Loads, Material,
+                            MemberType, Reinforcement, udl_demands)
+from IS.load_combinations import combination_matrix, envelope, factored_loads
+
+
+def test_table_18_factors():
+    names, factors = combination_matrix()
+    assert factors.shape == (13, 4)
+    rows = dict(zip(names, factors.tolist()))
+    assert rows['DL+LL'] == [1.5, 1.5, 0, 0]
+    assert rows['0.9DL-WL'] == [0.9, 0, -1.5, 0]
+    assert rows['DL+LL+EL'] == [1.2, 1.2, 0, 1.2]
+
+    names, factors = combination_matrix(limit_state='serviceability')
+    assert dict(zip(names, factors.tolist()))['DL+LL-WL'] == [1.0, 0.8, -0.8, 0]
+
+    with pytest.raises(ValueError):
+        combination_matrix(kinds=('dead', 'snow'))
+    with pytest.raises(ValueError):
+        combination_matrix(limit_state='fatigue')
+
+
+def test_factored_loads_match_loads():
+    loads = Loads(dead_load=15, live_load=10, wind_load=4, earthquake_load=6)
+    names, w = factored_loads([15, 10, 4, 6])
+    assert dict(zip(names, w.tolist())) == pytest.approx(loads.get_factored_loads())
+
+
+def test_each_wind_and_earthquake_case_forms_its_own_combinations():
+    kinds = ('dead', 'dead', 'live', 'wind', 'wind', 'earthquake')
+    names, factors = combination_matrix(kinds, ('SW', 'FF', 'LL', 'WX', 'WY', 'EQ'))
+    assert len(names) == 1 + 6 * 2 + 6                # DL+LL, wind twice, earthquake once
+    rows = dict(zip(names, factors.tolist()))
+    assert rows['DL+LL'] == [1.5, 1.5, 1.5, 0, 0, 0]
+    assert rows['DL-WL[WX]'] == [1.5, 1.5, 0, -1.5, 0, 0]
+    assert rows['DL+LL+WL[WY]'] == [1.2, 1.2, 1.2, 0, 1.2, 0]
+    assert rows['0.9DL+EL'] == [0.9, 0.9, 0, 0, 0, 1.5]
+    assert 'DL+WL' not in rows
+
+
+def test_envelope_and_governing():
+    loads = np.array([[15, 10, 0, 0], [20, 0, 0, 30], [5, 0, 40, 0]])
+    env = envelope(loads, span=[5000, 6000, 4000], support=['simply_supported', 'continuous', 'cantilever'])
+    assert len(env) == 3
+
+    moment, shear = udl_demands(1.5 * 25, 5.0)
+    assert env.design_moment[0] == pytest.approx(moment)
+    assert env.shear[0] == pytest.approx(shear)
+    assert env.governing(0) == ('DL+LL', 'DL+LL')
+
+    moment, shear = udl_demands(1.5 * 20 + 1.5 * 30, 6.0, 'continuous')
+    assert env.design_moment[1] == pytest.approx(moment)
+    assert env.governing(1) == ('DL+EL', 'DL+EL')
+
+    # Wind on a light member: the reversal is the uplift less 0.9 DL
+    moment, _ = udl_demands(0.9 * 5 - 1.5 * 40, 4.0, 'cantilever')
+    assert env.moment_min[2] == pytest.approx(moment)
+    moment, _ = udl_demands(1.5 * 5 + 1.5 * 40, 4.0, 'cantilever')
+    assert env.design_moment[2] == pytest.approx(moment)
+    assert env.governing(2) == ('DL+WL', 'DL+WL')
+
+
+def test_check_compliance_uses_analysed_demands_without_loads():
+    checker = DesignChecker()
+    member = dict(
+        member_type=MemberType.BEAM,
+        dimensions=Dimensions(length=5000, width=300, depth=500, effective_depth=450, cover=25),
+        material=Material(fck=25, fy=415),
+        loads=Loads(dead_load=15, live_load=10),
+        exposure=ExposureCondition.MODERATE,
+        reinforcement=Reinforcement(main_steel_area=1256, main_bar_dia=20))
+
+    results = checker.check_compliance(**member, support_condition='propped',
+                                       design_moment=120.0, design_shear=90.0)
+    assert not any("Design demand" in check or "Flexural check error" in check
+                   or "Shear check error" in check for check in results['failed_checks'])
+    assert set(results['utilization_ratios']) >= {'flexure', 'shear'}
+
+    results = checker.check_compliance(**member, support_condition='propped', design_moment=120.0)
+    assert any(check.startswith("Design demand error") for check in results['failed_checks'])
+    assert 'flexure' in results['utilization_ratios']
+    assert 'shear' not in results['utilization_ratios']
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Members come back out of a MemberStore as they went in, material partial
+safety factors and steel modulus included.
+"""
+
+from IS.IS_456_2000 import (Dimensions, ExposureCondition, Loads, Material, MemberType,
+                            Reinforcement)
+from IS.member_store import MemberStore
+
+
+def test_material_round_trips():
+    store = MemberStore()
+    material = Material(fck=30, fy=500, gamma_c=1.4, gamma_s=1.1, Es=195000)
+    store.append(MemberType.BEAM, Dimensions(5000, 300, 500, 450, 25), material,
+                 Loads(dead_load=15, live_load=10), ExposureCondition.MODERATE,
+                 Reinforcement(main_steel_area=1256, main_bar_dia=20))
+    assert store[0].material == material
+    assert store[0].material.Ec == material.Ec
+
+
+def test_from_columns_keeps_material_defaults():
+    store = MemberStore.from_columns([MemberType.SLAB] * 2, [ExposureCondition.MILD] * 2,
+                                     length=[4000, 4500], fck=[25, 25], fy=[415, 500])
+    assert store[1].material == Material(fck=25, fy=500)
+    assert store[0].material.gamma_s == 1.15
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Reprocessing a sheet does not grow the page index: identical rasters reuse
+their row instead of adding a duplicate.
+"""
+
+from PIL import Image, ImageDraw
+
+import pipeline
+from phash import PageIndex, signature
+
+
+def sheet(path, text="Y10@150"):
+    image = Image.new("RGB", (640, 480), "white")
+    ImageDraw.Draw(image).text((100, 100), text, fill="black")
+    image.save(path)
+    return str(path)
+
+
+def test_add_upserts_on_the_raster_digest(tmp_path):
+    index = PageIndex(str(tmp_path / "pages.db"))
+    page = signature(sheet(tmp_path / "a.png"))
+    first = index.add("a.png", "first extraction", page)
+    assert index.add("a.png", "second extraction", page) == first
+    assert len(index) == 1
+    assert index.nearest(page)[0].extraction == "second extraction"
+
+    index.add("b.png", "revision", signature(sheet(tmp_path / "b.png", "Y12@125")))
+    assert len(index) == 2
+    index.close()
+
+
+def test_reused_extraction_is_not_added_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline, "extract_page", lambda image_path: "extraction")
+    context = {"rasterize": sheet(tmp_path / "sheet.png")}
+    assert pipeline.analyse(context) == "extraction"
+    index = PageIndex(pipeline.PAGE_INDEX_PATH)
+    recorded = index.conn.execute("SELECT created_at FROM pages").fetchall()
+    for _ in range(2):
+        assert pipeline.analyse(context) == "extraction"
+    assert index.conn.execute("SELECT created_at FROM pages").fetchall() == recorded
+    index.close()
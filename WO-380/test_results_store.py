@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+IS 456 rows carry the actual and required values the checker had, and runs
+are partitioned by UTC date.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import results_store
+from compliance import check_extraction, check_member
+from results_store import ResultStore
+
+MEMBER = {
+    "member_type": "beam", "exposure": "moderate", "codes": ["IS456"],
+    "dimensions": {"length": 5000, "width": 300, "depth": 500, "effective_depth": 450, "cover": 25},
+    "material": {"fck": 25, "fy": 415},
+    "loads": {"dead_load": 15, "live_load": 10},
+    "reinforcement": {"main_steel_area": 1256, "main_bar_dia": 20},
+}
+
+
+def rows(store, **filters):
+    return {row["description"]: row for row in store.query(**filters).to_pylist()}
+
+
+def test_is456_rows_have_actual_and_required(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.record("run", "B1", check_member(MEMBER), member_type="beam")
+    recorded = rows(store)
+    flexure = next(row for text, row in recorded.items() if text.startswith("Flexural capacity"))
+    assert flexure["actual"] == pytest.approx(1.5 * 25 * 5 ** 2 / 8)
+    assert flexure["actual"] / flexure["required"] == pytest.approx(flexure["utilization"])
+    shear = next(row for text, row in recorded.items()
+                 if "shear" in text.lower() and row["utilization"] is not None)
+    assert shear["actual"] / shear["required"] == pytest.approx(shear["utilization"])
+
+
+def test_extraction_spacing_rows_have_the_limit(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.record("run", "S1", check_extraction("- Y10@150 bottom, Y8@350 top"), member_type="slab")
+    recorded = rows(store)
+    assert recorded["Y10@150: Bar spacing 150mm is within limits"]["required"] == 300
+    failed = recorded["Y8@350: Clause 26.3.3: Maximum spacing allowed is 300mm, provided 350mm"]
+    assert (failed["actual"], failed["required"]) == (350, 300)
+
+
+def test_partition_is_the_utc_date(tmp_path, monkeypatch):
+    utc = datetime(2026, 10, 18, 23, 30, tzinfo=timezone.utc)
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return utc if tz is not None else (utc + timedelta(hours=5, minutes=30)).replace(tzinfo=None)
+
+    monkeypatch.setattr(results_store, "datetime", Clock)
+    store = ResultStore(str(tmp_path))
+    store.record("run", "S1", check_extraction("- Y10@150 bottom"))
+    assert os.listdir(tmp_path) == ["run_date=2026-10-18"]
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Drawing numbers are found in every report format the pipeline writes, and
+malformed full-text queries are reported as ValueError.
+"""
+
+import os
+
+import pytest
+
+from search_index import SearchIndex, drawing_number
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def report(name):
+    with open(os.path.join(HERE, "results", name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_drawing_number_of_every_report():
+    assert drawing_number(report("1.md")) == "TEMPLE/28-1/24/50-001"   # Drawing Number: ...
+    assert drawing_number(report("5.md")) == "TEMPLE/28-1/24/50-005"   # What / Represents
+    assert drawing_number(report("7.md")) == "TEMPLE/28-1/24/50-007"   # What / Value
+
+
+def test_drawing_number_item_stays_in_its_item():
+    text = ("*   **What:** Drawing Number\n*   **Represents:** Drawing Identification\n\n"
+            "*   **What:** Grid Line\n*   **Value:** A1\n")
+    assert drawing_number(text) is None
+
+
+def test_invalid_text_query_is_a_value_error(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.db"))
+    index.update([os.path.join(HERE, "results", "1.md")])
+    assert index.search('"clear cover"')
+    for query in ('"Y10@150', "AND cover", "cover)"):
+        with pytest.raises(ValueError, match="Invalid full-text query"):
+            index.search(query)
+    index.close()
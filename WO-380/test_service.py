@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+HTTP service: malformed requests get a 400, warm checks are fast, uploads
+become page jobs and the event stream reports progress until the job ends.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+import service
+from job_queue import DONE, PENDING, JobQueue
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MEMBER = {
+    "member_type": "beam", "exposure": "moderate",
+    "dimensions": {"length": 5000, "width": 300, "depth": 500, "effective_depth": 450, "cover": 25},
+    "material": {"fck": 25, "fy": 415},
+    "loads": {"dead_load": 15, "live_load": 10},
+    "reinforcement": {"main_steel_area": 1256, "main_bar_dia": 20},
+    "bars": [{"diameter": 20, "number": 4, "spacing": 75, "length": 5000}],
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    service.app.config.update(JOB_DB=str(tmp_path / "jobs.db"), TESTING=True)
+    return service.app.test_client()
+
+
+def events(response):
+    """(event, data) pairs of a server-sent event stream"""
+    found = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = block.split("\n")
+        found.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return found
+
+
+def test_check_rejects_malformed_input(client):
+    assert client.post("/check", data="not json", content_type="application/json").status_code == 400
+    assert client.post("/check", json=[MEMBER]).status_code == 400
+    assert client.post("/check", json={"members": MEMBER}).status_code == 400
+    response = client.post("/check", json=dict(MEMBER, support_condition="hinged"))
+    assert response.status_code == 400
+    assert "support_condition" in response.get_json()["error"]
+
+
+def test_warm_check_is_fast(client):
+    first = client.post("/check", json=MEMBER)
+    assert first.status_code == 200
+    assert set(first.get_json()) == {"IS456", "SP34"}
+
+    start = time.perf_counter()
+    response = client.post("/check", json={"members": [MEMBER, MEMBER]})
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    assert len(response.get_json()["results"]) == 2
+    assert elapsed < 0.5
+
+
+def test_upload_becomes_page_jobs(client):
+    assert client.post("/jobs", data={}).status_code == 400
+
+    with open(os.path.join(HERE, "sample_pdfs", "1.pdf"), "rb") as f:
+        response = client.post("/jobs", data={"file": (f, "1.pdf")})
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job["pages"] == 1
+
+    status = client.get(job["status_url"]).get_json()
+    assert status["state"] == PENDING
+    assert [page["page"] for page in status["pages"]] == [1]
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_event_stream_reports_results_until_done(client):
+    queue = JobQueue(service.app.config["JOB_DB"])
+    job_id = queue.enqueue(service.upload_path("abc"), 1)
+    queue.claim("worker")
+    queue.save_checkpoint(job_id, "analyse", "extraction")
+    queue.save_checkpoint(job_id, "check", {"overall_compliance": True})
+    queue.complete(job_id, "worker")
+    queue.close()
+
+    found = events(client.get("/jobs/abc/events?interval=0"))
+    assert [event for event, _ in found] == ["progress", "result", "end"]
+    assert found[1][1]["extraction"] == "extraction"
+    assert found[2][1] == {"state": DONE}
+
+    assert events(client.get("/jobs/missing/events"))[0][0] == "error"
+
+
+def test_event_stream_rejects_bad_interval(client):
+    for interval in ("soon", "nan", "inf"):
+        assert client.get(f"/jobs/abc/events?interval={interval}").status_code == 400
+
+
+def test_event_stream_clamps_interval(client, monkeypatch):
+    queue = JobQueue(service.app.config["JOB_DB"])
+    running = []
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        queue.complete(running.pop(), "worker")
+
+    monkeypatch.setattr(service.time, "sleep", sleep)
+    for upload, interval in (("abc", "-5"), ("def", "600")):
+        queue.enqueue(service.upload_path(upload), 1)
+        running.append(queue.claim("worker")["id"])
+        client.get(f"/jobs/{upload}/events?interval={interval}").get_data()
+    queue.close()
+    assert sleeps == [service.MIN_POLL_INTERVAL, service.MAX_POLL_INTERVAL]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Drawing values in every notation are normalized to mm, and reports carry them.
+"""
+
+import math
+
+import numpy as np
+
+from compliance import check_extraction
+from pipeline import write_report
+from units import (bar_callout, bar_callouts, bar_diameter, dimension_table, dimensions,
+                   length_mm, scale_ratio, spacing_callout, spacing_callouts)
+
+
+def test_every_listed_form():
+    assert spacing_callout('7"c/c') == 178.0
+    assert length_mm('12\'-6"') == 3810.0
+    assert bar_diameter("Y8") == 8.0
+    assert bar_diameter("#4") == 13.0
+    assert bar_diameter("T10") == 10.0
+    assert scale_ratio("SCALE 1:60") == 60.0
+
+
+def test_spacing_callouts():
+    assert spacing_callout("@150") == 150.0
+    assert spacing_callout("150 c/c") == 150.0
+    assert spacing_callout('@ 6"') == 152.0
+    assert spacing_callout('Y8@7"c/c') == 178.0
+    assert math.isnan(spacing_callout("M20"))
+    assert math.isnan(spacing_callout("1:60"))
+    assert spacing_callouts(['7"c/c', "@150", "M20"])[:2].tolist() == [178.0, 150.0]
+
+
+def test_in_needs_the_digits():
+    assert bar_callout("Y10@150 in panel B-2") == (10.0, 150.0)
+    assert bar_callout("Y10@6in") == (10.0, 152.0)
+    assert length_mm("9in") == 9 * 25.4
+
+
+def test_empty_bulk_keeps_its_shape():
+    assert bar_callouts([]).shape == (0, 2)
+    assert spacing_callouts([]).shape == (0,)
+    assert bar_callouts(np.empty((3, 0), dtype=str)).shape == (3, 0, 2)
+
+
+def test_dimensions_at_the_drawing_scale():
+    text = "Footing F1 5'-0\" x 5'-0\", depth 450mm, SCALE 1:60, slab Y8@7\"c/c"
+    rows, ratio = dimensions(text)
+    assert ratio == 60.0
+    assert rows[0] == ("5'-0\"", 1524.0, 25.4)
+    assert ("450mm", 450.0, 7.5) in rows
+    assert len([row for row in rows if row[0] == "5'-0\""]) == 1
+
+    rows, ratio = dimensions("depth 450mm")
+    assert math.isnan(ratio) and math.isnan(rows[0][2])
+    assert dimension_table("no lengths here") == ""
+
+
+def test_report_has_normalized_dimensions(tmp_path):
+    text = "- Slab Y8@7\"c/c top, span 12'-6\", ~~span 12'-0\"~~, SCALE 1:50"
+    context = {"pdf_path": "sheet.pdf", "page_number": 1, "rasterize": "sheet.jpg",
+               "analyse": text, "check": check_extraction(text)}
+    with open(write_report(context, str(tmp_path)), encoding="utf-8") as f:
+        report = f.read()
+    assert "## Normalized Dimensions" in report
+    assert "Drawing scale: 1:50" in report
+    assert "| 12'-6\" | 3810.0 | 76.2 |" in report
+    assert "| 12'-0\"" not in report    # struck-out values are superseded
@@ -0,0 +1,236 @@
+"""
+Units of drawing values, normalized to the mm the IS checkers work in.
+
+Drawings mix metric and imperial notation freely: bar marks (Y8, T10, #4),
+spacings in inches or mm (@7"c/c, @150), feet-inch dimensions (12'-6"),
+metric lengths (450, 450mm, 1.2m) and the drawing scale (1:60). Each
+value is parsed here once, locally, instead of asking the vision model for
+conversions. The bulk functions take any array of strings; a drawing
+repeats the same few callouts hundreds of times, so only the distinct
+strings are parsed (np.unique) and the results are broadcast back.
+
+    length_mm("12'-6\"")                     # 3810.0
+    bar_callout("Y8@7\"c/c")                 # (8.0, 178.0)
+    spacing_callout("7\"c/c")                # 178.0
+    bar_diameter("#4")                       # 13.0
+    lengths_mm(["450", "1'-6\"", "1.2m"])     # array([ 450.,  457.2, 1200.])
+    actual_mm(lengths_mm(["25"]), scale_ratio("SCALE 1:60"))   # array([1500.])
+
+    python units.py "Y8@7\"c/c" "12'-6\"" "#4@6\"" 1:60
+"""
+
+import argparse
+import math
+import re
+from typing import Callable, Iterable, Tuple
+
+import numpy as np
+
+INCH = 25.4                 # mm
+MAX_INCH_SPACING = 20       # a unitless spacing below this is in inches (@7c/c)
+
+# ASTM A615 bar numbers (eighths of an inch) and their soft-metric sizes in mm
+US_BAR_SIZES = {3: 10, 4: 13, 5: 16, 6: 19, 7: 22, 8: 25, 9: 29, 10: 32, 11: 36, 14: 43, 18: 57}
+
+# Y/T: high-yield deformed bars, R/Ø: plain round bars, #: US bar numbers
+BAR = r"(?<![\w#])(?:(?P<type>[YTR]|Ø|φ)\s?(?P<diameter>\d{1,2})|#\s?(?P<number>\d{1,2}))(?!\d)"
+BAR_MARK = re.compile(BAR, re.IGNORECASE)
+# "in" only counts as a unit right after the digits: 150in, but not "150 in panel"
+SPACING = r"(?P<spacing>\d+(?:\.\d+)?)\s*(?P<unit>mm|\"|''|(?<=\d)in\b)?\s*"
+BAR_CALLOUT = re.compile(BAR + r"\s*@\s*" + SPACING + r"(?:c/c)?", re.IGNORECASE)
+# a spacing on its own: @150, @ 6", 7"c/c, 150 c/c
+SPACING_CALLOUT = re.compile(r"(?:@\s*(?=\d)|(?<![\w.@])(?=[\d.]+\s*(?:mm|\"|''|in)?\s*c/c))"
+                             + SPACING + r"(?:c/c)?", re.IGNORECASE)
+FEET_INCHES = re.compile(
+    r"(?<![\d.])(?P<feet>\d{1,3})\s*'\s*-?\s*(?:(?P<inches>\d{1,2}(?:\.\d+)?)\s*(?:\"|'')?)?")
+LENGTH = re.compile(r"(?<![\d.])(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>mm|cm|m|\"|''|(?<=\d)in)?(?![\w.])",
+                    re.IGNORECASE)
+SCALE = re.compile(r"\b1\s*:\s*(\d{1,4})\b")
+
+TO_MM = {'': 1.0, 'mm': 1.0, 'cm': 10.0, 'm': 1000.0, '"': INCH, "''": INCH, 'in': INCH}
+
+
+# =============================================================================
+# SINGLE VALUES
+# =============================================================================
+
+def bar_diameter(text: str) -> float:
+    """Nominal diameter in mm of a bar mark (Y8, T10, #4); NaN when there is none"""
+    match = BAR_MARK.search(text)
+    if not match:
+        return math.nan
+    if match.group('number'):
+        return float(US_BAR_SIZES.get(int(match.group('number')), math.nan))
+    return float(match.group('diameter'))
+
+
+def spacing_mm(value: float, unit: str = '') -> float:
+    """A callout spacing in mm; a unitless one under MAX_INCH_SPACING is in inches"""
+    unit = (unit or '').lower()
+    if unit == '' and value < MAX_INCH_SPACING:
+        unit = 'in'
+    return value * TO_MM[unit]
+
+
+def bar_callout(text: str) -> Tuple[float, float]:
+    """(diameter, spacing) in mm of the first callout in text (Y8@7"c/c, #4@6"); NaNs when none"""
+    match = BAR_CALLOUT.search(text)
+    if not match:
+        return math.nan, math.nan
+    return (bar_diameter(match.group(0)),
+            float(round(spacing_mm(float(match.group('spacing')), match.group('unit')))))
+
+
+def spacing_callout(text: str) -> float:
+    """Spacing in mm of the first spacing callout in text (@150, 7"c/c, Y8@7"c/c); NaN when none"""
+    match = SPACING_CALLOUT.search(text)
+    if not match:
+        return math.nan
+    return float(round(spacing_mm(float(match.group('spacing')), match.group('unit'))))
+
+
+def length_mm(text: str) -> float:
+    """
+    A length in mm: 12'-6", 9", 450, 450mm, 45cm, 1.2m. Unitless numbers are
+    mm, as on Indian drawings. NaN when the text is not a single length.
+    """
+    text = text.strip()
+    match = FEET_INCHES.fullmatch(text)
+    if match:
+        return (int(match.group('feet')) * 12 + float(match.group('inches') or 0)) * INCH
+    match = LENGTH.fullmatch(text)
+    if match:
+        return float(match.group('value')) * TO_MM[(match.group('unit') or '').lower()]
+    return math.nan
+
+
+def find_lengths(text: str) -> Iterable[Tuple[re.Match, float]]:
+    """(match, mm) of every feet-inch and unit-marked length in free text"""
+    taken = []
+    for match in FEET_INCHES.finditer(text):
+        taken.append(match.span())
+        yield match, length_mm(match.group(0))
+    for match in LENGTH.finditer(text):
+        if match.group('unit') and not any(s < match.end() and match.start() < e for s, e in taken):
+            yield match, length_mm(match.group(0))
+
+
+def scale_ratio(text: str) -> float:
+    """N of the first 1:N drawing scale in text; NaN when there is none"""
+    match = SCALE.search(text)
+    return float(match.group(1)) if match else math.nan
+
+
+# =============================================================================
+# BULK
+# =============================================================================
+
+def _bulk(parse: Callable[[str], object], values, width: int = 0) -> np.ndarray:
+    """
+    parse applied to an array of strings, each distinct string parsed once.
+    width is the length of the tuple parse returns (0 for a scalar), which
+    gives empty input its trailing axis.
+    """
+    strings = np.asarray(values, dtype=str)
+    if strings.size == 0:
+        return np.zeros(strings.shape + ((width,) if width else ()), dtype=float)
+    distinct, inverse = np.unique(strings, return_inverse=True)
+    parsed = np.array([parse(s) for s in distinct], dtype=float)
+    return parsed[inverse.reshape(-1)].reshape(strings.shape + parsed.shape[1:])
+
+
+def lengths_mm(values) -> np.ndarray:
+    """length_mm of every string"""
+    return _bulk(length_mm, values)
+
+
+def bar_diameters(values) -> np.ndarray:
+    """bar_diameter of every string"""
+    return _bulk(bar_diameter, values)
+
+
+def bar_callouts(values) -> np.ndarray:
+    """bar_callout of every string, as an array of shape (..., 2): diameter, spacing"""
+    return _bulk(bar_callout, values, width=2)
+
+
+def spacing_callouts(values) -> np.ndarray:
+    """spacing_callout of every string"""
+    return _bulk(spacing_callout, values)
+
+
+def scale_ratios(values) -> np.ndarray:
+    """scale_ratio of every string"""
+    return _bulk(scale_ratio, values)
+
+
+def actual_mm(drawn_mm, ratio) -> np.ndarray:
+    """Building size of lengths measured on the paper of a 1:ratio drawing"""
+    return np.asarray(drawn_mm, dtype=float) * ratio
+
+
+def drawn_mm(actual, ratio) -> np.ndarray:
+    """Paper size of building lengths on a 1:ratio drawing"""
+    return np.asarray(actual, dtype=float) / ratio
+
+
+# =============================================================================
+# REPORTS
+# =============================================================================
+
+def dimensions(text: str) -> Tuple[list, float]:
+    """
+    The distinct lengths written in free text, in order of appearance, as
+    (written, mm, drawn mm) rows, and the first drawing scale N (NaN if none).
+    Written dimensions are building sizes; drawn mm is their length on paper
+    at 1:N, NaN when the sheet gives no scale.
+    """
+    ratio = scale_ratio(text)
+    written = {}
+    for match, mm in sorted(find_lengths(text), key=lambda found: found[0].start()):
+        written.setdefault(match.group(0).strip(), mm)
+    sizes = np.fromiter(written.values(), dtype=float, count=len(written))
+    paper = drawn_mm(sizes, ratio)
+    return [(value, float(mm), float(drawn)) for value, mm, drawn in zip(written, sizes, paper)], ratio
+
+
+def dimension_table(text: str) -> str:
+    """Markdown section normalizing the dimensions of an extraction report to mm; '' when none"""
+    rows, ratio = dimensions(text)
+    if not rows:
+        return ""
+    scale = f"1:{ratio:g}" if not math.isnan(ratio) else "no scale given"
+    lines = ["## Normalized Dimensions", "",
+             f"Drawing scale: {scale}", "",
+             "| Value | mm | Drawn (mm) |", "|---|---|---|"]
+    for value, mm, drawn in rows:
+        paper = f"{drawn:.1f}" if not math.isnan(drawn) else "-"
+        lines.append(f"| {value} | {mm:.1f} | {paper} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize drawing values to mm")
+    parser.add_argument("values", nargs="+", help='e.g. Y8@7"c/c 12\'-6" #4 1:60')
+    args = parser.parse_args()
+
+    callouts = bar_callouts(args.values)
+    for value, length, diameter, (callout_diameter, spacing), bare_spacing, ratio in zip(
+            args.values, lengths_mm(args.values), bar_diameters(args.values),
+            callouts, spacing_callouts(args.values), scale_ratios(args.values)):
+        if not math.isnan(spacing):
+            print(f"📏 {value}: bar Ø{callout_diameter:g} mm @ {spacing:g} mm")
+        elif not math.isnan(bare_spacing):
+            print(f"📏 {value}: @ {bare_spacing:g} mm c/c")
+        elif not math.isnan(ratio):
+            print(f"📏 {value}: scale 1:{ratio:g}")
+        elif not math.isnan(length):
+            print(f"📏 {value}: {length:g} mm")
+        elif not math.isnan(diameter):
+            print(f"📏 {value}: bar Ø{diameter:g} mm")
+        else:
+            print(f"❓ {value}: not a unit value")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Unified client for the vision providers.
+
+Keeps one HTTP session (connection pool) for all providers and caches
+responses by image content and prompt, so long-lived processes such as the
+worker pool or the daemon do not pay for new TLS connections or repeated
+calls on the same sheet. Calls go through prompt_manager.complete, which
+continues truncated responses; their token usage is kept in self.usage.
+With a cassette (cassette.py, or the VISION_CASSETTE environment variable)
+the session records its HTTP exchanges or replays them offline.
+
+Calls can be hedged across providers (resilience.py): a call running past
+the provider's p95 latency gets a backup request to the next configured
+provider in HEDGE_ORDER, and a provider that keeps failing is skipped for a
+cool-down. A hedge can bill the same page twice, so it is opt-in (hedge=True,
+or VISION_HEDGE=1 for the default client) and never used when replaying a
+cassette, whose placeholder keys would otherwise enable the backups.
+"""
+
+import hashlib
+import importlib
+import os
+import threading
+from collections import OrderedDict
+
+from prompt_manager import UsageLog, complete
+from resilience import Resilience
+
+PROVIDERS = {
+    "gemini": "gemini_vision",
+    "grok": "grok_vision",
+    "qwen": "qwen_vision",
+}
+API_KEYS = {
+    "gemini": "GEMINI_API_KEY",
+    "grok": "OPENROUTER_API_KEY",
+    "qwen": "OPENROUTER_API_KEY",
+}
+# Backup providers for hedged and failed calls, tried in order when configured
+HEDGE_ORDER = {
+    "gemini": ["grok"],
+    "grok": ["gemini"],
+    "qwen": ["gemini", "grok"],
+}
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VisionClient:
+    """Analyse images with any provider through a shared session and cache."""
+
+    def __init__(self, cache_size=256, cassette=None, hedge=False):
+        import requests
+
+        self.session = requests.Session()
+        self.cassette = cassette
+        if cassette is not None:
+            cassette.mount(self.session)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.cache_hits = 0
+        self.usage = UsageLog()
+        self.hedge = hedge
+        self.resilience = Resilience()
+
+    def provider(self, name):
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown provider {name!r}. Available: {sorted(PROVIDERS)}")
+        return importlib.import_module(PROVIDERS[name])
+
+    def analyse_image(self, image_path, prompt, provider="gemini"):
+        """Same contract as the provider modules' analyse_image."""
+        self.provider(provider)
+        key = (provider, file_digest(image_path),
+               hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._cache[key]
+            self.calls += 1
+
+        def call(name):
+            completion = complete(name, image_path, prompt, session=self.session)
+            self.usage.add(completion)
+            return completion.text
+
+        result = self.resilience.call(self.providers_for(provider), call)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def providers_for(self, provider):
+        """The provider followed by its configured backups when hedging is on"""
+        replaying = self.cassette is not None and self.cassette.mode == "replay"
+        if not self.hedge or replaying:
+            return [provider]
+        return [provider] + [p for p in HEDGE_ORDER.get(provider, [])
+                             if p != provider and os.getenv(API_KEYS[p])]
+
+    def stats(self):
+        stats = {"calls": self.calls, "cache_hits": self.cache_hits, "cached": len(self._cache),
+                 "tokens": self.usage.totals(), "resilience": self.resilience.stats()}
+        if self.cassette is not None:
+            stats["cassette"] = self.cassette.stats()
+        return stats
+
+    def close(self):
+        self.resilience.close()
+        self.session.close()
+
+
+_default_client = None
+
+
+def default_client():
+    """Process-wide client, created on first use."""
+    global _default_client
+    if _default_client is None:
+        from cassette import from_env
+
+        _default_client = VisionClient(cassette=from_env(),
+                                       hedge=os.getenv("VISION_HEDGE") == "1")
+    return _default_client
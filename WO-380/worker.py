@@ -0,0 +1,120 @@
+"""
+Worker pool command for the drawing analysis job queue.
+
+Usage:
+    python worker.py enqueue sample_pdfs/1.pdf sample_pdfs/5.pdf
+    python worker.py run --workers 4
+    python worker.py status
+    python worker.py retry
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from job_queue import DEFAULT_DB_PATH, JobQueue
+
+
+def _keep_lease(db_path, job_id, worker_id, lease_seconds, stop):
+    """Extend a job's lease until told to stop (runs in a side thread)."""
+    queue = JobQueue(db_path)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            queue.heartbeat(job_id, worker_id, lease_seconds)
+    finally:
+        queue.close()
+
+
+def work(db_path, worker_id, wait=False, poll_interval=2.0, lease_seconds=600):
+    """Pull jobs until the queue is drained (or forever with wait=True)."""
+    from dotenv import load_dotenv
+    from pipeline import index_report, record_results, run_job, write_report
+
+    load_dotenv()
+    queue = JobQueue(db_path)
+    while True:
+        job = queue.claim(worker_id, lease_seconds)
+        if job is None:
+            if wait or queue.has_pending():
+                time.sleep(poll_interval)
+                continue
+            break
+
+        label = f"{job['pdf_path']} page {job['page_number']}"
+        print(f"🔧 [{worker_id}] job {job['id']}: {label} (attempt {job['attempts']})")
+        stop = threading.Event()
+        keeper = threading.Thread(
+            target=_keep_lease, args=(db_path, job["id"], worker_id, lease_seconds, stop),
+            daemon=True)
+        keeper.start()
+        try:
+            context = run_job(queue, job)
+            md_filename = write_report(context)
+            record_results(context)
+            index_report(md_filename)
+            if queue.complete(job["id"], worker_id):
+                print(f"✅ [{worker_id}] job {job['id']} done: {md_filename}")
+            else:
+                print(f"⚠️ [{worker_id}] job {job['id']}: lease lost, result left to its new worker")
+        except Exception as e:
+            state = queue.fail(job["id"], worker_id, e)
+            print(f"❌ [{worker_id}] job {job['id']} {state or 'lease lost'}: {e}")
+        finally:
+            stop.set()
+            keeper.join()
+    queue.close()
+
+
+def run_pool(db_path, workers, wait=False):
+    """Start a pool of worker processes sharing one queue database."""
+    host = socket.gethostname()
+    processes = []
+    for n in range(workers):
+        worker_id = f"{host}-{os.getpid()}-{n}"
+        process = multiprocessing.Process(target=work, args=(db_path, worker_id, wait))
+        process.start()
+        processes.append(process)
+    for process in processes:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drawing analysis job queue")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Queue database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Add every page of the PDFs as jobs")
+    enqueue.add_argument("pdfs", nargs="+")
+
+    run = commands.add_parser("run", help="Start the worker pool")
+    run.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    run.add_argument("--wait", action="store_true",
+                     help="Keep polling for new jobs instead of exiting when drained")
+
+    commands.add_parser("status", help="Show job counts and failures")
+    commands.add_parser("retry", help="Re-queue failed jobs")
+
+    args = parser.parse_args()
+    queue = JobQueue(args.db)
+
+    if args.command == "enqueue":
+        for pdf_path in args.pdfs:
+            job_ids = queue.enqueue_pdf(pdf_path)
+            print(f"📥 {pdf_path}: {len(job_ids)} page job(s) queued")
+    elif args.command == "run":
+        queue.close()
+        run_pool(args.db, args.workers, args.wait)
+    elif args.command == "status":
+        for state, n in sorted(queue.counts().items()):
+            print(f"{state:>8}: {n}")
+        for job in queue.jobs("failed"):
+            print(f"❌ job {job['id']} {job['pdf_path']} page {job['page_number']}: {job['error']}")
+    elif args.command == "retry":
+        print(f"🔁 {queue.retry_failed()} failed job(s) re-queued")
+
+
+if __name__ == "__main__":
+    main()